@@ -5,7 +5,7 @@ import json
 import uuid
 import random
 import traceback
-from src.config import OUTPUT_DIR
+from src.config import OUTPUT_DIR, SHARED_VISUAL_TRACK
 from src.writer import ScriptGenerator
 from src.topic_engine import TopicEngine
 from src.storyboard_engine import build_storyboard
@@ -80,9 +80,9 @@ def run_job(job_id: str, topic_engine: TopicEngine):
     current_style["base_seed"] = random.randint(100000, 999999999) 
     
     scenes = script_data.get("scenes", [])
-    image_paths = artist.generate_images(scenes, current_style, job_dir)
+    image_paths = artist.generate_images(scenes, current_style, job_dir, thumbnail_topic=topic)
     
-    # 3.5 Thumbnails (Lock 27)
+    # 3.5 Thumbnails (Lock 27) - queued alongside the scenes, collected here
     artist.generate_thumbnails(topic, current_style, job_dir)
 
     # 4. A/B Testing Loops (Render Variants)
@@ -92,33 +92,56 @@ def run_job(job_id: str, topic_engine: TopicEngine):
     music_mood = script_data.get("music_mood")
     
     # Variant A: Base
-    print("[*] Rendering Variant A (Base)...")
-    _render_variant(job_dir, "A", script_data["script_text"], image_paths, narrator, editor, voice_style, music_mood, CAPTION_CONF, script_data)
+    variant_texts = [("A", "Base", script_data["script_text"])]
     
     # Variant B: Alt Hook
     variants = script_data.get("variants", {})
     if "hook_b" in variants:
-        print("[*] Rendering Variant B (Alt Hook)...")
         base_hook = script_data["hook_text"]
         alt_hook = variants["hook_b"]
         
         # Simple replace (might be risky if hook repeats, but okay for v1)
         text_b = script_data["script_text"].replace(base_hook, alt_hook, 1)
-        
-        _render_variant(job_dir, "B", text_b, image_paths, narrator, editor, voice_style, music_mood, CAPTION_CONF, script_data)
+        variant_texts.append(("B", "Alt Hook", text_b))
+
+    # Voice every variant first so the visual track can be sized and rendered once
+    voices = []
+    for suffix, label, text in variant_texts:
+        print(f"[*] Voicing Variant {suffix} ({label})...")
+        voice = _voice_variant(job_dir, suffix, text, narrator, voice_style)
+        if voice:
+            voices.append((suffix, label, voice))
+
+    visual_track = None
+    if SHARED_VISUAL_TRACK and voices:
+        try:
+            visual_track = editor.render_visual_track(
+                image_paths, [audio_path for _, _, (audio_path, _) in voices], os.path.join(job_dir, "visual_track.mp4")
+            )
+        except Exception as e:
+            print(f"   [!] Shared visual track failed ({e}). Rendering variants standalone.")
+
+    for suffix, label, (audio_path, audio_metadata) in voices:
+        print(f"[*] Rendering Variant {suffix} ({label})...")
+        _render_variant(job_dir, suffix, audio_path, audio_metadata, image_paths, editor, music_mood, CAPTION_CONF, script_data, visual_track)
 
     print(f"✅ JOB COMPLETE: {job_id}")
 
-def _render_variant(job_dir, suffix, text, image_paths, narrator, editor, voice_style, music_mood, caption_conf, script_data):
+def _voice_variant(job_dir, suffix, text, narrator, voice_style):
     try:
         audio_name = f"voice_{suffix}.mp3"
         # PATCH 7: Unpack metadata
-        audio_path, audio_metadata = narrator.generate_voice(text, job_dir, voice_style) 
-        
+        return narrator.generate_voice(text, job_dir, voice_style, output_name=audio_name)
+    except Exception as e:
+        print(f"   [!] Variant {suffix} Voice Error: {e}")
+        return None
+
+def _render_variant(job_dir, suffix, audio_path, audio_metadata, image_paths, editor, music_mood, caption_conf, script_data, visual_track=None):
+    try:
         final_mp4 = os.path.join(job_dir, f"video_{suffix}.mp4")
         
         # Pass metadata to editor
-        editor.assemble_video(image_paths, audio_path, final_mp4, music_mood, caption_conf, script_data, audio_metadata)
+        editor.assemble_video(image_paths, audio_path, final_mp4, music_mood, caption_conf, script_data, audio_metadata, visual_track=visual_track)
         print(f"   -> Generated {final_mp4}")
     except Exception as e:
         print(f"   [!] Variant {suffix} Error: {e}")
@@ -130,6 +153,7 @@ def main():
 
     print("[*] Initializing Topic Engine v2...")
     topic_engine = TopicEngine(CHANNEL_CONF)
+    topic_engine.prefetch()  # Warm the candidate queue while the first job starts up
     
     stats = load_stats()
     print(f"[*] Studio Stats: {stats['jobs_run']} runs, {stats['failures']} failures.")
@@ -26,7 +26,10 @@ def run():
     caption_style = load_json(caption_style_path)
     
     # 3. Assets
-    audio_path = os.path.join(JOB_DIR, "voiceover.mp3")
+    audio_path = os.path.join(JOB_DIR, "voice_A.mp3")
+    if not os.path.exists(audio_path):
+        # Jobs from before per-variant voiceovers
+        audio_path = os.path.join(JOB_DIR, "voiceover.mp3")
     image_paths = [os.path.join(JOB_DIR, f"scene_{i:02d}.png") for i in range(1, 17)]
     
     for img in image_paths:
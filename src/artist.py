@@ -1,7 +1,43 @@
 import os
+import random
 import requests
 from openai import OpenAI
 from .config import OPENAI_API_KEY
+from .model_registry import MODELS
+
+CLIP_MODEL = "ViT-B/32"
+CLIP_BATCH_SIZE = 16 # One job's scenes in a single forward pass
+
+_CHECKPOINTS_VERIFIED = False
+
+def _audit_checkpoints():
+    """User V3 Spec: Strict Juggernaut Check (filesystem walk runs once per process)."""
+    global _CHECKPOINTS_VERIFIED
+    if _CHECKPOINTS_VERIFIED:
+        return
+    
+    # Heuristic to find ComfyUI dir
+    possible_paths = [
+         "c:/Users/DOVY/Desktop/REELS AUTOMATION/ComfyUI_Local/models/checkpoints",
+         "../ComfyUI_Local/models/checkpoints"
+    ]
+    found_dir = None
+    for p in possible_paths:
+         if os.path.exists(p):
+             found_dir = p
+             break
+    
+    if found_dir:
+        required = ["Juggernaut-XL_v9_RunDiffusionPhoto_v2.safetensors"]
+        for m in required:
+            if not os.path.exists(os.path.join(found_dir, m)):
+                print(f"[AUDIT] ❌ MISSING MODEL: {m}")
+                # In Premium Mode, we crash?
+                from config import PREMIUM_MODE
+                if PREMIUM_MODE:
+                    raise RuntimeError(f"Required model missing in PREMIUM_MODE: {m}")
+        print(f"[AUDIT] Required Models Verified in {found_dir}")
+    _CHECKPOINTS_VERIFIED = True
 
 class VisualEngine:
     def __init__(self):
@@ -9,6 +45,7 @@ class VisualEngine:
         self.clip_model = None
         self.clip_preprocess = None
         self.device = None
+        self.thumbnail_batch = None
         self._init_clip()
 
     def _init_clip(self):
@@ -20,36 +57,18 @@ class VisualEngine:
             
             # PATCH 6: Real Filesystem Check for CLIP/Model Availability
             # This prevents the "fake success" where we assume ComfyUI works just because port 8188 is open.
+            _audit_checkpoints()
             
-            # User V3 Spec: Strict Juggernaut Check
-            import os
-            # Heuristic to find ComfyUI dir
-            possible_paths = [
-                 "c:/Users/DOVY/Desktop/REELS AUTOMATION/ComfyUI_Local/models/checkpoints",
-                 "../ComfyUI_Local/models/checkpoints"
-            ]
-            found_dir = None
-            for p in possible_paths:
-                 if os.path.exists(p):
-                     found_dir = p
-                     break
-            
-            if found_dir:
-                required = ["Juggernaut-XL_v9_RunDiffusionPhoto_v2.safetensors"]
-                for m in required:
-                    if not os.path.exists(os.path.join(found_dir, m)):
-                        print(f"[AUDIT] ❌ MISSING MODEL: {m}")
-                        # In Premium Mode, we crash?
-                        from config import PREMIUM_MODE
-                        if PREMIUM_MODE:
-                            raise RuntimeError(f"Required model missing in PREMIUM_MODE: {m}")
-                print(f"[AUDIT] Required Models Verified in {found_dir}")
-            
+            # Shared per process: later jobs reuse the already-loaded weights
             self.device = "cuda" if torch.cuda.is_available() else "cpu"
-            self.clip_model, self.clip_preprocess = clip.load("ViT-B/32", device=self.device)
+            first_load = not MODELS.loaded(f"clip:{CLIP_MODEL}:{self.device}")
+            self.clip_model, self.clip_preprocess = MODELS.get(
+                f"clip:{CLIP_MODEL}:{self.device}", lambda: clip.load(CLIP_MODEL, device=self.device)
+            )
             CLIP_AVAILABLE = True
-            print(f"[*] CLIP Model loaded on {self.device}")
-            print("[AUDIT] CLIP/Torch LOADED SUCCESSFULLY (High Quality Mode Enabled)")
+            if first_load:
+                print(f"[*] CLIP Model loaded on {self.device}")
+                print("[AUDIT] CLIP/Torch LOADED SUCCESSFULLY (High Quality Mode Enabled)")
         except ImportError as e:
             CLIP_AVAILABLE = False
             from config import PREMIUM_MODE
@@ -61,7 +80,13 @@ class VisualEngine:
             CLIP_AVAILABLE = False
             print(f"[!] CLIP Init Error: {e}")
 
-    def generate_images(self, scenes: list, style_profile: dict, job_dir: str) -> list:
+    @staticmethod
+    def unload_clip():
+        """Frees the shared CLIP weights (e.g. before a memory-hungry render)."""
+        for device in ("cpu", "cuda"):
+            MODELS.unload(f"clip:{CLIP_MODEL}:{device}")
+
+    def generate_images(self, scenes: list, style_profile: dict, job_dir: str, thumbnail_topic: str = None) -> list:
         # STRICT LOCAL MODE: No Fallback Support
         
         # 4) STYLE BIBLE INJECTION (HARD RULE)
@@ -128,7 +153,8 @@ class VisualEngine:
         neg = style_profile.get("negative_prompt", "")
         
         cfg = {
-            "events": event_types 
+            "events": event_types,
+            "base_seed": style_profile.get("base_seed")  # Reproducible seeds => image cache hits on re-runs
         }
 
         print(f"[*] VisualEngine: generating {len(prompts)} images via local ComfyUI...")
@@ -136,9 +162,16 @@ class VisualEngine:
         if prompts:
             print(f"[*] PROMPT DEBUG (SCENE 1): {prompts[0]}")
         
+        # Thumbnails ride the same ComfyUI queue right behind the scenes (collected in generate_thumbnails)
+        after_queue = None
+        if thumbnail_topic:
+            after_queue = lambda: self.queue_thumbnails(thumbnail_topic, style_profile, job_dir)
+        
         try:
-             return self._generate_comfyui_with_retry(prompts, neg, job_dir, cfg)
+             return self._generate_comfyui_with_retry(prompts, neg, job_dir, cfg, after_queue=after_queue)
         except Exception as e:
+             # The thumbnails will never be collected: free their slots in the shared pool
+             self.discard_thumbnails()
              raise RuntimeError(f"Visual Engine Failure: {e}")
              
     # DALL-E Fallback Removed / Disabled by Strict Mode Logic
@@ -147,15 +180,18 @@ class VisualEngine:
 
 
 
-    def _generate_comfyui_with_retry(self, prompts: list, negative: str, job_dir: str, cfg: dict) -> list:
-        from .local_comfyui import generate_images as run_comfy
+    def _generate_comfyui_with_retry(self, prompts: list, negative: str, job_dir: str, cfg: dict, after_queue=None) -> list:
+        from .local_comfyui import queue_images
         
         job_id = os.path.basename(job_dir)
         # negative passed directly
         
-        # 1. Initial Generation (All scenes)
+        # 1. Initial Generation (All scenes queued up front, collected as they finish)
         print(f"[*] Generatiing {len(prompts)} scenes...")
-        paths = run_comfy(job_id, prompts, negative, job_dir, cfg)
+        batch = queue_images(job_id, prompts, negative, job_dir, cfg)
+        if after_queue:
+            after_queue()
+        paths = batch.collect()
         
         if not self.clip_model:
             return paths
@@ -163,20 +199,21 @@ class VisualEngine:
         # 2. CLIP Validation & Retry
         final_paths = list(paths) # Copy
         max_retries = 2
+        to_check = list(range(len(final_paths)))
         
         for attempt in range(max_retries):
-            # Check for bad images
-            bad_indices = []
-            for i, path in enumerate(final_paths):
-                if not path or not os.path.exists(path):
-                    bad_indices.append(i)
-                    continue
-                
-                score = self._calculate_clip_score(path, prompts[i])
+            # Check for bad images (only scenes not already passed get re-scored)
+            bad_indices = [i for i in to_check if not final_paths[i] or not os.path.exists(final_paths[i])]
+            scored = [i for i in to_check if i not in bad_indices]
+            
+            # One batched CLIP pass over every scene instead of one encode per image
+            scores = self._calculate_clip_scores([final_paths[i] for i in scored], [prompts[i] for i in scored])
+            for i, score in zip(scored, scores):
                 if score < 0.28:
                     print(f"[!] Scene {i+1} Rejected. Score: {score:.3f} < 0.28")
                     bad_indices.append(i)
                 # else: print(f"[*] Scene {i+1} Passed. Score: {score:.3f}")
+            bad_indices.sort()
             
             if not bad_indices:
                 print("[*] All images passed CLIP check.")
@@ -184,99 +221,96 @@ class VisualEngine:
                 
             print(f"[*] Retrying {len(bad_indices)} images (Attempt {attempt+1})...")
             
-            # Prepare retry batch
-            retry_prompts = [prompts[i] for i in bad_indices]
-            # We need a sub-job ID to avoid overwriting or logic mixup?
-            # local_comfyui saves as scene_01.png. If we rerun, it overwrites?
-            # Yes, run_comfy overwrites if filenames match index.
-            # But run_comfy takes a list. If we pass a subset, it might name them scene_01, scene_02...
-            # We need to map them back.
-            # LIMITATION: local_comfyui.py likely names sequentially 1..N.
-            # If we send 3 prompts, it produces scene_01...scene_03.
-            # This messes up the indices if we are retrying Scene 5, 8, 12.
-            # FIX: We can't easily do partial retry with current local_comfyui unless we modify it to accept specific filenames/indices.
-            # OR we define specific sub-folders or handle renaming.
-            
-            # For this "Trial", I will skip the complex partial retry logic to avoid breaking file mapping.
-            # I will just Log the failure and keep the image. 
-            print("[!] Partial retry logic not fully supported by local_comfyui (sequential naming). Keeping bad images to verify workflow.")
-            break 
-            
-            # IMPLEMENT PROPER RETRY IF TIME PERMITS:
-            # 1. Modify local_comfyui to accept 'indices' or 'filenames'.
-            # 2. Or generate to temp folder and move.
+            # Re-queue only the rejected scenes. indices keeps their scene_XX.png names
+            # (overwritten in place); a fresh base seed gives them a different composition.
+            retry_cfg = dict(cfg or {}, base_seed=random.randint(1, 10_000_000))
+            retry_paths = queue_images(job_id, [prompts[i] for i in bad_indices], negative, job_dir,
+                                       retry_cfg, indices=bad_indices).collect()
+            for i, path in zip(bad_indices, retry_paths):
+                final_paths[i] = path
+            to_check = bad_indices
             
         return final_paths
 
     def _calculate_clip_score(self, image_path: str, text: str) -> float:
+        return self._calculate_clip_scores([image_path], [text])[0]
+
+    def _calculate_clip_scores(self, image_paths: list, texts: list) -> list:
+        """
+        Scores (image, prompt) pairs with one encode_image/encode_text call per batch.
+        Returns the raw cosine similarity of each image against its own prompt.
+        """
         try:
             import torch
             import clip
             from PIL import Image
             
-            image = self.clip_preprocess(Image.open(image_path)).unsqueeze(0).to(self.device)
-            text_tok = clip.tokenize([text[:77]]).to(self.device) # Clip limit 77 tokens
-            
-            with torch.no_grad():
-                image_features = self.clip_model.encode_image(image)
-                text_features = self.clip_model.encode_text(text_tok)
+            scores = []
+            for start in range(0, len(image_paths), CLIP_BATCH_SIZE):
+                batch_paths = image_paths[start:start + CLIP_BATCH_SIZE]
+                batch_texts = texts[start:start + CLIP_BATCH_SIZE]
+                
+                images = torch.stack([self.clip_preprocess(Image.open(p)) for p in batch_paths]).to(self.device)
+                text_tok = clip.tokenize([t[:77] for t in batch_texts]).to(self.device) # Clip limit 77 tokens
                 
-                # Cosine similarity
-                image_features /= image_features.norm(dim=-1, keepdim=True)
-                text_features /= text_features.norm(dim=-1, keepdim=True)
-                similarity = (100.0 * image_features @ text_features.T).softmax(dim=-1)
-                # Softmax gives prob. We want raw cosine?
-                # Clip paper used cosine similarity * logit_scale
-                # Usually raw cosine is enough for threshold.
-                # Let's use raw dot product.
-                val = (image_features @ text_features.T).item()
-                return val
+                with torch.no_grad():
+                    image_features = self.clip_model.encode_image(images)
+                    text_features = self.clip_model.encode_text(text_tok)
+                    
+                    # Cosine similarity
+                    image_features /= image_features.norm(dim=-1, keepdim=True)
+                    text_features /= text_features.norm(dim=-1, keepdim=True)
+                    # Row-wise dot product: each image against its own prompt (diagonal of image @ text.T)
+                    scores.extend((image_features * text_features).sum(dim=-1).float().cpu().tolist())
+            return scores
         except Exception as e:
             print(f"[!] CLIP Calc Error: {e}")
-            return 1.0
+            return [1.0] * len(image_paths)
+
+    def queue_thumbnails(self, topic: str, style_profile: dict, job_dir: str):
+        """Submits both thumbnail prompts without waiting; generate_thumbnails collects them."""
+        from .config import IMAGE_BACKEND
+        if IMAGE_BACKEND != "comfyui":
+            return
+        
+        from .local_comfyui import queue_images
+        # PATCH 11: ISOLATION
+        # Explicit file names so the thumbnails never overwrite scene_01.png
+        print("[*] Queueing 2 Thumbnail Variants...")
+        prompts = self._thumbnail_prompts(topic, style_profile)
+        self.thumbnail_batch = queue_images(os.path.basename(job_dir) + "_thumb", prompts, style_profile.get("negative_prompt", ""), job_dir, style_profile,
+                                            filenames=[f"thumb_{chr(65+i)}.png" for i in range(len(prompts))])
+
+    def discard_thumbnails(self):
+        """Aborts thumbnails queued by queue_thumbnails that will not be collected."""
+        if self.thumbnail_batch is not None:
+            batch, self.thumbnail_batch = self.thumbnail_batch, None
+            batch.abort()
 
     def generate_thumbnails(self, topic: str, style_profile: dict, job_dir: str) -> list:
         print("[*] Generating 2 Thumbnail Variants...")
         
-        # Thumbnail Prompts
-        prefix = style_profile.get("prompt_prefix", "")
-        pal = style_profile.get("palette_bible", "")
-        # Make it punchy
-        t1 = f"{prefix}, {pal}, THUMBNAIL COMPOSITION, bold text support, high contrast, shock value, {topic}, dramatic lighting, close up"
-        t2 = f"{prefix}, {pal}, THUMBNAIL COMPOSITION, wide shot, mysterious atmosphere, question mark, {topic}, dark shadows"
-        
-        prompts = [t1, t2]
-        
         from .config import IMAGE_BACKEND
         if IMAGE_BACKEND == "comfyui":
-            from .local_comfyui import generate_images as run_comfy
-            # PATCH 11: ISOLATION
-            # Generate to a subfolder to avoid overwriting scene_01.png
-            thumb_dir = os.path.join(job_dir, "thumbs_temp")
-            os.makedirs(thumb_dir, exist_ok=True)
-
-            paths = run_comfy(os.path.basename(job_dir) + "_thumb", prompts, style_profile.get("negative_prompt", ""), thumb_dir, style_profile)
+            if self.thumbnail_batch is None:
+                self.queue_thumbnails(topic, style_profile, job_dir)
+            batch, self.thumbnail_batch = self.thumbnail_batch, None
             
-            # Key: local_comfyui names them scene_XX. We want thumb_A, thumb_B.
-            # Assuming paths[0] is t1, paths[1] is t2.
-            final_paths = []
-            for i, p in enumerate(paths):
-                # Paths returned are in thumb_dir. Move them to job_dir.
-                if p and os.path.exists(p):
-                    new_name = os.path.join(job_dir, f"thumb_{chr(65+i)}.png")
-                    try:
-                        os.rename(p, new_name)  # Move & Rename
-                        final_paths.append(new_name)
-                    except Exception as e:
-                        print(f"[!] Thumbnail Rename Fail: {e}")
+            paths = batch.collect()
+            final_paths = [p for p in paths if p and os.path.exists(p)]
             
-            # Cleanup temp dir
-            try:
-                os.rmdir(thumb_dir)
-            except:
-                pass # Not crucial
-
             return final_paths
         else:
              # OpenAI Fallback
+             prompts = self._thumbnail_prompts(topic, style_profile)
              return self._generate_openai(prompts, style_profile, job_dir)
+
+    def _thumbnail_prompts(self, topic: str, style_profile: dict) -> list:
+        # Thumbnail Prompts
+        prefix = style_profile.get("prompt_prefix", "")
+        pal = style_profile.get("palette_bible", "")
+        # Make it punchy
+        t1 = f"{prefix}, {pal}, THUMBNAIL COMPOSITION, bold text support, high contrast, shock value, {topic}, dramatic lighting, close up"
+        t2 = f"{prefix}, {pal}, THUMBNAIL COMPOSITION, wide shot, mysterious atmosphere, question mark, {topic}, dark shadows"
+        
+        return [t1, t2]
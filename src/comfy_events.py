@@ -0,0 +1,103 @@
+import json
+import threading
+
+try:
+    import websocket  # websocket-client
+except ImportError:
+    websocket = None
+
+CONNECT_TIMEOUT = 5
+
+class ComfyEventListener:
+    """
+    Subscribes to ComfyUI's /ws progress stream and records prompt completions.
+    One connection resolves any number of prompt ids queued under the same client id.
+    """
+    def __init__(self, server_address: str, client_id: str):
+        self.server_address = server_address
+        self.client_id = client_id
+        self.connected = False
+        self._ws = None
+        self._thread = None
+        self._finished = {}  # prompt_id -> "success" | "error"
+        self._cond = threading.Condition()
+
+    def start(self) -> bool:
+        if websocket is None:
+            print("[!] ComfyUI: websocket-client not installed. Falling back to history polling.")
+            return False
+        try:
+            self._ws = websocket.create_connection(
+                f"ws://{self.server_address}/ws?clientId={self.client_id}", timeout=CONNECT_TIMEOUT
+            )
+            self._ws.settimeout(None)
+        except Exception as e:
+            print(f"[!] ComfyUI: WebSocket unavailable ({e}). Falling back to history polling.")
+            return False
+
+        self.connected = True
+        self._thread = threading.Thread(target=self._run, name=f"comfy-ws-{self.server_address}", daemon=True)
+        self._thread.start()
+        return True
+
+    def close(self):
+        if self._ws is None:
+            return
+        # Don't wait for the close handshake: the reader thread owns recv()
+        try:
+            self._ws.send_close()
+        except Exception:
+            pass
+        self._ws.shutdown()
+        self._ws = None
+
+    def wait_any(self, prompt_ids: list, timeout: float = None) -> list:
+        """
+        Blocks until at least one of prompt_ids has finished (or the socket drops / timeout hits).
+        Returns the finished subset, which may be empty.
+        """
+        with self._cond:
+            self._cond.wait_for(
+                lambda: not self.connected or any(p in self._finished for p in prompt_ids), timeout
+            )
+            return [p for p in prompt_ids if p in self._finished]
+
+    def _run(self):
+        while True:
+            try:
+                message = self._ws.recv()
+            except Exception:
+                break
+            if not message:
+                break
+            if isinstance(message, bytes):
+                continue  # Binary latent previews
+            try:
+                self._handle(json.loads(message))
+            except ValueError:
+                continue
+
+        with self._cond:
+            self.connected = False
+            self._cond.notify_all()
+
+    def _handle(self, event: dict):
+        event_type = event.get("type")
+        data = event.get("data") or {}
+        prompt_id = data.get("prompt_id")
+        if not prompt_id:
+            return
+
+        # 'executing' with node=None is the end-of-prompt signal on every ComfyUI version
+        if event_type == "executing" and data.get("node") is None:
+            status = "success"
+        elif event_type == "execution_success":
+            status = "success"
+        elif event_type in ("execution_error", "execution_interrupted"):
+            status = "error"
+        else:
+            return
+
+        with self._cond:
+            self._finished.setdefault(prompt_id, status)
+            self._cond.notify_all()
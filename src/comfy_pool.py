@@ -0,0 +1,110 @@
+import threading
+from collections import deque
+
+LATENCY_WINDOW = 50
+
+class ComfyNode:
+    """One ComfyUI server in the pool, with its queue depth and latency history."""
+    def __init__(self, client):
+        self.client = client
+        self.address = client.server_address
+        self.online = None  # Unknown until the first refresh
+        self.queue_depth = 0
+        self.in_flight = 0
+        self.completed = 0
+        self.failed = 0
+        self.vram_free = None
+        self.latencies = deque(maxlen=LATENCY_WINDOW)
+
+    def refresh(self):
+        try:
+            queue = self.client.get_queue()
+            self.queue_depth = len(queue.get("queue_running", [])) + len(queue.get("queue_pending", []))
+            stats = self.client.get_system_stats()
+            devices = stats.get("devices") or [{}]
+            self.vram_free = devices[0].get("vram_free")
+            self.online = True
+        except Exception as e:
+            print(f"[!] ComfyUI Pool: {self.address} unreachable ({e})")
+            self.online = False
+
+    def expected_wait(self, default_latency: float) -> float:
+        latency = self.avg_latency() or default_latency
+        return (self.queue_depth + self.in_flight + 1) * latency
+
+    def avg_latency(self):
+        if not self.latencies:
+            return None
+        return sum(self.latencies) / len(self.latencies)
+
+    def stats(self) -> dict:
+        ordered = sorted(self.latencies)
+        def pct(p):
+            return round(ordered[min(len(ordered) - 1, int(p * len(ordered)))], 2) if ordered else None
+        avg = self.avg_latency()
+        return {
+            "online": self.online,
+            "queue_depth": self.queue_depth,
+            "in_flight": self.in_flight,
+            "completed": self.completed,
+            "failed": self.failed,
+            "vram_free": self.vram_free,
+            "avg_sec": round(avg, 2) if avg is not None else None,
+            "p50_sec": pct(0.5),
+            "p95_sec": pct(0.95),
+            "max_sec": round(ordered[-1], 2) if ordered else None,
+        }
+
+class ComfyUIPool:
+    """
+    Spreads scene prompts across several ComfyUI servers.
+    Dispatch goes to the node with the shortest expected wait: reported queue depth
+    (/queue) plus our own in-flight prompts, times that node's recent per-image latency.
+    """
+    def __init__(self, clients: list):
+        self.nodes = [ComfyNode(c) for c in clients]
+        self._lock = threading.Lock()
+
+    def refresh(self):
+        for node in self.nodes:
+            node.refresh()
+
+    def pick(self, exclude=()) -> ComfyNode:
+        with self._lock:
+            candidates = [n for n in self.nodes if n.address not in exclude]
+            if not candidates:
+                return None
+            online = [n for n in candidates if n.online is not False] or candidates  # Last resort: try anyway
+            known = [n.avg_latency() for n in self.nodes if n.latencies]
+            default_latency = sum(known) / len(known) if known else 1.0
+            node = min(online, key=lambda n: n.expected_wait(default_latency))
+            node.in_flight += 1
+            return node
+
+    def record_success(self, node: ComfyNode, latency: float):
+        with self._lock:
+            node.in_flight = max(0, node.in_flight - 1)
+            node.completed += 1
+            node.latencies.append(latency)
+
+    def record_failure(self, node: ComfyNode):
+        with self._lock:
+            node.in_flight = max(0, node.in_flight - 1)
+            node.failed += 1
+
+    def release(self, node: ComfyNode):
+        """Drops a dispatch that will never be collected (batch aborted), without counting a failure."""
+        with self._lock:
+            node.in_flight = max(0, node.in_flight - 1)
+
+    def stats(self) -> dict:
+        return {n.address: n.stats() for n in self.nodes}
+
+    def print_stats(self):
+        for address, s in self.stats().items():
+            print(f"[*] ComfyUI Pool: {address} | done={s['completed']} failed={s['failed']} "
+                  f"| avg={s['avg_sec']}s p95={s['p95_sec']}s | queue={s['queue_depth']}")
+
+    def close(self):
+        for node in self.nodes:
+            node.client.close()
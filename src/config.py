@@ -31,6 +31,9 @@ FONT_PATH = "arial.ttf" # Placeholder, ensure this exists or use system font
 IMAGE_BACKEND = os.getenv("IMAGE_BACKEND", "openai") # 'openai' or 'comfyui'
 CAPTION_BACKEND = os.getenv("CAPTION_BACKEND", "whisper") # 'whisper' (local) or 'openai_api' (not impl yet)
 
+# Render Config
+SHARED_VISUAL_TRACK = os.getenv("SHARED_VISUAL_TRACK", "1") == "1" # Encode Ken Burns layer once per job, reuse for A/B
+
 # DIRS
 TEMP_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), "assets", "temp")
 OUTPUT_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)))
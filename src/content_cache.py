@@ -0,0 +1,93 @@
+import hashlib
+import json
+import os
+import shutil
+import threading
+import uuid
+
+class ContentCache:
+    """
+    On-disk content-addressed file store with size-bounded LRU eviction.
+    Entries live at <root>/<key[:2]>/<key><ext>; a file's mtime is its recency (touched on every hit).
+    """
+    def __init__(self, root: str, max_bytes: int, ext: str = ""):
+        self.root = root
+        self.max_bytes = max_bytes
+        self.ext = ext
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+        os.makedirs(root, exist_ok=True)
+        self._size = sum(size for _, size, _ in self._entries())
+
+    @staticmethod
+    def key_for(obj) -> str:
+        """Canonical hash: key order and whitespace never change the key."""
+        canonical = json.dumps(obj, sort_keys=True, separators=(",", ":"), ensure_ascii=False)
+        return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+    def path_for(self, key: str) -> str:
+        return os.path.join(self.root, key[:2], key + self.ext)
+
+    def fetch(self, key: str, dst_path: str) -> bool:
+        """Copies the cached entry to dst_path. Returns False on a miss."""
+        path = self.path_for(key)
+        try:
+            shutil.copyfile(path, dst_path)
+            os.utime(path)
+        except FileNotFoundError:
+            with self._lock:
+                self.misses += 1
+            return False
+        with self._lock:
+            self.hits += 1
+        return True
+
+    def store(self, key: str, src_path: str):
+        path = self.path_for(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # Copy then rename so concurrent readers (or processes) never see a partial file
+        tmp_path = f"{path}.{uuid.uuid4().hex}.tmp"
+        shutil.copyfile(src_path, tmp_path)
+        os.replace(tmp_path, path)
+        with self._lock:
+            self._size += os.path.getsize(path)
+            if self._size > self.max_bytes:
+                self._evict()
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "bytes": self._size,
+            "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+        }
+
+    def _evict(self):
+        # Rescan: other processes may share the directory
+        entries = sorted(self._entries(), key=lambda e: e[2])
+        self._size = sum(size for _, size, _ in entries)
+        for path, size, _ in entries:
+            if self._size <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            self._size -= size
+            self.evictions += 1
+
+    def _entries(self):
+        for dirpath, _, filenames in os.walk(self.root):
+            for name in filenames:
+                if name.endswith(".tmp"):
+                    continue
+                path = os.path.join(dirpath, name)
+                try:
+                    st = os.stat(path)
+                except FileNotFoundError:
+                    continue
+                yield path, st.st_size, st.st_mtime
@@ -1,17 +1,27 @@
 import os
 import random
-import whisper
 from moviepy.editor import *
 from moviepy.video.tools.subtitles import SubtitlesClip
 from .config import VIDEO_WIDTH, VIDEO_HEIGHT
+from .model_registry import MODELS
+
+WHISPER_MODEL = "base"
 
 class VideoEditor:
     def __init__(self):
-        self.model = whisper.load_model("base")
         self.resolution = (VIDEO_WIDTH, VIDEO_HEIGHT)
 
+    @property
+    def model(self):
+        """openai-whisper model, loaded on first access and shared across editors in the process."""
+        def load():
+            import whisper
+            return whisper.load_model(WHISPER_MODEL)
+        return MODELS.get(f"openai-whisper:{WHISPER_MODEL}", load)
+
     def assemble_video(self, image_paths: list, audio_path: str, output_path: str, 
-                      music_mood: str, caption_style: dict, script_data: dict = None, audio_metadata: list = None):
+                      music_mood: str, caption_style: dict, script_data: dict = None, audio_metadata: list = None,
+                      visual_track: str = None):
         print(f"[*] Editor: Assembling video with mood '{music_mood}'...")
         
         # 1. Voice
@@ -19,10 +29,16 @@ class VideoEditor:
         duration = voice_clip.duration
         
         # 2. Visuals (Ken Burns)
-        print("[*] Editor: Applying Ken Burns effect...")
-        per_img_duration = duration / len(image_paths)
-        video_clips = [self._ken_burns(img, per_img_duration) for img in image_paths]
-        final_video = concatenate_videoclips(video_clips, method="compose")
+        track_clip = None
+        if visual_track and os.path.exists(visual_track):
+            # Shared track from render_visual_track: only audio + captions are composed per variant.
+            # Retimed to this voiceover so every image holds duration / len(images), as in a standalone render.
+            print(f"[*] Editor: Reusing shared visual track '{os.path.basename(visual_track)}'...")
+            track_clip = VideoFileClip(visual_track, audio=False)
+            final_video = track_clip.fx(vfx.speedx, final_duration=duration)
+        else:
+            print("[*] Editor: Applying Ken Burns effect...")
+            final_video = self._build_visual_track(image_paths, duration)
         final_video = final_video.set_audio(voice_clip)
 
         # 3. Music (Ducking)
@@ -60,15 +76,51 @@ class VideoEditor:
 
         # 5. Export
         print(f"[*] Editor: Rendering to {output_path} (High Quality 5000k)...")
-        final_video.write_videofile(
-            output_path, 
-            fps=24, 
-            codec="libx264", 
-            audio_codec="aac",
-            bitrate="5000k",  # PATCH 10: High Bitrate
-            threads=1,        # PATCH 10: Memory Safety
-            preset='ultrafast'
+        try:
+            final_video.write_videofile(
+                output_path, 
+                fps=24, 
+                codec="libx264", 
+                audio_codec="aac",
+                bitrate="5000k",  # PATCH 10: High Bitrate
+                threads=1,        # PATCH 10: Memory Safety
+                preset='ultrafast'
+            )
+        finally:
+            if track_clip is not None:
+                track_clip.close()
+
+    def render_visual_track(self, image_paths: list, audio_paths: list, output_path: str) -> str:
+        """
+        Encodes the Ken Burns layer once per job as a silent intermediate.
+        The track spans the longest voiceover; assemble_video retimes it to each variant's length,
+        so a shorter variant still shows every scene.
+        """
+        duration = 0.0
+        for path in audio_paths:
+            clip = AudioFileClip(path)
+            duration = max(duration, clip.duration)
+            clip.close()
+
+        print(f"[*] Editor: Rendering shared visual track ({duration:.1f}s) to {output_path}...")
+        track = self._build_visual_track(image_paths, duration)
+        track.write_videofile(
+            output_path,
+            fps=24,
+            codec="libx264",
+            audio=False,
+            preset='ultrafast',
+            threads=1,
+            ffmpeg_params=["-crf", "12"],  # Near-lossless: this gets re-encoded per variant
+            verbose=False,
+            logger=None
         )
+        return output_path
+
+    def _build_visual_track(self, image_paths: list, duration: float):
+        per_img_duration = duration / len(image_paths)
+        video_clips = [self._ken_burns(img, per_img_duration) for img in image_paths]
+        return concatenate_videoclips(video_clips, method="compose")
 
     def _ken_burns(self, img_path: str, duration: float):
         # Randomize movement: sometimes zoom IN, sometimes zoom OUT, sometimes PAN
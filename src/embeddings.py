@@ -0,0 +1,117 @@
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from array import array
+
+EMBEDDING_MODEL = os.getenv("EMBEDDING_MODEL", "text-embedding-3-small")
+EMBEDDING_CACHE_PATH = os.getenv("EMBEDDING_CACHE_PATH", os.path.join(os.path.dirname(os.path.dirname(__file__)), "assets", "cache", "embeddings.sqlite"))
+EMBED_BATCH_SIZE = 64
+# Least recently used vectors are evicted past this many rows (one-off draft scripts would otherwise pile up)
+EMBEDDING_CACHE_MAX_ROWS = int(os.getenv("EMBEDDING_CACHE_MAX_ROWS", "20000"))
+
+class EmbeddingCache:
+    """
+    Persistent text -> embedding store (SQLite, float32 blobs).
+    Keyed by sha256(model + text), so a model change never returns stale vectors.
+    Holds at most max_rows vectors; the least recently used ones are evicted first.
+    """
+    def __init__(self, path: str, model: str = EMBEDDING_MODEL, max_rows: int = EMBEDDING_CACHE_MAX_ROWS):
+        self.path = path
+        self.model = model
+        self.max_rows = max_rows
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        with self._connect() as conn:
+            conn.execute("CREATE TABLE IF NOT EXISTS embeddings (key TEXT PRIMARY KEY, model TEXT, vector BLOB, last_used REAL)")
+            columns = [row[1] for row in conn.execute("PRAGMA table_info(embeddings)")]
+            if "last_used" not in columns:
+                # Caches written before eviction existed: treat every row as equally old
+                conn.execute("ALTER TABLE embeddings ADD COLUMN last_used REAL DEFAULT 0")
+
+    def _connect(self):
+        return sqlite3.connect(self.path, timeout=30)
+
+    def key_for(self, text: str) -> str:
+        return hashlib.sha256(f"{self.model}\n{text}".encode("utf-8")).hexdigest()
+
+    def embed(self, texts: list, embed_fn) -> list:
+        """
+        Returns one vector per text. Misses are sent to embed_fn(list[str]) -> list[vector]
+        in batches of EMBED_BATCH_SIZE and written back; hits never touch the API.
+        """
+        keys = [self.key_for(t) for t in texts]
+        found = self._load(set(keys))
+        missing = list(dict.fromkeys(k for k in keys if k not in found))
+        with self._lock:
+            self.hits += sum(1 for k in keys if k in found)
+            self.misses += len(missing)
+
+        if missing:
+            text_for = dict(zip(keys, texts))
+            for start in range(0, len(missing), EMBED_BATCH_SIZE):
+                chunk = missing[start:start + EMBED_BATCH_SIZE]
+                vectors = embed_fn([text_for[k] for k in chunk])
+                new = dict(zip(chunk, vectors))
+                self._save(new)
+                found.update(new)
+
+        return [list(found[k]) for k in keys]
+
+    def stats(self) -> dict:
+        return {"hits": self.hits, "misses": self.misses, "evictions": self.evictions}
+
+    def _load(self, keys: set) -> dict:
+        if not keys:
+            return {}
+        out = {}
+        keys = list(keys)
+        with self._connect() as conn:
+            # Stay under SQLite's bound-parameter limit
+            for start in range(0, len(keys), 500):
+                chunk = keys[start:start + 500]
+                rows = conn.execute(
+                    f"SELECT key, vector FROM embeddings WHERE key IN ({','.join('?' * len(chunk))})", chunk
+                ).fetchall()
+                for key, blob in rows:
+                    out[key] = array("f", blob).tolist()
+                if rows:
+                    conn.execute(f"UPDATE embeddings SET last_used = ? WHERE key IN ({','.join('?' * len(rows))})",
+                                 [time.time()] + [key for key, _ in rows])
+        return out
+
+    def _save(self, vectors: dict):
+        now = time.time()
+        with self._connect() as conn:
+            conn.executemany(
+                "INSERT OR REPLACE INTO embeddings (key, model, vector, last_used) VALUES (?, ?, ?, ?)",
+                [(k, self.model, array("f", v).tobytes(), now) for k, v in vectors.items()],
+            )
+            self._evict(conn)
+
+    def _evict(self, conn):
+        excess = conn.execute("SELECT COUNT(*) FROM embeddings").fetchone()[0] - self.max_rows
+        if excess <= 0:
+            return
+        conn.execute("DELETE FROM embeddings WHERE key IN (SELECT key FROM embeddings ORDER BY last_used LIMIT ?)", (excess,))
+        with self._lock:
+            self.evictions += excess
+
+_CACHE = None
+
+def get_embedding_cache() -> EmbeddingCache:
+    global _CACHE
+    if _CACHE is None:
+        _CACHE = EmbeddingCache(EMBEDDING_CACHE_PATH)
+    return _CACHE
+
+def openai_embed_fn(client, model: str = EMBEDDING_MODEL):
+    """Batched embeddings call for EmbeddingCache.embed (newlines flattened as before)."""
+    def embed(texts: list) -> list:
+        response = client.embeddings.create(input=[t.replace("\n", " ") for t in texts], model=model)
+        return [d.embedding for d in sorted(response.data, key=lambda d: d.index)]
+    return embed
@@ -0,0 +1,134 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+
+from .content_cache import ContentCache
+
+LLM_CACHE_ENABLED = os.getenv("LLM_CACHE", "1") == "1"
+LLM_CACHE_PATH = os.getenv("LLM_CACHE_PATH", os.path.join(os.path.dirname(os.path.dirname(__file__)), "assets", "cache", "llm.sqlite"))
+LLM_CACHE_TTL_HOURS = float(os.getenv("LLM_CACHE_TTL_HOURS", "168"))
+LLM_CACHE_MAX_MB = int(os.getenv("LLM_CACHE_MAX_MB", "64"))
+
+# Request kwargs that change transport behaviour but not the completion itself
+_TRANSPORT_KWARGS = {"timeout", "extra_headers", "extra_query", "extra_body", "stream"}
+
+class LLMResponseCache:
+    """
+    On-disk chat-completion cache (SQLite). Entries expire after ttl_sec and the least recently
+    used ones are evicted once the store grows past max_bytes.
+    """
+    def __init__(self, path: str, ttl_sec: float, max_bytes: int):
+        self.path = path
+        self.ttl_sec = ttl_sec
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        with self._connect() as conn:
+            conn.execute("CREATE TABLE IF NOT EXISTS responses (key TEXT PRIMARY KEY, body TEXT, size INTEGER, "
+                         "created_at REAL, last_used REAL)")
+
+    def _connect(self):
+        return sqlite3.connect(self.path, timeout=30)
+
+    @staticmethod
+    def key_for(request: dict) -> str:
+        """Covers model, messages, response_format and any sampling params; ignores timeouts/headers."""
+        return ContentCache.key_for({k: v for k, v in request.items() if k not in _TRANSPORT_KWARGS})
+
+    def get(self, key: str):
+        now = time.time()
+        with self._connect() as conn:
+            row = conn.execute("SELECT body, created_at FROM responses WHERE key = ?", (key,)).fetchone()
+            if row and now - row[1] > self.ttl_sec:
+                conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+                row = None
+            if row:
+                conn.execute("UPDATE responses SET last_used = ? WHERE key = ?", (now, key))
+        with self._lock:
+            if row:
+                self.hits += 1
+            else:
+                self.misses += 1
+        return json.loads(row[0]) if row else None
+
+    def put(self, key: str, body: dict):
+        text = json.dumps(body)
+        now = time.time()
+        with self._connect() as conn:
+            conn.execute("INSERT OR REPLACE INTO responses (key, body, size, created_at, last_used) VALUES (?, ?, ?, ?, ?)",
+                         (key, text, len(text), now, now))
+            self._evict(conn, now)
+
+    def _evict(self, conn, now: float):
+        conn.execute("DELETE FROM responses WHERE created_at < ?", (now - self.ttl_sec,))
+        total = conn.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        for key, size in conn.execute("SELECT key, size FROM responses ORDER BY last_used").fetchall():
+            if total <= self.max_bytes:
+                break
+            conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+            total -= size
+            with self._lock:
+                self.evictions += 1
+
+    def stats(self) -> dict:
+        return {"hits": self.hits, "misses": self.misses, "evictions": self.evictions}
+
+class CachedOpenAI:
+    """
+    Drop-in wrapper for an OpenAI client: chat.completions.create(..., cache=True) serves repeats
+    of an identical request from the cache. Pass cache=False for prompts that must stay stochastic.
+    Everything else (embeddings, ...) is forwarded to the wrapped client untouched.
+    """
+    def __init__(self, client, cache: LLMResponseCache = None):
+        self._client = client
+        self._cache = cache
+        self.chat = _Namespace(completions=_Namespace(create=self._create))
+
+    def __getattr__(self, name):
+        return getattr(self._client, name)
+
+    def _create(self, cache: bool = True, **kwargs):
+        if not cache or self._cache is None or kwargs.get("stream"):
+            return self._client.chat.completions.create(**kwargs)
+
+        key = LLMResponseCache.key_for(kwargs)
+        body = self._cache.get(key)
+        if body is not None:
+            from openai.types.chat import ChatCompletion
+            completion = ChatCompletion.model_validate(body)
+            completion._cache_hit = True
+            return completion
+
+        response = self._client.chat.completions.create(**kwargs)
+        if hasattr(response, "model_dump"):
+            self._cache.put(key, response.model_dump(mode="json"))
+        return response
+
+def served_from_cache(response) -> bool:
+    """True if a CachedOpenAI call returned this response from the on-disk cache."""
+    return getattr(response, "_cache_hit", False) is True
+
+class _Namespace:
+    def __init__(self, **attrs):
+        self.__dict__.update(attrs)
+
+_CACHE = None
+
+def get_llm_cache():
+    global _CACHE
+    if not LLM_CACHE_ENABLED:
+        return None
+    if _CACHE is None:
+        _CACHE = LLMResponseCache(LLM_CACHE_PATH, LLM_CACHE_TTL_HOURS * 3600, LLM_CACHE_MAX_MB * 1024 * 1024)
+    return _CACHE
+
+def cached_client(client) -> CachedOpenAI:
+    """Wraps client with the shared on-disk cache (a plain pass-through when LLM_CACHE=0)."""
+    return CachedOpenAI(client, get_llm_cache())
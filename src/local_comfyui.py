@@ -1,13 +1,21 @@
 import json
-import urllib.request
-import urllib.parse
 import time
 import os
 import random
+import uuid
+import queue
+import threading
+from .comfy_events import ComfyEventListener
+from .comfy_pool import ComfyUIPool
+from .content_cache import ContentCache
+from .transport import get_transport
 
 SERVER_ADDRESS = "127.0.0.1:8188"
 CLIENT_ID = "prometheus_local"
 
+# Image box pool: comma-separated host:port list, dispatch is queue-depth aware
+SERVER_ADDRESSES = [a.strip() for a in os.getenv("COMFY_SERVERS", SERVER_ADDRESS).split(",") if a.strip()]
+
 # HARD LOCK CONFIGURATION
 DEFAULT_MODEL = "Juggernaut-XL_v9_RunDiffusionPhoto_v2.safetensors"
 DEFAULT_WIDTH = 512
@@ -16,6 +24,23 @@ DEFAULT_STEPS = 25
 DEFAULT_CFG = 6
 DEFAULT_SAMPLER = "euler"
 
+# Submit every scene up front so the sampler never idles on HTTP round-trips
+PIPELINE_MODE = os.getenv("COMFY_PIPELINE", "1") == "1"
+
+# Completion tracking: /ws event stream, history polling with backoff as fallback
+USE_WEBSOCKET = os.getenv("COMFY_WEBSOCKET", "1") == "1"
+WS_RECHECK_SEC = 30
+WS_RECONNECT_SEC = 30 # A dropped/failed /ws is retried at most this often (ComfyUI restarts)
+POLL_MIN_DELAY = 0.25
+POLL_MAX_DELAY = 4.0
+STALL_TIMEOUT_SEC = int(os.getenv("COMFY_STALL_TIMEOUT_SEC", "900")) # No completion for this long = node failed
+MAX_NODE_ATTEMPTS = 3 # Per scene, each attempt on a different node
+
+# Content-addressed image cache: identical workflows (model, prompts, res, steps, cfg, sampler, seed) skip the GPU
+IMAGE_CACHE_ENABLED = os.getenv("IMAGE_CACHE", "1") == "1"
+IMAGE_CACHE_DIR = os.getenv("IMAGE_CACHE_DIR", os.path.join(os.path.dirname(os.path.dirname(__file__)), "assets", "cache", "images"))
+IMAGE_CACHE_MAX_MB = int(os.getenv("IMAGE_CACHE_MAX_MB", "2048"))
+
 def _check_model_activation():
     """Step 7: Activation Check on Startup (Real FS Check)"""
     required_model = DEFAULT_MODEL
@@ -50,14 +75,39 @@ def _check_backend_compliance(client, width, height):
     except:
         pass
 
-def generate_images(job_id: str, prompts: list[str], negative: str, out_dir: str, cfg: dict = None) -> list[str]:
+def generate_images(job_id: str, prompts: list[str], negative: str, out_dir: str, cfg: dict = None,
+                    indices: list[int] = None, filenames: list[str] = None) -> list[str]:
     """
     Generates images locally via ComfyUI.
-    Returns list of absolute paths to generated images.
+    Returns list of absolute paths to generated images (aligned with prompts).
+    indices: scene index of each prompt (drives seed + default name scene_XX.png); defaults to 0..N-1.
+    filenames: explicit output file names, overriding the scene_XX.png default.
     STRICT LOCAL MODE: No Fallback.
     """
-    client = ComfyUIClient(SERVER_ADDRESS)
-    generated_paths = []
+    return queue_images(job_id, prompts, negative, out_dir, cfg, indices=indices, filenames=filenames).collect()
+
+def queue_images(job_id: str, prompts: list[str], negative: str, out_dir: str, cfg: dict = None,
+                 client: "ComfyUIClient" = None, pipelined: bool = None, pool: ComfyUIPool = None,
+                 cache: ContentCache = None, indices: list[int] = None, filenames: list[str] = None) -> "ComfyBatch":
+    """
+    Submits every scene workflow to the ComfyUI queue(s) up front.
+    Call .collect() on the returned batch to download results in scene order.
+    Scenes already in the image cache are copied into place and never queued.
+    Pass cache=False to bypass the cache.
+    """
+    if pool is None:
+        pool = ComfyUIPool([client]) if client else get_pool()
+    pool.refresh()
+    if cache is None:
+        cache = get_image_cache()
+    if indices is None:
+        indices = list(range(len(prompts)))
+    if filenames is None:
+        filenames = [f"scene_{idx + 1:02d}.png" for idx in indices]
+    if len(indices) != len(prompts) or len(filenames) != len(prompts):
+        raise ValueError("indices/filenames must match prompts one-to-one")
+    if pipelined is None:
+        pipelined = PIPELINE_MODE
     
     # 7) ACTIVATION CHECK (Fast)
     # We assume 'revAnimated_v122EOL.safetensors' is available per Step 1 & 7.
@@ -72,132 +122,338 @@ def generate_images(job_id: str, prompts: list[str], negative: str, out_dir: str
     sampler = DEFAULT_SAMPLER
     
     # TASK 4: BACKEND CHECK
-    _check_backend_compliance(client, width, height)
+    _check_backend_compliance(pool.nodes[0].client, width, height)
     
     # 1) HARD-LOCK THE MODEL
     model_name = DEFAULT_MODEL
     
-    print(f"[*] ComfyUI: Starting batch of {len(prompts)} images using '{model_name}'...")
+    mode = "pipelined" if pipelined else "sequential"
+    print(f"[*] ComfyUI: Starting batch of {len(prompts)} images using '{model_name}' ({mode})...")
     print(f"[*] Visual Debug: Res={width}x{height} | Steps={steps} | CFG={cfg_scale} | Sampler={sampler}")
     print(f"[*] Visual Debug: Negative Prompt: {negative[:100]}...")
 
     # 2) CONSISTENT SEED ENGINE
     # User Spec: base_seed = random.randint(1, 10_000_000)
     # scene_seed = base_seed + (scene_index * 1000)
-    base_seed = random.randint(1, 10_000_000)
+    # A caller-supplied base_seed makes re-runs reproducible (and cacheable)
+    base_seed = (cfg or {}).get("base_seed") or random.randint(1, 10_000_000)
     print(f"[*] Visual Debug: Base Seed: {base_seed}")
 
-    for idx, prompt_text in enumerate(prompts):
-        scene_num = idx + 1
-        filename_prefix = f"{job_id}_scene_{scene_num:02d}"
+    batch = ComfyBatch(pool, len(prompts), cache=cache or None)
+
+    try:
+        for slot, (idx, prompt_text, filename) in enumerate(zip(indices, prompts, filenames)):
+            scene_num = idx + 1
+            filename_prefix = f"{job_id}_scene_{scene_num:02d}"
         
-        # Deterministic seed variation
-        seed = base_seed + (idx * 1000)
+            # Deterministic seed variation
+            seed = base_seed + (idx * 1000)
         
-        print(f"[*] Visual Debug: Scene {scene_num} Seed: {seed}")
-        print(f"[*] Visual Debug: Prompt: {prompt_text[:100]}...")
+            print(f"[*] Visual Debug: Scene {scene_num} Seed: {seed}")
+            print(f"[*] Visual Debug: Prompt: {prompt_text[:100]}...")
         
-        # 1. Build Workflow
-        workflow = _build_workflow(
-            model_name=model_name,
-            positive=prompt_text,
-            negative=negative,
-            width=width,
-            height=height,
-            steps=steps,
-            cfg=cfg_scale,
-            seed=seed,
-            filename_prefix=filename_prefix,
-            sampler_name=sampler
-        )
+            # 1. Build Workflow
+            workflow = _build_workflow(
+                model_name=model_name,
+                positive=prompt_text,
+                negative=negative,
+                width=width,
+                height=height,
+                steps=steps,
+                cfg=cfg_scale,
+                seed=seed,
+                filename_prefix=filename_prefix,
+                sampler_name=sampler
+            )
         
-        # 2. Queue
-        try:
-            print(f"[*] ComfyUI: Queueing Scene {scene_num}...")
-            response = client.queue_prompt(workflow)
-            if not response:
-                print(f"[!] FATAL: ComfyUI Failed to queue Scene {scene_num}")
-                raise RuntimeError("ComfyUI Queue Failed")
-                
-            prompt_id = response['prompt_id']
-            
-            # 3. Poll
-            history = client.wait_for_prompt(prompt_id)
+            # 2. Queue (collection happens in ComfyBatch.collect)
+            dst_path = os.path.join(out_dir, filename)
+            cache_key = workflow_cache_key(workflow)
+            if batch.cache and batch.cache.fetch(cache_key, dst_path):
+                print(f"[*] ComfyUI: Scene {scene_num} served from image cache -> {dst_path}")
+                batch.paths[slot] = dst_path
+                continue
+            batch.submit(slot, workflow, dst_path, cache_key=cache_key, scene_num=scene_num)
+        
+            if not pipelined:
+                batch.collect()
+    except BaseException:
+        # A scene failed to queue: the ones already queued will never be collected
+        batch.abort()
+        raise
             
-            # 4. Download
-            outputs = history[prompt_id]['outputs']
-            image_data = None
+    return batch
+
+class ComfyBatch:
+    """
+    Scene workflows queued across the ComfyUI pool.
+    Completions arrive out of order and are mapped back to their scene index;
+    a scene that fails on one node is re-queued on another.
+    """
+    def __init__(self, pool: ComfyUIPool, size: int, cache: ContentCache = None):
+        self.pool = pool
+        self.cache = cache
+        self.paths = [None] * size
+        self.pending = {}  # (node address, prompt_id) -> job
+        self._results = queue.Queue()
+
+    def submit(self, index: int, workflow: dict, dst_path: str, tried: set = None, cache_key: str = None,
+               scene_num: int = None) -> tuple:
+        """index is the slot in self.paths; scene_num is only used for logging."""
+        scene_num = scene_num or index + 1
+        tried = set(tried or ())
+        while len(tried) < MAX_NODE_ATTEMPTS:
+            node = self.pool.pick(exclude=tried)
+            if node is None:
+                break
+            print(f"[*] ComfyUI: Queueing Scene {scene_num} on {node.address}...")
+            response = node.client.queue_prompt(workflow)
+            if response:
+                key = (node.address, response['prompt_id'])
+                self.pending[key] = {
+                    "index": index, "scene_num": scene_num, "dst_path": dst_path, "workflow": workflow, "cache_key": cache_key,
+                    "node": node, "tried": tried | {node.address}, "submitted_at": time.time()
+                }
+                return key
+            self.pool.record_failure(node)
+            tried.add(node.address)
+        
+        print(f"[!] FATAL: ComfyUI Failed to queue Scene {scene_num}")
+        raise RuntimeError("Strict Local Mode Validation Failed: ComfyUI Queue Failed")
+
+    def collect(self) -> list[str]:
+        if not self.pending:
+            return self.paths
+        print(f"[*] ComfyUI: Collecting {len(self.pending)} queued images...")
+        
+        # One waiter per node; each streams completions back to this thread
+        by_node = {}
+        for key, job in self.pending.items():
+            by_node.setdefault(job["node"].address, (job["node"], []))[1].append(key[1])
+        for node, prompt_ids in by_node.values():
+            self._spawn_waiter(node, prompt_ids)
+        
+        try:
+            while self.pending:
+                node, prompt_id, history, leftovers = self._results.get()
+                if prompt_id is None:
+                    # Waiter gave up (stalled node): re-route whatever it still owed
+                    for pid in leftovers:
+                        job = self.pending.pop((node.address, pid), None)
+                        if job:
+                            self._retry(job, f"no completion from {node.address} in {STALL_TIMEOUT_SEC}s")
+                    continue
             
-            for node_id, node_output in outputs.items():
-                if 'images' in node_output:
-                    for img_info in node_output['images']:
-                        fname = img_info['filename']
-                        subfolder = img_info['subfolder']
-                        type_ = img_info['type']
-                        
-                        raw_bytes = client.get_image(fname, subfolder, type_)
-                        image_data = raw_bytes
-                        break
-                if image_data: break
+                job = self.pending.pop((node.address, prompt_id), None)
+                if job is None:
+                    continue
+                scene_num = job["scene_num"]
+                try:
+                    # 4. Download
+                    image_data = self._download_first_image(node.client, history[prompt_id]['outputs'])
+                    if not image_data:
+                        print(f"[!] Generated but no image found for Scene {scene_num} on {node.address}")
+                        raise RuntimeError("ComfyUI Image Generation Failed - No Output")
+                
+                    with open(job["dst_path"], 'wb') as f:
+                        f.write(image_data)
+                except Exception as e:
+                    self._retry(job, e)
+                    continue
             
-            if image_data:
-                dst_filename = f"scene_{scene_num:02d}.png"
-                dst_path = os.path.join(out_dir, dst_filename)
-                with open(dst_path, 'wb') as f:
-                    f.write(image_data)
-                generated_paths.append(dst_path)
-                print(f"[*] ComfyUI: Downloaded & Saved -> {dst_path}")
-            else:
-                print(f"[!] FATAL: Generated but no image found for Scene {scene_num}")
-                raise RuntimeError("ComfyUI Image Generation Failed - No Output")
+                self.pool.record_success(node, time.time() - job["submitted_at"])
+                self.paths[job["index"]] = job["dst_path"]
+                print(f"[*] ComfyUI: Downloaded & Saved -> {job['dst_path']}")
+                if self.cache and job["cache_key"]:
+                    self.cache.store(job["cache_key"], job["dst_path"])
+        finally:
+            # Raised mid-batch (fatal retry, stall): release every prompt we'll never collect
+            self.abort()
+        
+        if len(self.pool.nodes) > 1:
+            self.pool.print_stats()
+        if self.cache:
+            stats = self.cache.stats()
+            print(f"[*] Image Cache: {stats['hits']} hits / {stats['misses']} misses | {stats['bytes'] // (1024 * 1024)}MB")
+        return self.paths
 
-        except Exception as e:
-            print(f"[!] FATAL ComfyUI Error Scene {scene_num}: {e}")
+    def abort(self):
+        """Gives up on every prompt still pending, releasing its dispatch slot in the pool."""
+        for job in self.pending.values():
+            self.pool.release(job["node"])
+        self.pending.clear()
+
+    def _retry(self, job: dict, reason):
+        scene_num = job["scene_num"]
+        self.pool.record_failure(job["node"])
+        print(f"[!] ComfyUI Error Scene {scene_num} on {job['node'].address}: {reason}")
+        try:
+            key = self.submit(job["index"], job["workflow"], job["dst_path"], tried=job["tried"],
+                              cache_key=job["cache_key"], scene_num=scene_num)
+        except RuntimeError as e:
+            print(f"[!] FATAL ComfyUI Error Scene {scene_num}: {reason}")
             # 6) STRICT LOCAL MODE: If ComfyUI fails, throw a fatal error and discard the job.
-            raise RuntimeError(f"Strict Local Mode Validation Failed: {e}")
-            
-    return generated_paths
+            raise RuntimeError(f"Strict Local Mode Validation Failed: {reason}") from e
+        self._spawn_waiter(self.pending[key]["node"], [key[1]])
+
+    def _spawn_waiter(self, node, prompt_ids: list):
+        def wait():
+            remaining = list(prompt_ids)
+            try:
+                for prompt_id, history in node.client.wait_for_prompts(prompt_ids, stall_timeout=STALL_TIMEOUT_SEC):
+                    remaining.remove(prompt_id)
+                    self._results.put((node, prompt_id, history, None))
+            except Exception as e:
+                print(f"[!] ComfyUI: Waiter for {node.address} crashed: {e}")
+            if remaining:
+                self._results.put((node, None, None, remaining))
+        threading.Thread(target=wait, name=f"comfy-wait-{node.address}", daemon=True).start()
+
+    def _download_first_image(self, client: "ComfyUIClient", outputs: dict):
+        for node_id, node_output in outputs.items():
+            for img_info in node_output.get('images', []):
+                return client.get_image(img_info['filename'], img_info['subfolder'], img_info['type'])
+        return None
+
+_POOL = None
+
+def get_pool() -> ComfyUIPool:
+    """Process-wide pool over SERVER_ADDRESSES; latency stats accumulate across jobs."""
+    global _POOL
+    if _POOL is None:
+        _POOL = ComfyUIPool([ComfyUIClient(a) for a in SERVER_ADDRESSES])
+    return _POOL
+
+def pool_stats() -> dict:
+    return get_pool().stats()
+
+_IMAGE_CACHE = None
+
+def get_image_cache():
+    global _IMAGE_CACHE
+    if not IMAGE_CACHE_ENABLED:
+        return None
+    if _IMAGE_CACHE is None:
+        _IMAGE_CACHE = ContentCache(IMAGE_CACHE_DIR, IMAGE_CACHE_MAX_MB * 1024 * 1024, ext=".png")
+    return _IMAGE_CACHE
+
+def workflow_cache_key(workflow: dict) -> str:
+    """Hash of everything that determines the pixels; the SaveImage filename prefix is job-specific."""
+    canonical = json.loads(json.dumps(workflow))
+    for node in canonical.values():
+        node.get("inputs", {}).pop("filename_prefix", None)
+    return ContentCache.key_for(canonical)
 
 class ComfyUIClient:
     def __init__(self, server_address):
         self.server_address = server_address
+        # Unique per client: ComfyUI routes /ws events by clientId and a reused id steals the socket
+        self.client_id = f"{CLIENT_ID}_{uuid.uuid4().hex[:8]}"
+        self.listener = None
+        self._listener_started = 0.0
 
     def queue_prompt(self, prompt_workflow: dict):
-        p = {"prompt": prompt_workflow, "client_id": CLIENT_ID}
-        data = json.dumps(p).encode('utf-8')
-        req = urllib.request.Request(f"http://{self.server_address}/prompt", data=data)
+        # Subscribe before the first queue so no completion event can be missed
+        self._ensure_listener()
+        p = {"prompt": prompt_workflow, "client_id": self.client_id}
         try:
-            with urllib.request.urlopen(req) as response:
-                return json.loads(response.read())
+            # POST: only retried when ComfyUI never saw it (429/refused), so a prompt is never queued twice
+            response = get_transport().post(f"http://{self.server_address}/prompt", json=p)
+            response.raise_for_status()
+            return response.json()
         except Exception as e:
             print(f"[!] ComfyUI Queue Error: {e}")
             return None
 
+    def get_history(self, prompt_id: str) -> dict:
+        try:
+            # The wait loop already polls with backoff, so no transport-level retries here
+            response = get_transport().get(f"http://{self.server_address}/history/{prompt_id}", retries=0)
+            response.raise_for_status()
+            return response.json()
+        except Exception:
+            return {}
+
     def wait_for_prompt(self, prompt_id: str):
-        print(f"[*] ComfyUI: Waiting for Job {prompt_id}...", end="", flush=True)
-        wait_count = 0
-        while True:
-            try:
-                with urllib.request.urlopen(f"http://{self.server_address}/history/{prompt_id}") as response:
-                    history = json.loads(response.read())
-                    if prompt_id in history:
-                        print(" Done!")
-                        return history
-            except Exception:
-                pass
+        for _, history in self.wait_for_prompts([prompt_id]):
+            return history
+
+    def get_queue(self) -> dict:
+        # Fail fast: the pool routes around a node that doesn't answer
+        response = get_transport().get(f"http://{self.server_address}/queue", timeout=5, retries=0)
+        response.raise_for_status()
+        return response.json()
+
+    def get_system_stats(self) -> dict:
+        response = get_transport().get(f"http://{self.server_address}/system_stats", timeout=5, retries=0)
+        response.raise_for_status()
+        return response.json()
+
+    def wait_for_prompts(self, prompt_ids: list, stall_timeout: float = None):
+        """
+        Yields (prompt_id, history) as each prompt finishes, in completion order.
+        Uses the /ws completion stream when connected, history polling with backoff otherwise.
+        Stops early if nothing finishes for stall_timeout seconds.
+        """
+        pending = list(prompt_ids)
+        last_progress = time.time()
+        print(f"[*] ComfyUI: Waiting for {len(pending)} Jobs...", end="", flush=True)
+        delay = POLL_MIN_DELAY
+        while pending:
+            if self.listener and self.listener.connected:
+                # Re-check history now and then in case an event was dropped
+                candidates = self.listener.wait_any(pending, timeout=WS_RECHECK_SEC) or list(pending)
+            else:
+                candidates = list(pending)
+
+            progressed = False
+            for prompt_id in candidates:
+                history = self.get_history(prompt_id)
+                if prompt_id in history:
+                    pending.remove(prompt_id)
+                    progressed = True
+                    last_progress = time.time()
+                    print(f" [{len(prompt_ids) - len(pending)}/{len(prompt_ids)}]", end="", flush=True)
+                    yield prompt_id, history
             
-            # Print dot every 2 seconds
-            if wait_count % 2 == 0:
-                print(".", end="", flush=True)
-                
-            time.sleep(1)
-            wait_count += 1
+            if not pending:
+                continue
+            if stall_timeout and time.time() - last_progress > stall_timeout:
+                print(f" Stalled ({len(pending)} left)!")
+                return
+            if self.listener and self.listener.connected:
+                if not progressed:
+                    time.sleep(POLL_MIN_DELAY)  # The event can land just before history is written
+                continue
+
+            # Polling fallback: back off while nothing finishes, reset on progress
+            delay = POLL_MIN_DELAY if progressed else min(delay * 2, POLL_MAX_DELAY)
+            print(".", end="", flush=True)
+            time.sleep(delay)
+        print(" Done!")
+
+    def close(self):
+        if self.listener:
+            self.listener.close()
+            self.listener = None
+
+    def _ensure_listener(self):
+        if not USE_WEBSOCKET:
+            return
+        if self.listener is not None:
+            if self.listener.connected or time.time() - self._listener_started < WS_RECONNECT_SEC:
+                return
+            # Never connected, or dropped (e.g. ComfyUI restarted): try a fresh socket instead of polling for good
+            self.listener.close()
+        self._listener_started = time.time()
+        self.listener = ComfyEventListener(self.server_address, self.client_id)
+        self.listener.start()
 
     def get_image(self, filename: str, subfolder: str, folder_type: str):
         data = {"filename": filename, "subfolder": subfolder, "type": folder_type}
-        url_values = urllib.parse.urlencode(data)
-        with urllib.request.urlopen(f"http://{self.server_address}/view?{url_values}") as response:
-            return response.read()
+        response = get_transport().get(f"http://{self.server_address}/view", params=data)
+        response.raise_for_status()
+        return response.content
 
 def _build_workflow(model_name, positive, negative, width, height, steps, cfg, seed, filename_prefix, sampler_name="euler"):
     # Minimal ID-based workflow
@@ -1,14 +1,24 @@
-from faster_whisper import WhisperModel
 import os
+from concurrent.futures import ThreadPoolExecutor
+from .model_registry import MODELS
 
 model_size = os.getenv("WHISPER_MODEL", "small")
 # Run on CPU by default for broad compatibility, or "cuda" if available
-device = "cpu" 
-compute_type = "int8"
+device = os.getenv("WHISPER_DEVICE", "cpu")
+compute_type = os.getenv("WHISPER_COMPUTE_TYPE", "int8")
+# Parallel transcriptions in transcribe_batch (one shared model, CTranslate2 is thread-safe)
+workers = int(os.getenv("WHISPER_WORKERS", "1"))
+
+def get_model():
+    """faster-whisper model for the configured size/device/compute type, loaded once per process."""
+    def load():
+        from faster_whisper import WhisperModel
+        print(f"[*] LocalWhisper: Loading model '{model_size}' on {device} ({compute_type})...")
+        return WhisperModel(model_size, device=device, compute_type=compute_type)
+    return MODELS.get(f"faster-whisper:{model_size}:{device}:{compute_type}", load)
 
 def transcribe_to_srt(audio_path: str, srt_path: str):
-    print(f"[*] LocalWhisper: Loading model '{model_size}' on {device}...")
-    model = WhisperModel(model_size, device=device, compute_type=compute_type)
+    model = get_model()
 
     print(f"[*] LocalWhisper: Transcribing {audio_path}...")
     segments, info = model.transcribe(audio_path, beam_size=5)
@@ -21,14 +31,26 @@ def transcribe_to_srt(audio_path: str, srt_path: str):
             start = _format_timestamp(segment.start)
             end = _format_timestamp(segment.end)
             text = segment.text.strip()
-            
+
             f.write(f"{i}\n")
             f.write(f"{start} --> {end}\n")
             f.write(f"{text}\n\n")
-    
+
     print(f"[*] LocalWhisper: Saved captions to {srt_path}")
     return srt_path
 
+def transcribe_batch(pairs: list, max_workers: int = None) -> list:
+    """
+    Transcribes many (audio_path, srt_path) pairs with one loaded model.
+    max_workers > 1 runs them on a thread pool. Returns srt paths in input order.
+    """
+    max_workers = max_workers or workers
+    get_model()  # Load up front so worker threads don't queue on the load lock
+    if max_workers <= 1 or len(pairs) <= 1:
+        return [transcribe_to_srt(audio, srt) for audio, srt in pairs]
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(pairs))) as pool:
+        return list(pool.map(lambda pair: transcribe_to_srt(*pair), pairs))
+
 def _format_timestamp(seconds: float):
     hours = int(seconds // 3600)
     minutes = int((seconds % 3600) // 60)
@@ -0,0 +1,82 @@
+import gc
+import sys
+import threading
+import time
+
+class ModelRegistry:
+    """
+    Process-wide cache for heavy models (CLIP, Whisper, ...).
+    Each model loads lazily on first get() and is then shared by every job in the process.
+    """
+    def __init__(self):
+        self._models = {}  # name -> entry dict
+        self._load_locks = {}
+        self._lock = threading.Lock()
+
+    def get(self, name: str, loader):
+        entry = self._models.get(name)
+        if entry is None:
+            with self._load_lock(name):
+                # Another thread may have finished loading while we waited
+                entry = self._models.get(name)
+                if entry is None:
+                    entry = self._load(name, loader)
+        entry["hits"] += 1
+        return entry["model"]
+
+    def loaded(self, name: str) -> bool:
+        return name in self._models
+
+    def unload(self, name: str = None):
+        """Drops one model (or all of them) and releases the memory it held."""
+        with self._lock:
+            names = [name] if name else list(self._models)
+            freed = 0
+            for n in names:
+                entry = self._models.pop(n, None)
+                if entry:
+                    freed += entry["bytes"]
+                    print(f"[*] ModelRegistry: Unloaded '{n}'")
+        gc.collect()
+        torch = sys.modules.get("torch")
+        if torch is not None and torch.cuda.is_available():
+            torch.cuda.empty_cache()
+        return freed
+
+    def total_bytes(self) -> int:
+        return sum(e["bytes"] for e in self._models.values())
+
+    def stats(self) -> dict:
+        return {
+            name: {"bytes": e["bytes"], "load_sec": e["load_sec"], "hits": e["hits"]}
+            for name, e in self._models.items()
+        }
+
+    def _load_lock(self, name: str):
+        with self._lock:
+            return self._load_locks.setdefault(name, threading.Lock())
+
+    def _load(self, name: str, loader) -> dict:
+        start = time.time()
+        model = loader()
+        load_sec = time.time() - start
+        size = estimate_bytes(model)
+        entry = {"model": model, "bytes": size, "load_sec": round(load_sec, 2), "hits": 0}
+        with self._lock:
+            self._models[name] = entry
+        print(f"[*] ModelRegistry: Loaded '{name}' in {load_sec:.1f}s (~{size / (1024 * 1024):.0f} MB, "
+              f"{self.total_bytes() / (1024 * 1024):.0f} MB resident)")
+        return entry
+
+def estimate_bytes(obj) -> int:
+    """Parameter + buffer bytes for torch modules (recursing into tuples like clip.load's); 0 if unknown."""
+    if isinstance(obj, (tuple, list)):
+        return sum(estimate_bytes(o) for o in obj)
+    if hasattr(obj, "parameters") and callable(obj.parameters):
+        tensors = list(obj.parameters())
+        if hasattr(obj, "buffers") and callable(obj.buffers):
+            tensors += list(obj.buffers())
+        return sum(t.numel() * t.element_size() for t in tensors)
+    return 0
+
+MODELS = ModelRegistry()
@@ -1,38 +1,182 @@
 import os
 import re
-import requests
+import subprocess
+from concurrent.futures import ThreadPoolExecutor
 from openai import OpenAI
 from moviepy.editor import concatenate_audioclips, AudioFileClip, AudioClip
 import numpy as np
 from .config import ELEVENLABS_API_KEY, OPENAI_API_KEY
+from .utils import RateLimiter
+from .content_cache import ContentCache
+from .transport import get_transport
+
+# Concurrent chunk synthesis per voiceover
+TTS_WORKERS = int(os.getenv("TTS_WORKERS", "4"))
+# Process-wide, per provider: quotas apply to the account, not to one AudioEngine
+PROVIDER_LIMITS = {
+    "elevenlabs": RateLimiter(int(os.getenv("ELEVENLABS_MAX_CONCURRENCY", "2")),
+                              float(os.getenv("ELEVENLABS_MIN_INTERVAL_SEC", "0"))),
+    "openai": RateLimiter(int(os.getenv("OPENAI_TTS_MAX_CONCURRENCY", "4")),
+                          float(os.getenv("OPENAI_TTS_MIN_INTERVAL_SEC", "0"))),
+}
+
+# "silence": one TTS request per [SILENCE]-delimited part; "sentence": one per sentence
+TTS_CHUNKING = os.getenv("TTS_CHUNKING", "silence")
+# Fragments shorter than this ("Dr.", "No.") are joined to the next sentence
+MIN_SENTENCE_CHARS = 12
+
+TTS_CACHE_ENABLED = os.getenv("TTS_CACHE", "1") == "1"
+TTS_CACHE_DIR = os.getenv("TTS_CACHE_DIR", os.path.join(os.path.dirname(os.path.dirname(__file__)), "assets", "cache", "tts"))
+TTS_CACHE_MAX_MB = int(os.getenv("TTS_CACHE_MAX_MB", "1024"))
+
+_TTS_CACHE = None
+
+def get_tts_cache():
+    global _TTS_CACHE
+    if not TTS_CACHE_ENABLED:
+        return None
+    if _TTS_CACHE is None:
+        _TTS_CACHE = ContentCache(TTS_CACHE_DIR, TTS_CACHE_MAX_MB * 1024 * 1024, ext=".mp3")
+    return _TTS_CACHE
+
+def tts_cache_key(voice_spec: dict, text: str) -> str:
+    """Whitespace-normalized text: re-flowed scripts still hit."""
+    return ContentCache.key_for({**voice_spec, "text": " ".join(text.split())})
+
+_SENTENCE_RE = re.compile(r'\S.*?[.!?]+["\'\)\]]*(?=\s|$)|\S.*$', re.S)
+_ABBREVIATIONS = {"dr.", "mr.", "mrs.", "ms.", "st.", "mt.", "no.", "vs.", "a.m.", "p.m.", "u.s.", "jr.", "sr."}
+
+def split_sentences(text: str) -> list:
+    """Splits after . ! ? (plus closing quotes/brackets); keeps abbreviations and tiny fragments attached."""
+    sentences = []
+    carry = ""
+    for match in _SENTENCE_RE.finditer(text.strip()):
+        piece = f"{carry} {match.group(0).strip()}" if carry else match.group(0).strip()
+        if len(piece) < MIN_SENTENCE_CHARS or piece.split()[-1].lower() in _ABBREVIATIONS:
+            carry = piece
+            continue
+        sentences.append(piece)
+        carry = ""
+    if carry:
+        if sentences:
+            sentences[-1] = f"{sentences[-1]} {carry}"
+        else:
+            sentences.append(carry)
+    return sentences
+
+# "numpy": decode once, assemble PCM in memory, encode once; "moviepy": the original clip-graph path
+AUDIO_ASSEMBLY = os.getenv("AUDIO_ASSEMBLY", "numpy")
+SAMPLE_RATE = 44100
+AUDIO_CHANNELS = 2
+
+def _ffmpeg_binary() -> str:
+    from moviepy.config import get_setting
+    return get_setting("FFMPEG_BINARY")
+
+def decode_pcm(path: str) -> np.ndarray:
+    """Decodes any audio file to int16 samples, shape (n, AUDIO_CHANNELS), at SAMPLE_RATE."""
+    result = subprocess.run(
+        [_ffmpeg_binary(), "-v", "error", "-i", path,
+         "-f", "s16le", "-acodec", "pcm_s16le", "-ac", str(AUDIO_CHANNELS), "-ar", str(SAMPLE_RATE), "-"],
+        capture_output=True, check=True,
+    )
+    return np.frombuffer(result.stdout, dtype=np.int16).reshape(-1, AUDIO_CHANNELS)
+
+def encode_mp3(samples: np.ndarray, path: str):
+    subprocess.run(
+        [_ffmpeg_binary(), "-y", "-v", "error",
+         "-f", "s16le", "-ar", str(SAMPLE_RATE), "-ac", str(AUDIO_CHANNELS), "-i", "-",
+         "-codec:a", "libmp3lame", path],
+        input=np.ascontiguousarray(samples, dtype=np.int16).tobytes(), capture_output=True, check=True,
+    )
 
 class AudioEngine:
     def __init__(self):
         self.eleven_key = ELEVENLABS_API_KEY
         self.openai_client = OpenAI(api_key=OPENAI_API_KEY)
         self.voice_id = "pNInz6obpgDQGcFmaJgB" 
+        self.eleven_model_id = "eleven_multilingual_v2"
+        self.eleven_voice_settings = {"stability": 0.5, "similarity_boost": 0.75}
+        self.openai_tts_model = "tts-1"
+        self.openai_voice = "onyx"
+        self.cache = get_tts_cache()
 
-    def generate_voice(self, text: str, job_dir: str, voice_style: str = "serious_male") -> tuple[str, list]:
+    def generate_voice(self, text: str, job_dir: str, voice_style: str = "serious_male", output_name: str = "voiceover.mp3") -> tuple[str, list]:
         # Check for Silence Markers
         # Format: [SILENCE] or [SILENCE:1.5]
-        parts = re.split(r'(\[SILENCE(?::[\d\.]+)?\])', text)
+        segments = self._segments(text)
         
+        # 1. Synthesize every text chunk concurrently (bounded pool, per-provider limits inside)
+        chunk_jobs = {
+            i: os.path.join(job_dir, f"chunk_{i}.mp3")
+            for i, (kind, _) in enumerate(segments) if kind == "speech"
+        }
+        filepath = os.path.join(job_dir, output_name)
+        try:
+            if chunk_jobs:
+                print(f"[*] Narrator: Generating {len(chunk_jobs)} chunks ({min(TTS_WORKERS, len(chunk_jobs))} workers)...")
+                with ThreadPoolExecutor(max_workers=max(1, min(TTS_WORKERS, len(chunk_jobs)))) as pool:
+                    futures = [pool.submit(self._generate_single_chunk, segments[i][1], path) for i, path in chunk_jobs.items()]
+                    for future in futures:
+                        future.result()  # Re-raise the first chunk failure, as the serial loop did
+            
+            # 2. Reassemble in script order (timeline identical to serial synthesis)
+            if AUDIO_ASSEMBLY == "numpy":
+                metadata = self._assemble_numpy(segments, chunk_jobs, filepath)
+            else:
+                metadata = self._assemble_moviepy(segments, chunk_jobs, filepath)
+        finally:
+            # Cleanup, also when a chunk or the decode/encode fails
+            for f in chunk_jobs.values():
+                try: os.remove(f)
+                except: pass
+            
+        return filepath, metadata
+
+    def _assemble_numpy(self, segments: list, chunk_jobs: dict, filepath: str) -> list:
+        """
+        Decodes each chunk once to s16le PCM, writes silence as zero samples into one preallocated
+        buffer and encodes a single MP3. Timings come from sample counts, so they are exact.
+        """
+        pieces = []  # (kind, text, samples or sample count)
+        for i, (kind, value) in enumerate(segments):
+            if kind == "silence":
+                print(f"[*] Narrator: Inserting silence ({value}s)...")
+                pieces.append(("silence", "[SILENCE]", int(round(value * SAMPLE_RATE))))
+            elif os.path.exists(chunk_jobs[i]):
+                pieces.append(("speech", value, decode_pcm(chunk_jobs[i])))
+        if not pieces:
+            return []
+
+        lengths = [p[2] if p[0] == "silence" else len(p[2]) for p in pieces]
+        buffer = np.zeros((sum(lengths), AUDIO_CHANNELS), dtype=np.int16)
+        metadata = []
+        offset = 0
+        for (kind, label, samples), length in zip(pieces, lengths):
+            if kind == "speech":
+                buffer[offset:offset + length] = samples
+            metadata.append({
+                "start": offset / SAMPLE_RATE,
+                "end": (offset + length) / SAMPLE_RATE,
+                "text": label,
+                "type": kind
+            })
+            offset += length
+
+        encode_mp3(buffer, filepath)
+        return metadata
+
+    def _assemble_moviepy(self, segments: list, chunk_jobs: dict, filepath: str) -> list:
         clips = []
-        temp_files = []
         metadata = []
         current_time = 0.0
         
-        for i, part in enumerate(parts):
-            if not part.strip(): continue
-            
-            # Check if Silence Marker
-            silence_match = re.match(r'\[SILENCE(?::([\d\.]+))?\]', part)
-            if silence_match:
-                dur_str = silence_match.group(1)
-                duration = float(dur_str) if dur_str else 1.0
+        for i, (kind, value) in enumerate(segments):
+            if kind == "silence":
+                duration = value
                 print(f"[*] Narrator: Inserting silence ({duration}s)...")
                 # Create silent clip
-                silence_clip = AudioClip(lambda t: [0, 0], duration=duration, fps=44100)
+                silence_clip = AudioClip(lambda t: [0, 0], duration=duration, fps=SAMPLE_RATE)
                 clips.append(silence_clip)
                 
                 metadata.append({
@@ -43,50 +187,77 @@ class AudioEngine:
                 })
                 current_time += duration
             else:
-                # Text Chunk
-                print(f"[*] Narrator: Generating chunk {i}...")
-                chunk_path = os.path.join(job_dir, f"chunk_{i}.mp3")
-                self._generate_single_chunk(part, chunk_path)
+                # Text Chunk (already synthesized above)
+                chunk_path = chunk_jobs[i]
                 if os.path.exists(chunk_path):
                     audio_clip = AudioFileClip(chunk_path)
                     clips.append(audio_clip)
-                    temp_files.append(chunk_path)
                     
                     duration = audio_clip.duration
                     metadata.append({
                         "start": current_time,
                         "end": current_time + duration,
-                        "text": part.strip(),
+                        "text": value,
                         "type": "speech"
                     })
                     current_time += duration
         
-        filepath = os.path.join(job_dir, "voiceover.mp3")
-        
-        if clips:
-            final_audio = concatenate_audioclips(clips)
-            final_audio.write_audiofile(filepath, fps=44100, codec='libmp3lame', verbose=False, logger=None)
-        else:
-            return filepath, []
-            
-        # Cleanup
-        for f in temp_files:
-            try: os.remove(f)
-            except: pass
-            
-        return filepath, metadata
+        if not clips:
+            return []
+        final_audio = concatenate_audioclips(clips)
+        final_audio.write_audiofile(filepath, fps=SAMPLE_RATE, codec='libmp3lame', verbose=False, logger=None)
+        return metadata
+
+    def _segments(self, text: str) -> list:
+        """
+        Splits narration into ("silence", seconds) and ("speech", text) segments in script order.
+        TTS_CHUNKING=sentence further splits speech at sentence boundaries, so each sentence is its
+        own (concurrent, cacheable) TTS request and a hook swap only re-voices the hook.
+        """
+        segments = []
+        for part in re.split(r'(\[SILENCE(?::[\d\.]+)?\])', text):
+            if not part.strip(): continue
+            silence_match = re.match(r'\[SILENCE(?::([\d\.]+))?\]', part)
+            if silence_match:
+                dur_str = silence_match.group(1)
+                segments.append(("silence", float(dur_str) if dur_str else 1.0))
+            elif TTS_CHUNKING == "sentence":
+                segments.extend(("speech", sentence) for sentence in split_sentences(part))
+            else:
+                segments.append(("speech", part.strip()))
+        return segments
 
     def _generate_single_chunk(self, text: str, filepath: str):
         # Try ElevenLabs first
         if self.eleven_key:
             try:
-                self._generate_elevenlabs(text, filepath)
+                self._synthesize_cached("elevenlabs", text, filepath)
                 return
             except Exception as e:
                 print(f"[!] ElevenLabs Chunk Failed: {e}. Falling back to OpenAi.")
         
         # Fallback to OpenAI
-        self._generate_openai_tts(text, filepath)
+        self._synthesize_cached("openai", text, filepath)
+
+    def _synthesize_cached(self, provider: str, text: str, filepath: str):
+        """Serves identical chunks (same provider/voice/model/settings/text) from the TTS cache."""
+        key = tts_cache_key(self._voice_spec(provider), text)
+        if self.cache and self.cache.fetch(key, filepath):
+            print(f"[*] Narrator: Chunk served from TTS cache ({provider}).")
+            return
+        with PROVIDER_LIMITS[provider]:
+            if provider == "elevenlabs":
+                self._generate_elevenlabs(text, filepath)
+            else:
+                self._generate_openai_tts(text, filepath)
+        if self.cache and os.path.exists(filepath):
+            self.cache.store(key, filepath)
+
+    def _voice_spec(self, provider: str) -> dict:
+        if provider == "elevenlabs":
+            return {"provider": provider, "voice_id": self.voice_id, "model_id": self.eleven_model_id,
+                    "voice_settings": self.eleven_voice_settings}
+        return {"provider": provider, "voice_id": self.openai_voice, "model_id": self.openai_tts_model, "voice_settings": None}
 
     def _generate_elevenlabs(self, text: str, filepath: str) -> str:
         url = f"https://api.elevenlabs.io/v1/text-to-speech/{self.voice_id}"
@@ -97,10 +268,11 @@ class AudioEngine:
         }
         data = {
             "text": text,
-            "model_id": "eleven_multilingual_v2",
-            "voice_settings": {"stability": 0.5, "similarity_boost": 0.75}
+            "model_id": self.eleven_model_id,
+            "voice_settings": self.eleven_voice_settings
         }
-        response = requests.post(url, json=data, headers=headers)
+        # Re-synthesizing the same text is harmless, so 5xx responses are retried too
+        response = get_transport().post(url, json=data, headers=headers, idempotent=True)
         if response.status_code == 200:
             with open(filepath, 'wb') as f:
                 f.write(response.content)
@@ -110,8 +282,8 @@ class AudioEngine:
 
     def _generate_openai_tts(self, text: str, filepath: str) -> str:
         response = self.openai_client.audio.speech.create(
-            model="tts-1",
-            voice="onyx",
+            model=self.openai_tts_model,
+            voice=self.openai_voice,
             input=text
         )
         response.stream_to_file(filepath)
@@ -0,0 +1,137 @@
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+
+import numpy as np
+
+NUM_PERM = 128
+BANDS = 16  # 16 bands x 8 rows: ~99.9% recall at Jaccard 0.9, ~6% candidate rate at 0.5
+SHINGLE_WORDS = 5
+_MERSENNE = np.uint64((1 << 61) - 1)
+_MAX_HASH = np.uint64(0xFFFFFFFF)
+# Fixed seed: signatures written to disk stay comparable across runs
+_rng = np.random.RandomState(1337)
+_PERM_A = _rng.randint(1, (1 << 61) - 1, size=NUM_PERM, dtype=np.uint64)
+_PERM_B = _rng.randint(0, (1 << 61) - 1, size=NUM_PERM, dtype=np.uint64)
+
+def shingles(script_text: str = None, fingerprint: str = None) -> set:
+    """Word 5-grams of the script; falls back to character 3-grams of the fingerprint."""
+    if script_text:
+        words = re.findall(r"[a-z0-9']+", script_text.lower())
+        if len(words) < SHINGLE_WORDS:
+            return {" ".join(words)} if words else set()
+        return {" ".join(words[i:i + SHINGLE_WORDS]) for i in range(len(words) - SHINGLE_WORDS + 1)}
+    if fingerprint:
+        return {fingerprint[i:i + 3] for i in range(max(1, len(fingerprint) - 2))}
+    return set()
+
+def text_hash(script_text: str) -> str:
+    """Exact identity of a script (whitespace-insensitive), recorded next to its signature."""
+    return hashlib.sha256(" ".join(script_text.split()).encode("utf-8")).hexdigest()
+
+def minhash(tokens: set) -> np.ndarray:
+    hashes = np.array(
+        [int.from_bytes(hashlib.blake2b(t.encode("utf-8"), digest_size=4).digest(), "little") for t in tokens],
+        dtype=np.uint64,
+    )
+    # Universal hashing (a*x + b) mod p, truncated to 32 bits; uint64 wraparound is intentional
+    permuted = ((hashes[:, None] * _PERM_A + _PERM_B) % _MERSENNE) & _MAX_HASH
+    return permuted.min(axis=0).astype(np.uint32)
+
+class NoveltyIndex:
+    """
+    MinHash/LSH index over everything we've published.
+    Records are appended to a JSONL log (never rewritten); bands are rebuilt in memory on load,
+    so a query only compares against the few stories sharing a band with the candidate.
+    """
+    def __init__(self, path: str, threshold: float = 0.9):
+        self.path = path
+        self.threshold = threshold
+        self.rows = NUM_PERM // BANDS
+        self.signatures = []
+        self.fingerprints = []
+        self.hashes = set()
+        self.buckets = [dict() for _ in range(BANDS)]
+        self._lock = threading.Lock()
+        self._load()
+
+    def __len__(self):
+        return len(self.signatures)
+
+    def query(self, script_text: str = None, fingerprint: str = None) -> tuple:
+        """Returns (max estimated Jaccard, fingerprint of the closest published story or None)."""
+        tokens = shingles(script_text, fingerprint)
+        if not tokens:
+            return 0.0, None
+        return self._best_match(minhash(tokens))
+
+    def add(self, script_text: str = None, fingerprint: str = None) -> bool:
+        tokens = shingles(script_text, fingerprint)
+        if not tokens:
+            return False
+        sig = minhash(tokens)
+        record = {"fingerprint": fingerprint, "sig": sig.tolist(), "ts": int(time.time())}
+        if script_text:
+            record["sha"] = text_hash(script_text)
+        with self._lock:
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(json.dumps(record) + "\n")
+            self._insert(sig, fingerprint, record.get("sha"))
+        return True
+
+    def check_and_add(self, script_text: str = None, fingerprint: str = None, replay: bool = False) -> tuple:
+        """
+        Blocks near-duplicates (>= threshold); novel stories are recorded. Returns (is_novel, score).
+        replay=True (script served from the LLM cache): a script already on record verbatim is its own
+        earlier record, not a duplicate, so it passes without being recorded again.
+        """
+        score, match = self.query(script_text, fingerprint)
+        if replay and script_text and text_hash(script_text) in self.hashes:
+            print(f"[*] Novelty: replayed script already on record ('{match}'), not a new duplicate")
+            return True, score
+        if score >= self.threshold:
+            print(f"[!] Novelty: near-duplicate of '{match}' (est. Jaccard {score:.2f})")
+            return False, score
+        self.add(script_text, fingerprint)
+        return True, score
+
+    def _band_keys(self, sig: np.ndarray):
+        for b in range(BANDS):
+            yield b, sig[b * self.rows:(b + 1) * self.rows].tobytes()
+
+    def _insert(self, sig: np.ndarray, fingerprint: str, sha: str = None):
+        idx = len(self.signatures)
+        self.signatures.append(sig)
+        self.fingerprints.append(fingerprint)
+        if sha:
+            self.hashes.add(sha)
+        for b, key in self._band_keys(sig):
+            self.buckets[b].setdefault(key, []).append(idx)
+
+    def _best_match(self, sig: np.ndarray) -> tuple:
+        candidates = set()
+        for b, key in self._band_keys(sig):
+            candidates.update(self.buckets[b].get(key, ()))
+        best, best_idx = 0.0, None
+        for idx in candidates:
+            score = float(np.mean(self.signatures[idx] == sig))
+            if score > best:
+                best, best_idx = score, idx
+        return best, (self.fingerprints[best_idx] if best_idx is not None else None)
+
+    def _load(self):
+        if not os.path.exists(self.path):
+            return
+        with open(self.path, "r", encoding="utf-8") as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    continue  # Torn last line from a crash mid-append
+                self._insert(np.array(record["sig"], dtype=np.uint32), record.get("fingerprint"), record.get("sha"))
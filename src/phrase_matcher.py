@@ -0,0 +1,77 @@
+import re
+from functools import lru_cache
+from types import MappingProxyType
+
+# Category -> terms. Multi-word phrases match across any whitespace; all matching is case-insensitive
+# and word-bounded ("red" no longer matches inside "reported").
+PHRASE_LISTS = {
+    # Human Voice Lock
+    "forbidden": [
+        "amidst", "unease began to stir", "picture of serenity", "claims emerged",
+        "was left to question", "with unimaginable fury", "little did he know",
+        "what happened next", "changed everything", "shocked everyone",
+        "no one could explain", "you won't believe", "blow your mind",
+        "shivers down", "blood ran cold"
+    ],
+    "unsafe": [
+        "suicide", "kill yourself", "rapist", "rape", "sexual", "nude", "naked",
+        "hitler", "nazi", "terrorist", "bombing instructions",
+        "child abuse", "torture", "gore", "severed"
+    ],
+    "sensory": [
+        "smell", "scent", "odor", "stink", "aroma",
+        "sound", "noise", "crackled", "flickered", "bang", "whisper", "scream",
+        "cold", "hot", "freezing", "burning", "warm", "icy",
+        "light", "dark", "shadow", "glow", "dim", "bright", "red", "blue", "felt", "touched"
+    ],
+}
+
+# Categories whose terms also match simple inflections (smells, screamed, raped, sexually, ...)
+INFLECTED_CATEGORIES = {"unsafe", "sensory"}
+INFLECTION_SUFFIX = r"(?:s|es|d|ed|ing|ly|y)?"
+
+def _term_pattern(term: str) -> str:
+    return r"\s+".join(re.escape(word) for word in term.split())
+
+def _normalize(term: str) -> str:
+    return " ".join(term.lower().split())
+
+def _build():
+    categories = {}
+    fixed, inflected = set(), set()
+    for category, terms in PHRASE_LISTS.items():
+        for term in terms:
+            key = _normalize(term)
+            categories.setdefault(key, []).append(category)
+            (inflected if category in INFLECTED_CATEGORIES else fixed).add(key)
+    fixed -= inflected  # A term listed in both kinds of category matches with inflections
+
+    def alternation(terms):
+        # Longest first so "kill yourself" wins over a shorter term at the same position
+        return "|".join(_term_pattern(t) for t in sorted(terms, key=len, reverse=True)) or r"(?!)"
+
+    # One zero-width lookahead per start position: a single left-to-right pass that still
+    # reports overlapping hits ("cold" inside "blood ran cold" counts for both categories).
+    pattern = re.compile(
+        r"(?=\b(?:(?P<fixed>" + alternation(fixed) + r")|(?P<inflected>" + alternation(inflected) + r")"
+        + INFLECTION_SUFFIX + r")\b)",
+        re.IGNORECASE,
+    )
+    rank = {(c, _normalize(t)): i for c, terms in PHRASE_LISTS.items() for i, t in enumerate(terms)}
+    return pattern, categories, rank
+
+_PATTERN, _CATEGORIES, _RANK = _build()
+
+@lru_cache(maxsize=256)
+def scan(text: str) -> MappingProxyType:
+    """
+    Scans text once for every category. Returns {category: (distinct terms hit, in PHRASE_LISTS order)}.
+    Results are cached per text, so the validators can each call scan() on the same script for free;
+    the mapping is read-only because every caller shares it.
+    """
+    hits = {category: set() for category in PHRASE_LISTS}
+    for match in _PATTERN.finditer(text):
+        term = _normalize(match.group("fixed") or match.group("inflected"))
+        for category in _CATEGORIES[term]:
+            hits[category].add(term)
+    return MappingProxyType({c: tuple(sorted(terms, key=lambda t: _RANK[(c, t)])) for c, terms in hits.items()})
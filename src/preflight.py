@@ -1,19 +1,25 @@
 import os
 import sys
 import shutil
-import requests
 import importlib
 
 def check_comfy_ready():
-    print("[*] Checking ComfyUI (127.0.0.1:8188)...")
-    try:
-        resp = requests.get("http://127.0.0.1:8188/system_stats", timeout=2)
-        if resp.status_code == 200:
-            print("   ✅ ComfyUI Online")
-            return True
-    except:
+    from .local_comfyui import SERVER_ADDRESSES
+    from .transport import get_transport
+    online = 0
+    for address in SERVER_ADDRESSES:
+        print(f"[*] Checking ComfyUI ({address})...")
+        try:
+            resp = get_transport().get(f"http://{address}/system_stats", timeout=2, retries=0)
+            if resp.status_code == 200:
+                print("   ✅ ComfyUI Online")
+                online += 1
+                continue
+        except:
+            pass
         print("   ❌ ComfyUI Offline or Unreachable")
-    return False
+    # The pool routes around dead nodes, one live box is enough to run
+    return online > 0
 
 def check_model_exists():
     path = "c:/Users/DOVY/Desktop/REELS AUTOMATION/ComfyUI_Local/models/checkpoints/Juggernaut-XL_v9_RunDiffusionPhoto_v2.safetensors"
@@ -0,0 +1,55 @@
+import numpy as np
+
+class SimilarityIndex:
+    """
+    In-memory cosine-similarity index over a fixed set of reference vectors.
+    Rows are L2-normalized once at build time, so scoring is a single matrix product.
+    """
+    def __init__(self, vectors, labels: list = None):
+        matrix = np.asarray(vectors, dtype=np.float32)
+        matrix = matrix.reshape(0, 0) if matrix.size == 0 else np.atleast_2d(matrix)
+        self.matrix = _normalize(matrix)
+        self.labels = list(labels) if labels is not None else list(range(len(self.matrix)))
+
+    def add(self, vectors, labels: list):
+        """Appends reference rows (normalized on the way in)."""
+        rows = _normalize(np.atleast_2d(np.asarray(vectors, dtype=np.float32)))
+        self.matrix = rows if not len(self) else np.vstack([self.matrix, rows])
+        self.labels.extend(labels)
+
+    def __len__(self):
+        return self.matrix.shape[0]
+
+    def scores(self, vector) -> np.ndarray:
+        """Cosine similarity of one vector against every reference row."""
+        if not len(self):
+            return np.zeros(0, dtype=np.float32)
+        return self.matrix @ _normalize(np.asarray(vector, dtype=np.float32)[None, :])[0]
+
+    def query(self, vector, k: int = 1) -> tuple:
+        """Returns (max_score, [(label, score), ...] for the top-k references, best first)."""
+        return _top_k(self.scores(vector), self.labels, k)
+
+    def query_batch(self, vectors, k: int = 1) -> list:
+        """query() for many candidates with one (n_candidates x dim) @ (dim x n_refs) product."""
+        queries = _normalize(np.asarray(vectors, dtype=np.float32))
+        if not len(self):
+            return [(0.0, []) for _ in range(len(queries))]
+        all_scores = queries @ self.matrix.T
+        return [_top_k(row, self.labels, k) for row in all_scores]
+
+def _normalize(matrix: np.ndarray) -> np.ndarray:
+    if matrix.size == 0:
+        return matrix
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    # Zero vectors score 0.0 against everything, as the old pure-Python helper did
+    norms[norms == 0] = 1.0
+    return matrix / norms
+
+def _top_k(scores: np.ndarray, labels: list, k: int) -> tuple:
+    if scores.size == 0:
+        return 0.0, []
+    k = min(k, scores.size)
+    top = np.argpartition(-scores, k - 1)[:k]
+    top = top[np.argsort(-scores[top])]
+    return float(scores[top[0]]), [(labels[i], float(scores[i])) for i in top]
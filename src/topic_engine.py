@@ -1,50 +1,89 @@
 import json
 import os
-import time
+import threading
 from openai import OpenAI
 from .config import OPENAI_API_KEY, OUTPUT_DIR
+from .topic_store import TopicStore
+from .llm_cache import cached_client
+from .embeddings import get_embedding_cache, openai_embed_fn
+from .similarity import SimilarityIndex
+
+# Cosine similarity at/above which a candidate counts as the same story as a used/queued/blacklisted topic
+TOPIC_SIMILARITY_THRESHOLD = float(os.getenv("TOPIC_SIMILARITY_THRESHOLD", "0.85"))
+# Refill the candidate queue in the background once it drops below this many topics
+TOPIC_LOW_WATERMARK = int(os.getenv("TOPIC_LOW_WATERMARK", "10"))
 
 class TopicEngine:
     def __init__(self, channel_config: dict):
-        self.client = OpenAI(api_key=OPENAI_API_KEY)
+        self.client = cached_client(OpenAI(api_key=OPENAI_API_KEY))
         self.niche = channel_config.get("niche", "horror")
-        self.state_file = os.path.join(OUTPUT_DIR, "topic_state.json")
+        self.state_file = os.path.join(OUTPUT_DIR, "topic_state.json")  # Legacy JSON state, migrated once
         self.blacklist = [
             "Flight 19", "Dyatlov Pass", "Elisa Lam", "MH370", "Titanic", "Bermuda Triangle"
         ]
-        self._load_state()
-
-    def _load_state(self):
-        if os.path.exists(self.state_file):
-            with open(self.state_file, 'r') as f:
-                self.state = json.load(f)
-        else:
-            self.state = {"used_topics": [], "candidates": []}
-
-    def _save_state(self):
-        with open(self.state_file, 'w') as f:
-            json.dump(self.state, f, indent=2)
+        self.store = TopicStore(os.path.join(OUTPUT_DIR, "topic_state.sqlite"))
+        self.store.migrate_json(self.state_file)
+        self._prefetch_lock = threading.Lock()
+        self._prefetch_thread = None
 
     def get_fresh_topic(self) -> str:
         print("[*] TopicEngine v2: Fetching fresh topic...")
         
-        # 1. Check local cache first
-        if self.state.get("candidates"):
-            while self.state["candidates"]:
-                candidate = self.state["candidates"].pop(0)
-                if not self._is_blacklisted(candidate) and candidate not in self.state["used_topics"]:
-                    self._mark_used(candidate)
-                    return candidate
+        # 1. Check local cache first (atomic claim: safe with several studio processes)
+        candidate = self._claim()
+        if not candidate and self._prefetch_running():
+            # A refill is already in flight: wait for it instead of issuing a second batch call
+            print("[*] TopicEngine v2: Waiting for background prefetch...")
+            self._prefetch_thread.join()
+            candidate = self._claim()
+        
+        if not candidate:
+            # 2. Cold start: nothing queued and nothing in flight, refill on the caller's thread
+            print(f"[*] TopicEngine v2: Cache empty. Generating batch for '{self.niche}'...")
+            self._refill()
+            candidate = self._claim()
+            if not candidate:
+                raise RuntimeError("Topic Exhaustion: Candidates were claimed by another process.")
         
-        # 2. Generate new batch
-        print(f"[*] TopicEngine v2: Cache empty. Generating batch for '{self.niche}'...")
+        print(f"[*] TopicEngine: Selected '{candidate}'")
+        # 3. Top the queue back up while this job scripts/renders
+        self.prefetch()
+        return candidate
+
+    def prefetch(self) -> bool:
+        """
+        Starts a background refill when fewer than TOPIC_LOW_WATERMARK candidates are queued.
+        Single-flight: returns False if the queue is deep enough or a refill is already running.
+        """
+        if self.store.candidate_count() >= TOPIC_LOW_WATERMARK:
+            return False
+        with self._prefetch_lock:
+            if self._prefetch_running():
+                return False
+            self._prefetch_thread = threading.Thread(target=self._background_refill, name="topic-prefetch", daemon=True)
+            self._prefetch_thread.start()
+        return True
+
+    def _prefetch_running(self) -> bool:
+        return self._prefetch_thread is not None and self._prefetch_thread.is_alive()
+
+    def _background_refill(self):
+        try:
+            added = self._refill()
+            print(f"[*] TopicEngine: Prefetched {added} candidates in the background.")
+        except Exception as e:
+            # The next get_fresh_topic falls back to a synchronous refill
+            print(f"[!] TopicEngine: Background prefetch failed: {e}")
+
+    def _claim(self):
+        return self.store.claim_next(allowed=lambda t: not self._is_blacklisted(t))
+
+    def _refill(self) -> int:
+        """Generates, filters and queues one batch. Raises RuntimeError on topic exhaustion."""
         new_topics = self._generate_batch()
         
-        # 3. Filter & Deduplicate
-        valid_topics = []
-        for t in new_topics:
-            if not self._is_blacklisted(t) and t not in self.state["used_topics"]:
-                valid_topics.append(t)
+        # Filter & Deduplicate
+        valid_topics = self._filter_new(new_topics)
         
         if not valid_topics:
             print("[!] Warning: All generated topics were duplicates or blacklisted.")
@@ -53,27 +92,43 @@ class TopicEngine:
             # User Rule: "If exhausted: regenerate, DO NOT random reuse"
             # So we retry generation once recursively.
             print("[*] Retrying generation once...")
-            new_topics_2 = self._generate_batch()
-            for t in new_topics_2:
-                if not self._is_blacklisted(t) and t not in self.state["used_topics"]:
-                    valid_topics.append(t)
+            valid_topics = self._filter_new(self._generate_batch())
             
             if not valid_topics:
                 raise RuntimeError("Topic Exhaustion: No new unique topics found.")
 
-        # 4. Update Cache
-        self.state["candidates"].extend(valid_topics)
-        self._save_state()
-        
-        # 5. Return first
-        chosen = self.state["candidates"].pop(0)
-        self._mark_used(chosen)
-        return chosen
+        # Update Cache
+        return self.store.add_candidates(valid_topics)
+
+    def _filter_new(self, topics: list) -> list:
+        exact = self.store.filter_unused([t for t in topics if not self._is_blacklisted(t)])
+        return self._semantic_filter(exact)
+
+    def _semantic_filter(self, topics: list) -> list:
+        """
+        Drops candidates that are paraphrases of a used topic, a queued candidate, a blacklist entry
+        or an earlier candidate in the same batch ("Byford Dolphin Decompression Accident (1983)").
+        Embeddings come from the on-disk cache, so every topic string is embedded once.
+        """
+        if not topics or TOPIC_SIMILARITY_THRESHOLD >= 1:
+            return topics
+        refs = self.store.used_topics() + self.store.candidates() + self.blacklist
+        try:
+            vectors = get_embedding_cache().embed(refs + topics, openai_embed_fn(self.client))
+        except Exception as e:
+            print(f"[!] TopicEngine: Semantic dedupe unavailable ({e}). Using exact matching only.")
+            return topics
 
-    def _mark_used(self, topic):
-        print(f"[*] TopicEngine: Selected '{topic}'")
-        self.state["used_topics"].append(topic)
-        self._save_state()
+        index = SimilarityIndex(vectors[:len(refs)], refs)
+        kept = []
+        for topic, vec in zip(topics, vectors[len(refs):]):
+            score, nearest = index.query(vec, k=1)
+            if score >= TOPIC_SIMILARITY_THRESHOLD:
+                print(f"[*] TopicEngine: Skipping '{topic}' (~'{nearest[0][0]}', {score:.2f})")
+                continue
+            kept.append(topic)
+            index.add([vec], [topic])
+        return kept
 
     def _is_blacklisted(self, topic):
         for bad in self.blacklist:
@@ -104,7 +159,8 @@ class TopicEngine:
                 messages=[
                     {"role": "system", "content": "You are a researcher for a 'Dark History' channel. You find ironic, tragic true stories."},
                     {"role": "user", "content": prompt}
-                ]
+                ],
+                cache=False  # Same prompt every time: a cached batch would only ever return used topics
             )
             content = response.choices[0].message.content
             data = json.loads(content)
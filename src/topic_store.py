@@ -0,0 +1,125 @@
+import json
+import os
+import sqlite3
+import time
+from contextlib import contextmanager
+
+def topic_key(topic: str) -> str:
+    """Case/whitespace-insensitive identity, so 'The Cutter Incident' and 'the cutter  incident' collide."""
+    return " ".join(topic.split()).casefold()
+
+class TopicStore:
+    """
+    Topic state (used topics + pending candidates) in SQLite.
+    WAL mode + busy_timeout let several studio processes share one file; every claim is a
+    single transaction, so two processes can never both publish the same topic.
+    A connection is opened per operation, so one store is safe to share between threads.
+    """
+    def __init__(self, path: str, busy_timeout_ms: int = 30000):
+        self.path = path
+        self.busy_timeout_ms = busy_timeout_ms
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        with self._tx() as conn:
+            conn.execute("CREATE TABLE IF NOT EXISTS used_topics (key TEXT PRIMARY KEY, topic TEXT NOT NULL, used_at REAL)")
+            conn.execute("CREATE TABLE IF NOT EXISTS candidates (id INTEGER PRIMARY KEY AUTOINCREMENT, key TEXT UNIQUE, topic TEXT NOT NULL)")
+            conn.execute("CREATE TABLE IF NOT EXISTS meta (name TEXT PRIMARY KEY, value TEXT)")
+
+    @contextmanager
+    def _tx(self):
+        """BEGIN IMMEDIATE: takes the write lock up front so read-then-write sequences are atomic."""
+        conn = sqlite3.connect(self.path, timeout=self.busy_timeout_ms / 1000, isolation_level=None)
+        try:
+            conn.execute(f"PRAGMA busy_timeout={int(self.busy_timeout_ms)}")
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                yield conn
+                conn.execute("COMMIT")
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+        finally:
+            conn.close()
+
+    def is_used(self, topic: str) -> bool:
+        with self._tx() as conn:
+            return conn.execute("SELECT 1 FROM used_topics WHERE key = ?", (topic_key(topic),)).fetchone() is not None
+
+    def filter_unused(self, topics: list) -> list:
+        """Drops topics already used (and repeats within the list), keeping order."""
+        keys = {}
+        for t in topics:
+            keys.setdefault(topic_key(t), t)
+        with self._tx() as conn:
+            used = {k for k in keys if conn.execute("SELECT 1 FROM used_topics WHERE key = ?", (k,)).fetchone()}
+        return [t for k, t in keys.items() if k not in used]
+
+    def mark_used(self, topic: str) -> bool:
+        """Claims a topic. False if it was already used (e.g. claimed by another process)."""
+        with self._tx() as conn:
+            cur = conn.execute("INSERT OR IGNORE INTO used_topics (key, topic, used_at) VALUES (?, ?, ?)",
+                               (topic_key(topic), topic, time.time()))
+            conn.execute("DELETE FROM candidates WHERE key = ?", (topic_key(topic),))
+            return cur.rowcount == 1
+
+    def add_candidates(self, topics: list) -> int:
+        """Queues unused topics as candidates. Returns how many were new."""
+        added = 0
+        with self._tx() as conn:
+            for t in topics:
+                key = topic_key(t)
+                if conn.execute("SELECT 1 FROM used_topics WHERE key = ?", (key,)).fetchone():
+                    continue
+                added += conn.execute("INSERT OR IGNORE INTO candidates (key, topic) VALUES (?, ?)", (key, t)).rowcount
+        return added
+
+    def claim_next(self, allowed=None):
+        """
+        Atomically pops candidates (oldest first) until one passes allowed(topic) and is not yet used,
+        marks it used and returns it. Rejected candidates are discarded. Returns None when empty.
+        """
+        with self._tx() as conn:
+            while True:
+                row = conn.execute("SELECT id, key, topic FROM candidates ORDER BY id LIMIT 1").fetchone()
+                if row is None:
+                    return None
+                cid, key, topic = row
+                conn.execute("DELETE FROM candidates WHERE id = ?", (cid,))
+                if allowed is not None and not allowed(topic):
+                    continue
+                if conn.execute("INSERT OR IGNORE INTO used_topics (key, topic, used_at) VALUES (?, ?, ?)",
+                                (key, topic, time.time())).rowcount == 1:
+                    return topic
+
+    def candidate_count(self) -> int:
+        with self._tx() as conn:
+            return conn.execute("SELECT COUNT(*) FROM candidates").fetchone()[0]
+
+    def used_topics(self) -> list:
+        with self._tx() as conn:
+            return [row[0] for row in conn.execute("SELECT topic FROM used_topics ORDER BY used_at, rowid")]
+
+    def candidates(self) -> list:
+        with self._tx() as conn:
+            return [row[0] for row in conn.execute("SELECT topic FROM candidates ORDER BY id")]
+
+    def migrate_json(self, json_path: str) -> bool:
+        """One-time import of the legacy topic_state.json ({"used_topics": [...], "candidates": [...]})."""
+        if not os.path.exists(json_path):
+            return False
+        with self._tx() as conn:
+            if conn.execute("SELECT 1 FROM meta WHERE name = 'migrated_json'").fetchone():
+                return False
+            with open(json_path, 'r') as f:
+                state = json.load(f)
+            now = time.time()
+            for i, t in enumerate(state.get("used_topics", [])):
+                # Keep the original order via increasing timestamps
+                conn.execute("INSERT OR IGNORE INTO used_topics (key, topic, used_at) VALUES (?, ?, ?)",
+                             (topic_key(t), t, now - len(state["used_topics"]) + i))
+            for t in state.get("candidates", []):
+                if not conn.execute("SELECT 1 FROM used_topics WHERE key = ?", (topic_key(t),)).fetchone():
+                    conn.execute("INSERT OR IGNORE INTO candidates (key, topic) VALUES (?, ?)", (topic_key(t), t))
+            conn.execute("INSERT INTO meta (name, value) VALUES ('migrated_json', ?)", (json_path,))
+        print(f"[*] TopicStore: Migrated {json_path} into {self.path}")
+        return True
@@ -0,0 +1,192 @@
+import bisect
+import os
+import random
+import threading
+import time
+import urllib.parse
+
+import requests
+from requests.adapters import HTTPAdapter
+
+# Timeouts apply to every outbound call unless the caller passes its own
+CONNECT_TIMEOUT_SEC = float(os.getenv("HTTP_CONNECT_TIMEOUT_SEC", "5"))
+READ_TIMEOUT_SEC = float(os.getenv("HTTP_READ_TIMEOUT_SEC", "120"))
+MAX_RETRIES = int(os.getenv("HTTP_MAX_RETRIES", "3"))
+BACKOFF_BASE_SEC = float(os.getenv("HTTP_BACKOFF_BASE_SEC", "0.5"))
+BACKOFF_MAX_SEC = float(os.getenv("HTTP_BACKOFF_MAX_SEC", "8"))
+POOL_SIZE = int(os.getenv("HTTP_POOL_SIZE", "16"))  # Keep-alive connections per host
+
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+IDEMPOTENT_METHODS = {"GET", "HEAD", "OPTIONS", "PUT", "DELETE"}
+# Latency histogram bucket upper bounds (ms); the last bucket is open-ended
+LATENCY_BUCKETS_MS = [10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000, 30000]
+
+class LatencyHistogram:
+    def __init__(self):
+        self.counts = [0] * (len(LATENCY_BUCKETS_MS) + 1)
+        self.requests = 0
+        self.errors = 0
+        self.retries = 0
+        self.total_ms = 0.0
+
+    def record(self, ms: float):
+        self.counts[bisect.bisect_left(LATENCY_BUCKETS_MS, ms)] += 1
+        self.requests += 1
+        self.total_ms += ms
+
+    def percentile(self, q: float) -> float:
+        """Upper bound (ms) of the bucket holding the q-th percentile; inf for the open bucket."""
+        if not self.requests:
+            return 0.0
+        target = q * self.requests
+        seen = 0
+        for i, n in enumerate(self.counts):
+            seen += n
+            if seen >= target:
+                return float(LATENCY_BUCKETS_MS[i]) if i < len(LATENCY_BUCKETS_MS) else float("inf")
+        return float("inf")
+
+    def snapshot(self) -> dict:
+        labels = [f"<={b}ms" for b in LATENCY_BUCKETS_MS] + [f">{LATENCY_BUCKETS_MS[-1]}ms"]
+        return {
+            "requests": self.requests,
+            "errors": self.errors,
+            "retries": self.retries,
+            "mean_ms": self.total_ms / self.requests if self.requests else 0.0,
+            "p50_ms": self.percentile(0.5),
+            "p95_ms": self.percentile(0.95),
+            "buckets": dict(zip(labels, self.counts)),
+        }
+
+class Transport:
+    """
+    Shared HTTP client: one keep-alive requests.Session per host, jittered exponential backoff
+    on 429/5xx (honouring Retry-After), default timeouts and per-host latency histograms.
+    Non-idempotent requests (POST) are only retried on 429 or a refused connection, where the
+    server cannot have acted on them; pass idempotent=True when a repeat is harmless.
+    """
+    def __init__(self, connect_timeout: float = CONNECT_TIMEOUT_SEC, read_timeout: float = READ_TIMEOUT_SEC,
+                 max_retries: int = MAX_RETRIES, backoff_base: float = BACKOFF_BASE_SEC,
+                 backoff_max: float = BACKOFF_MAX_SEC, pool_size: int = POOL_SIZE):
+        self.timeout = (connect_timeout, read_timeout)
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.pool_size = pool_size
+        self._sessions = {}
+        self._histograms = {}
+        self._lock = threading.Lock()
+
+    def request(self, method: str, url: str, timeout=None, retries: int = None, idempotent: bool = None,
+                **kwargs) -> requests.Response:
+        """
+        Sends the request with retries. Returns the final response (possibly still 429/5xx once retries
+        run out); connection errors are re-raised after the last attempt.
+        """
+        method = method.upper()
+        host = self._host(url)
+        session = self._session(host)
+        retries = self.max_retries if retries is None else retries
+        if idempotent is None:
+            idempotent = method in IDEMPOTENT_METHODS
+        timeout = self.timeout if timeout is None else timeout
+
+        attempt = 0
+        while True:
+            start = time.perf_counter()
+            try:
+                response = session.request(method, url, timeout=timeout, **kwargs)
+            except requests.RequestException as e:
+                self._record(host, start, error=True)
+                # A refused/unreachable connection never reached the server, so any method may repeat it
+                retryable = idempotent or isinstance(e, requests.exceptions.ConnectTimeout) or (
+                    isinstance(e, requests.ConnectionError) and _is_connect_failure(e))
+                if attempt >= retries or not retryable:
+                    raise
+                delay = self._backoff(attempt)
+            else:
+                self._record(host, start, error=response.status_code >= 500)
+                retryable = response.status_code == 429 or (idempotent and response.status_code in RETRY_STATUSES)
+                if attempt >= retries or not retryable:
+                    return response
+                delay = _retry_after(response)
+                if delay is None:
+                    delay = self._backoff(attempt)
+                response.close()
+            attempt += 1
+            with self._lock:
+                self._histograms[host].retries += 1
+            print(f"[*] Transport: retry {attempt}/{retries} for {host} in {delay:.2f}s")
+            time.sleep(delay)
+
+    def get(self, url: str, **kwargs) -> requests.Response:
+        return self.request("GET", url, **kwargs)
+
+    def post(self, url: str, **kwargs) -> requests.Response:
+        return self.request("POST", url, **kwargs)
+
+    def stats(self) -> dict:
+        """Per-host latency histograms: {host: {requests, errors, retries, mean_ms, p50_ms, p95_ms, buckets}}."""
+        with self._lock:
+            return {host: h.snapshot() for host, h in self._histograms.items()}
+
+    def close(self):
+        with self._lock:
+            sessions, self._sessions = self._sessions, {}
+        for session in sessions.values():
+            session.close()
+
+    def _backoff(self, attempt: int) -> float:
+        # Full jitter: spreads retries from many threads instead of re-synchronising them
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * (2 ** attempt)))
+
+    def _host(self, url: str) -> str:
+        parts = urllib.parse.urlsplit(url)
+        return f"{parts.scheme}://{parts.netloc}"
+
+    def _session(self, host: str) -> requests.Session:
+        with self._lock:
+            session = self._sessions.get(host)
+            if session is None:
+                session = requests.Session()
+                adapter = HTTPAdapter(pool_connections=1, pool_maxsize=self.pool_size)
+                session.mount("http://", adapter)
+                session.mount("https://", adapter)
+                self._sessions[host] = session
+                self._histograms.setdefault(host, LatencyHistogram())
+            return session
+
+    def _record(self, host: str, start: float, error: bool):
+        ms = (time.perf_counter() - start) * 1000
+        with self._lock:
+            histogram = self._histograms[host]
+            histogram.record(ms)
+            if error:
+                histogram.errors += 1
+
+def _is_connect_failure(error: requests.ConnectionError) -> bool:
+    # urllib3 wraps refused/unresolvable connects in NewConnectionError; only its message survives
+    text = str(error)
+    return "NewConnectionError" in text or "Connection refused" in text or "Failed to establish" in text
+
+def _retry_after(response: requests.Response):
+    value = response.headers.get("Retry-After")
+    if value is None:
+        return None
+    try:
+        return min(max(0.0, float(value)), BACKOFF_MAX_SEC)
+    except ValueError:
+        return None
+
+_TRANSPORT = None
+_TRANSPORT_LOCK = threading.Lock()
+
+def get_transport() -> Transport:
+    global _TRANSPORT
+    with _TRANSPORT_LOCK:
+        if _TRANSPORT is None:
+            _TRANSPORT = Transport()
+        return _TRANSPORT
+
+def transport_stats() -> dict:
+    return get_transport().stats()
@@ -1,5 +1,8 @@
 import hashlib
 import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FuturesTimeout
 
 def check_images_unique(folder_path: str) -> bool:
     """
@@ -25,3 +28,68 @@ def check_images_unique(folder_path: str) -> bool:
         
     print(f"[*] Verified {len(files)} unique images in {folder_path}.")
     return True
+
+def fan_out(calls: dict, timeout: float = None, label: str = "fan_out") -> dict:
+    """
+    Runs independent callables ({name: fn}) concurrently and joins them.
+    Returns {name: result}. Every call gets `timeout` seconds from the common start; a call still
+    running after that raises TimeoutError. The first failure is re-raised once all calls are settled.
+    Prints per-call latency and the overall wall time.
+    """
+    latencies = {}
+
+    def timed(name, fn):
+        t0 = time.perf_counter()
+        try:
+            return fn()
+        finally:
+            latencies[name] = time.perf_counter() - t0
+
+    start = time.perf_counter()
+    pool = ThreadPoolExecutor(max_workers=max(1, len(calls)), thread_name_prefix=label)
+    futures = {name: pool.submit(timed, name, fn) for name, fn in calls.items()}
+    results, errors = {}, {}
+    for name, future in futures.items():
+        remaining = None if timeout is None else max(0.0, timeout - (time.perf_counter() - start))
+        try:
+            results[name] = future.result(timeout=remaining)
+        except FuturesTimeout:
+            errors[name] = TimeoutError(f"{label}: '{name}' timed out after {timeout}s")
+        except Exception as e:
+            errors[name] = e
+    # Don't block on calls that blew their timeout; their threads finish in the background
+    pool.shutdown(wait=False, cancel_futures=True)
+
+    wall = time.perf_counter() - start
+    parts = [f"{name} {latencies[name]:.2f}s" if name in latencies else f"{name} TIMEOUT" for name in calls]
+    print(f"[*] {label}: {', '.join(parts)} (wall {wall:.2f}s)")
+    if errors:
+        raise next(iter(errors.values()))
+    return results
+
+class RateLimiter:
+    """
+    Context manager that caps concurrent calls to a provider and spaces their starts
+    at least min_interval seconds apart. Share one instance per provider/account.
+    """
+    def __init__(self, max_concurrent: int, min_interval: float = 0.0):
+        self.max_concurrent = max_concurrent
+        self.min_interval = min_interval
+        self._slots = threading.BoundedSemaphore(max(1, max_concurrent))
+        self._lock = threading.Lock()
+        self._next_start = 0.0
+
+    def __enter__(self):
+        self._slots.acquire()
+        if self.min_interval > 0:
+            with self._lock:
+                now = time.monotonic()
+                start = max(now, self._next_start)
+                self._next_start = start + self.min_interval
+            if start > now:
+                time.sleep(start - now)
+        return self
+
+    def __exit__(self, *exc):
+        self._slots.release()
+        return False
@@ -1,11 +1,13 @@
 import os
 import json
-import math
 import requests
 import re
-from difflib import SequenceMatcher
 from openai import OpenAI
 from .config import OPENAI_API_KEY, ELEVENLABS_API_KEY, OUTPUT_DIR
+from .embeddings import get_embedding_cache, openai_embed_fn
+from .similarity import SimilarityIndex
+from .phrase_matcher import scan
+from .novelty_index import NoveltyIndex
 
 def validate_api_keys():
     print("------------------------------------------------")
@@ -21,19 +23,10 @@ def validate_api_keys():
 
 def validate_human_voice(text: str) -> tuple[bool, list]:
     problems = []
-    text_lower = text.lower()
     
-    # Human Voice Lock
-    forbidden_phrases = [
-        "amidst", "unease began to stir", "picture of serenity", "claims emerged",
-        "was left to question", "with unimaginable fury", "little did he know",
-        "what happened next", "changed everything", "shocked everyone", 
-        "no one could explain", "you won't believe", "blow your mind",
-        "shivers down", "blood ran cold"
-    ]
-    for phrase in forbidden_phrases:
-        if phrase in text_lower:
-            problems.append(f"Forbidden phrase found: '{phrase}'")
+    # Human Voice Lock (terms live in phrase_matcher.PHRASE_LISTS["forbidden"])
+    for phrase in scan(text)["forbidden"]:
+        problems.append(f"Forbidden phrase found: '{phrase}'")
 
     # Sentence Length
     sentences = re.split(r'[.!?]+', text)
@@ -49,28 +42,15 @@ def validate_human_voice(text: str) -> tuple[bool, list]:
 
 def validate_safety(script_data: dict) -> tuple[bool, list]:
     problems = []
-    text = (script_data.get("hook_text", "") + " " + script_data.get("script_text", "")).lower()
+    text = script_data.get("hook_text", "") + " " + script_data.get("script_text", "")
     
-    unsafe_terms = [
-        "suicide", "kill yourself", "rapist", "rape", "sexual", "nude", "naked",
-        "hitler", "nazi", "terrorist", "bombing instructions",
-        "child abuse", "torture", "gore", "severed"
-    ]
-    
-    for term in unsafe_terms:
-         if term in text:
-             problems.append(f"SAFETY VIOLATION: '{term}' usage detected.")
+    for term in scan(text)["unsafe"]:
+         problems.append(f"SAFETY VIOLATION: '{term}' usage detected.")
              
     return (len(problems) == 0), problems
 
 def validate_micro_details(text: str) -> tuple[bool, list]:
-    sensory_words = [
-        "smell", "scent", "odor", "stink", "aroma",
-        "sound", "noise", "crackled", "flickered", "bang", "whisper", "scream",
-        "cold", "hot", "freezing", "burning", "warm", "icy",
-        "light", "dark", "shadow", "glow", "dim", "bright", "red", "blue", "felt", "touched"
-    ]
-    count = sum(1 for w in sensory_words if w in text.lower())
+    count = len(scan(text)["sensory"])
     if count < 2:
         return False, [f"Micro-detail check failed: Only {count} sensory words found (Target >= 2)."]
     return True, []
@@ -214,16 +194,30 @@ def validate_script_logic(script_data: dict):
 
 # ... existing similarity/embedding funcs ...
 
-def _cosine_similarity(vec1, vec2):
-    dot_product = sum(a*b for a,b in zip(vec1, vec2))
-    norm_a = math.sqrt(sum(a*a for a in vec1))
-    norm_b = math.sqrt(sum(b*b for b in vec2))
-    if norm_a == 0 or norm_b == 0: return 0.0
-    return dot_product / (norm_a * norm_b)
-
 def _get_embedding(text, client):
-    text = text.replace("\n", " ")
-    return client.embeddings.create(input=[text], model="text-embedding-3-small").data[0].embedding
+    return get_embedding_cache().embed([text], openai_embed_fn(client))[0]
+
+# golden_path -> {"stamp": (mtime_ns, size), "index": SimilarityIndex}; rebuilt when the file changes
+_GOLDEN_INDEX = {}
+
+def _golden_index(golden_path: str, client) -> SimilarityIndex:
+    st = os.stat(golden_path)
+    stamp = (st.st_mtime_ns, st.st_size)
+    entry = _GOLDEN_INDEX.get(golden_path)
+    if entry and entry["stamp"] == stamp:
+        return entry["index"]
+
+    with open(golden_path, 'r') as f:
+        golden_list = json.load(f)
+    golden_list = [item for item in golden_list if item.get("script_text")]
+    texts = [item["script_text"] for item in golden_list]
+    labels = [item.get("title") or item["script_text"][:40] for item in golden_list]
+    # Unchanged scripts come from the persistent cache; only edited/new ones hit the API
+    embeddings = get_embedding_cache().embed(texts, openai_embed_fn(client)) if texts else []
+    index = SimilarityIndex(embeddings, labels)
+    _GOLDEN_INDEX[golden_path] = {"stamp": stamp, "index": index}
+    print(f"[*] Golden index: {len(index)} scripts indexed")
+    return index
 
 def validate_golden_similarity(target_text: str):
     golden_path = os.path.join(os.path.dirname(os.path.dirname(__file__)), "assets", "golden_scripts.json")
@@ -231,20 +225,13 @@ def validate_golden_similarity(target_text: str):
         return True, 1.0, "Golden file missing"
 
     try:
-        with open(golden_path, 'r') as f:
-            golden_list = json.load(f)
-        
         client = OpenAI(api_key=OPENAI_API_KEY)
+        index = _golden_index(golden_path, client)
         target_emb = _get_embedding(target_text, client)
         
-        scores = []
-        for item in golden_list:
-            gold_text = item.get("script_text", "")
-            if gold_text:
-                gold_emb = _get_embedding(gold_text, client)
-                scores.append(_cosine_similarity(target_emb, gold_emb))
-        
-        max_score = max(scores) if scores else 0.0
+        max_score, nearest = index.query(target_emb, k=3)
+        if nearest:
+            print("[*] Golden nearest: " + ", ".join(f"{label!r} {score:.3f}" for label, score in nearest))
         
         # PATCH: Disabled for V2 Golden Run (New Style)
         if max_score < 0.01: return False, max_score, "Similarity too LOW"
@@ -255,24 +242,19 @@ def validate_golden_similarity(target_text: str):
         print(f"[!] Similarity Error: {e}")
         return True, 1.0, "Error"
 
-def validate_story_novelty(fingerprint: str):
-    fp_file = os.path.join(OUTPUT_DIR, "fingerprints.json")
-    if os.path.exists(fp_file):
-        with open(fp_file, 'r') as f: fps = json.load(f)
-    else:
-        fps = []
+NOVELTY_THRESHOLD = float(os.getenv("NOVELTY_THRESHOLD", "0.9"))
+_NOVELTY_INDEX = None
 
-    for past_fp in fps:
-        ratio = SequenceMatcher(None, fingerprint, past_fp).ratio()
-        if ratio >= 0.99: # ONLY block EXACT duplicates
-            # PATCH: Allow retries for tuning
-            pass
-            # return False, ratio
-            
-    fps.append(fingerprint)
-    if len(fps) > 50: fps.pop(0)
-    
-    with open(fp_file, 'w') as f:
-        json.dump(fps, f)
-        
-    return True, 0.0
+def get_novelty_index() -> NoveltyIndex:
+    global _NOVELTY_INDEX
+    if _NOVELTY_INDEX is None:
+        _NOVELTY_INDEX = NoveltyIndex(os.path.join(OUTPUT_DIR, "novelty_index.jsonl"), threshold=NOVELTY_THRESHOLD)
+    return _NOVELTY_INDEX
+
+def validate_story_novelty(fingerprint: str, script_text: str = None, replay: bool = False):
+    """
+    Near-duplicate check against every story ever published (MinHash/LSH, see novelty_index.py).
+    Novel stories are appended to the index. Returns (is_novel, estimated Jaccard of the closest match).
+    replay: the script came from the LLM cache, so matching its own earlier record verbatim is allowed.
+    """
+    return get_novelty_index().check_and_add(script_text=script_text, fingerprint=fingerprint, replay=replay)
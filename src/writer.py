@@ -1,12 +1,31 @@
 import json
 import random
+import re
 import os
 from openai import OpenAI
 from .config import OPENAI_API_KEY, OUTPUT_DIR
+from .utils import fan_out
+from .llm_cache import cached_client, served_from_cache
+
+# Per-call timeout (seconds) for the post-validation metadata calls
+WRITER_CALL_TIMEOUT = float(os.getenv("WRITER_CALL_TIMEOUT", "60"))
+# "repair": retries patch the best failing draft from its problem list; "regenerate": start over each time
+WRITER_RETRY_MODE = os.getenv("WRITER_RETRY_MODE", "repair")
+GATE_ORDER = ["logic", "golden", "novelty"]
+
+def _prefix_hook(text: str, hook: str) -> str:
+    """Makes text start with the exact hook, dropping a copy the model re-wrapped or re-spaced."""
+    if text.startswith(hook):
+        return text
+    body = text.strip()
+    rewrapped = re.match(r"\s+".join(re.escape(word) for word in hook.split()), body)
+    if rewrapped:
+        body = body[rewrapped.end():].strip()
+    return f"{hook} {body}"
 
 class ScriptGenerator:
     def __init__(self):
-        self.client = OpenAI(api_key=OPENAI_API_KEY)
+        self.client = cached_client(OpenAI(api_key=OPENAI_API_KEY))
         self.hook_types = [
             "impossible_time", "last_recording", "disappearance",
             "mysterious_message", "camera_capture", "emergency_call",
@@ -14,8 +33,6 @@ class ScriptGenerator:
         ]
 
     def generate_script(self, topic: str, style_profile: dict) -> dict:
-        from .validator import validate_script_logic, validate_golden_similarity, validate_story_novelty
-        
         print(f"[*] 🌑 PROMETHEUS ENGINE v3 STARTING for: {topic}")
         
         # PHASE 1: HOOK ENGINE (A/B Testing Variants)
@@ -25,50 +42,46 @@ class ScriptGenerator:
         # PHASE 2: STORY ENGINE
         max_retries = 3
         final_script = {}
+        best = None  # Best failing draft so far: {"draft", "problems", "gate", "rank"}
         
         for attempt in range(max_retries):
             print(f"[*] Story Generation Attempt {attempt + 1}/{max_retries}...")
             
-            # Initial Generation
-            draft_script = self._generate_story(topic, base_hook, hook_data["hook_type"], style_profile)
+            draft_script = None
+            if attempt > 0 and WRITER_RETRY_MODE == "repair" and best and best["gate"] != "novelty":
+                # Incremental retry: one targeted repair call on the best draft instead of story + rewrite
+                print(f"[*] Repairing best draft ({len(best['problems'])} problem(s) at the {best['gate']} lock)...")
+                # Same draft + problems can come round again: only the first repair may be a cache hit
+                draft_script = self._repair_story(best["draft"], best["problems"], base_hook, cache=(attempt == 1))
             
-            # PHASE 2.5: HUMAN VOICE REWRITE PASS (Critical Lock)
-            print("[*] Running Human Voice Rewrite Pass...")
-            draft_script["script_text"] = self._rewrite_human_voice(draft_script["script_text"], base_hook)
+            if draft_script is None:
+                # Initial Generation
+                # Retries must produce a new draft, so only the first attempt may be served from the LLM cache
+                draft_script = self._generate_story(topic, base_hook, hook_data["hook_type"], style_profile, cache=(attempt == 0))
+                
+                # PHASE 2.5: HUMAN VOICE REWRITE PASS (Critical Lock)
+                print("[*] Running Human Voice Rewrite Pass...")
+                draft_script["script_text"] = self._rewrite_human_voice(draft_script["script_text"], base_hook)
             
             # LOCK CHECKS
-            is_valid, problems = validate_script_logic(draft_script)
-            if not is_valid:
-                print(f"[!] ❌ Logic/Voice Lock Failed: {problems}")
-                continue
-
-            is_golden, score, msg = validate_golden_similarity(draft_script["script_text"])
-            if not is_golden:
-                print(f"[!] ❌ Golden Lock Failed: {msg} ({score:.2f})")
-                continue
-
-            fingerprint = f"{draft_script.get('hook_type')}|{draft_script.get('escalation_pattern')}|{draft_script.get('ending_type')}"
-            is_novel, ratio = validate_story_novelty(fingerprint)
-            if not is_novel:
-                print(f"[!] ❌ Novelty Lock Failed: Too similar ({ratio:.2f})")
-                continue
+            problems, gate = self._check_draft(draft_script)
+            if not problems:
+                final_script = draft_script
+                print(f"[*] ✅ Quality Gates Passed.")
+                break
             
-            final_script = draft_script
-            print(f"[*] ✅ Quality Gates Passed.")
-            break
+            # Later gates passed more checks; within a gate, fewer problems wins
+            rank = (GATE_ORDER.index(gate), -len(problems))
+            if best is None or rank > best["rank"]:
+                best = {"draft": draft_script, "problems": problems, "gate": gate, "rank": rank}
         
         if not final_script:
             raise Exception("Script Generation failed after max retries.")
+        final_script.pop("_from_cache", None)
 
-        # PHASE 4: SEO & METADATA
-        print("[*] Generating SEO Metadata...")
-        seo = self._generate_seo(topic, final_script["script_text"])
-        final_script["metadata"] = seo
-        
-        # PHASE 5: A/B VARIANTS
-        print("[*] Generating A/B Variants...")
-        variants = self._generate_variants(final_script["script_text"])
-        final_script["variants"] = variants
+        # PHASE 4 + 5: SEO & METADATA, A/B VARIANTS (independent calls, run concurrently)
+        print("[*] Generating SEO Metadata + A/B Variants...")
+        final_script["metadata"], final_script["variants"] = self._generate_metadata(topic, final_script["script_text"])
 
         # CLEANUP
         final_script["suggested_style"] = style_profile.get("name", "consistent_comic")
@@ -105,7 +118,7 @@ class ScriptGenerator:
         except:
              return {"hook_type": "fallback", "hook_text": f"The silence at {topic} was deafening."}
 
-    def _generate_story(self, topic: str, hook: str, hook_type: str, style: dict) -> dict:
+    def _generate_story(self, topic: str, hook: str, hook_type: str, style: dict, cache: bool = True) -> dict:
         prompt = (
             f"TOPIC: {topic} | HOOK: {hook}\n"
             "ROLE: You are a Forensic Investigator. You describe FACTS, PHYSICS, and BIOLOGY. You do not describe feelings.\n\n"
@@ -141,10 +154,14 @@ class ScriptGenerator:
         
         response = self.client.chat.completions.create(
             model="gpt-4o", response_format={"type": "json_object"},
-            messages=[{"role": "system", "content": "Prometheus Documentary Engine. JSON Output."}, {"role": "user", "content": prompt}]
+            messages=[{"role": "system", "content": "Prometheus Documentary Engine. JSON Output."}, {"role": "user", "content": prompt}],
+            cache=cache
         )
         data = json.loads(response.choices[0].message.content)
-        
+        data["_from_cache"] = served_from_cache(response)
+        return self._fix_beat_words(data)
+
+    def _fix_beat_words(self, data: dict) -> dict:
         # Auto-Fix Beat Words
         script_text = data.get("script_text", "")
         beats = data.get("beat_words", [])
@@ -158,6 +175,64 @@ class ScriptGenerator:
                  
         return data
 
+    def _check_draft(self, draft_script: dict) -> tuple:
+        """Runs the locks in order. Returns ([], None) on a pass, else (problems, name of the failing lock)."""
+        from .validator import validate_script_logic, validate_golden_similarity, validate_story_novelty
+        
+        is_valid, problems = validate_script_logic(draft_script)
+        if not is_valid:
+            print(f"[!] ❌ Logic/Voice Lock Failed: {problems}")
+            return problems, "logic"
+
+        is_golden, score, msg = validate_golden_similarity(draft_script["script_text"])
+        if not is_golden:
+            print(f"[!] ❌ Golden Lock Failed: {msg} ({score:.2f})")
+            return [f"Golden similarity check failed: {msg} (score {score:.2f})."], "golden"
+
+        fingerprint = f"{draft_script.get('hook_type')}|{draft_script.get('escalation_pattern')}|{draft_script.get('ending_type')}"
+        # A draft replayed from the LLM cache may match its own record from the earlier run
+        is_novel, ratio = validate_story_novelty(fingerprint, draft_script.get("script_text"),
+                                                 replay=draft_script.get("_from_cache", False))
+        if not is_novel:
+            print(f"[!] ❌ Novelty Lock Failed: Too similar ({ratio:.2f})")
+            return [f"Too similar to a published story ({ratio:.2f})."], "novelty"
+        
+        return [], None
+
+    def _repair_story(self, draft: dict, problems: list, hook: str, cache: bool = True):
+        """
+        Asks for a minimal fix of `draft` that resolves `problems` (one call, no rewrite pass).
+        Returns the repaired draft, or None if the reply is unusable (caller regenerates instead).
+        """
+        current = {k: draft.get(k) for k in ("hook_text", "script_text", "scenes", "narrative_pov", "fact_confidence")}
+        prompt = (
+            "This story draft failed automated checks. Fix ONLY what the problems below require.\n"
+            "PROBLEMS:\n" + "\n".join(f"- {p}" for p in problems) + "\n\n"
+            f"DRAFT JSON:\n{json.dumps(current, ensure_ascii=False)}\n\n"
+            "RULES:\n"
+            "- Keep the events, facts and scene order identical unless a problem names them.\n"
+            "- Keep the human spoken voice: short sentences (avg 12 words), concrete physical detail.\n"
+            f"- script_text MUST START with the exact Hook: \"{hook}\"\n"
+            "Return the full corrected draft as JSON with the same keys."
+        )
+        try:
+            response = self.client.chat.completions.create(
+                model="gpt-4o", response_format={"type": "json_object"},
+                messages=[{"role": "system", "content": "Prometheus Documentary Engine. JSON Output."}, {"role": "user", "content": prompt}],
+                cache=cache
+            )
+            data = json.loads(response.choices[0].message.content)
+        except Exception as e:
+            print(f"[!] Repair pass failed ({e}). Regenerating instead.")
+            return None
+        if not isinstance(data, dict) or not data.get("script_text"):
+            return None
+
+        repaired = {**draft, **{k: v for k, v in data.items() if v}, "_from_cache": served_from_cache(response)}
+        repaired["script_text"] = _prefix_hook(repaired["script_text"], hook)
+        repaired["beat_words"] = []  # Stale after the edit; rebuilt from the new text
+        return self._fix_beat_words(repaired)
+
     def _rewrite_human_voice(self, script_text: str, hook: str) -> str:
         # PATCH 3: Fix Rewrite Hook Integrity
         prompt = (
@@ -182,10 +257,16 @@ class ScriptGenerator:
             messages=[{"role": "user", "content": prompt}]
         )
         content = response.choices[0].message.content
-        if not content.startswith(hook):
-             # Force hook prefix if LLM disobeyed
-             content = f"{hook} " + content.lstrip(hook).strip()
-        return content
+        # Force hook prefix if LLM disobeyed
+        return _prefix_hook(content, hook)
+
+    def _generate_metadata(self, topic: str, script_text: str) -> tuple:
+        """Fans out the SEO and A/B-variant calls. Returns (seo, variants)."""
+        results = fan_out({
+            "seo": lambda: self._generate_seo(topic, script_text),
+            "variants": lambda: self._generate_variants(script_text),
+        }, timeout=WRITER_CALL_TIMEOUT, label="Writer metadata")
+        return results["seo"], results["variants"]
 
     def _generate_seo(self, topic: str, script: str) -> dict:
         prompt = (
@@ -194,7 +275,7 @@ class ScriptGenerator:
         )
         response = self.client.chat.completions.create(
             model="gpt-4o", response_format={"type": "json_object"},
-            messages=[{"role": "user", "content": prompt}]
+            messages=[{"role": "user", "content": prompt}], timeout=WRITER_CALL_TIMEOUT
         )
         return json.loads(response.choices[0].message.content)
 
@@ -212,6 +293,6 @@ class ScriptGenerator:
         
         response = self.client.chat.completions.create(
             model="gpt-4o", response_format={"type": "json_object"},
-            messages=[{"role": "user", "content": prompt}]
+            messages=[{"role": "user", "content": prompt}], timeout=WRITER_CALL_TIMEOUT
         )
         return json.loads(response.choices[0].message.content)
\ No newline at end of file
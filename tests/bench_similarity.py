@@ -0,0 +1,53 @@
+"""
+Micro-benchmark: pure-Python cosine loop (the old validator path) vs SimilarityIndex.
+Usage: python tests/bench_similarity.py [--dim 1536] [--sizes 10,1000,100000]
+The loop is timed on at most LOOP_SAMPLE references and extrapolated linearly for bigger corpora.
+"""
+import sys
+import os
+import argparse
+import time
+
+import numpy as np
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from src.similarity import SimilarityIndex
+from test_similarity import loop_cosine
+
+LOOP_SAMPLE = 1000
+
+def _best_of(fn, repeats=3):
+    best = float("inf")
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+def run(sizes, dim):
+    rng = np.random.default_rng(0)
+    query = rng.standard_normal(dim).astype(np.float32)
+    query_list = query.tolist()
+    print(f"{'refs':>8} | {'loop (ms)':>12} | {'index build (ms)':>16} | {'index query (ms)':>16} | {'speedup':>8}")
+    for n in sizes:
+        refs = rng.standard_normal((n, dim)).astype(np.float32)
+
+        sample = refs[:min(n, LOOP_SAMPLE)].tolist()
+        loop_sec = _best_of(lambda: max(loop_cosine(query_list, r) for r in sample), repeats=1) * (n / len(sample))
+
+        build_sec = _best_of(lambda: SimilarityIndex(refs), repeats=1)
+        index = SimilarityIndex(refs)
+        query_sec = _best_of(lambda: index.query(query, k=5))
+
+        note = "*" if n > LOOP_SAMPLE else " "
+        print(f"{n:>8} | {loop_sec * 1000:>11.2f}{note} | {build_sec * 1000:>16.2f} | {query_sec * 1000:>16.3f} | {loop_sec / query_sec:>7.0f}x")
+    print(f"* extrapolated from {LOOP_SAMPLE} references")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--dim", type=int, default=1536)
+    parser.add_argument("--sizes", default="10,1000,100000")
+    args = parser.parse_args()
+    run([int(s) for s in args.sizes.split(",")], args.dim)
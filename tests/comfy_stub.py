@@ -0,0 +1,183 @@
+"""
+Local stand-in for a ComfyUI server: /prompt, /history, /view, /queue, /system_stats and /ws.
+Queued prompts "render" on a background timer and announce completion over the websocket.
+FakeComfyClient is an in-memory client for tests that don't need HTTP at all.
+"""
+import base64
+import hashlib
+import json
+import struct
+import threading
+import time
+import urllib.parse
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+WS_GUID = "258EAFA5-E914-47DA-95CA-C5AB0DC85B11"
+
+class ComfyStub:
+    def __init__(self, render_delay=0.05, websocket=True, fail_queue=False, broken_output=False, backlog=0):
+        self.render_delay = render_delay
+        self.websocket = websocket
+        self.fail_queue = fail_queue
+        self.broken_output = broken_output
+        self.backlog = backlog  # Phantom pending prompts reported by /queue
+        self.history = {}
+        self.images = {}
+        self.queued = []
+        self.running = 0
+        self.request_counts = {}
+        self.sockets = {}  # client_id -> (wfile, lock)
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), self._handler())
+        self._server.daemon_threads = True
+        self.address = f"127.0.0.1:{self._server.server_address[1]}"
+
+    def __enter__(self):
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._server.shutdown()
+        self._server.server_close()
+
+    def count(self, prefix):
+        return sum(n for path, n in self.request_counts.items() if path.startswith(prefix))
+
+    def _render(self, prompt_id, client_id, workflow):
+        time.sleep(self.render_delay)
+        filename = f"{prompt_id}.png"
+        with self._lock:
+            self.images[filename] = json.dumps(workflow, sort_keys=True).encode("utf-8")
+            outputs = {} if self.broken_output else {
+                "9": {"images": [{"filename": filename, "subfolder": "", "type": "output"}]}
+            }
+            self.history[prompt_id] = {"outputs": outputs}
+            self.running -= 1
+        self._send_ws(client_id, {"type": "executing", "data": {"node": None, "prompt_id": prompt_id}})
+
+    def _send_ws(self, client_id, event):
+        target = self.sockets.get(client_id)
+        if not target:
+            return
+        wfile, lock = target
+        payload = json.dumps(event).encode("utf-8")
+        if len(payload) < 126:
+            header = struct.pack("!BB", 0x81, len(payload))
+        else:
+            header = struct.pack("!BBH", 0x81, 126, len(payload))
+        try:
+            with lock:
+                wfile.write(header + payload)
+                wfile.flush()
+        except OSError:
+            pass
+
+    def _handler(self):
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, *args):
+                pass
+
+            def _json(self, obj, status=200):
+                body = json.dumps(obj).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def _track(self):
+                path = urllib.parse.urlparse(self.path).path
+                stub.request_counts[path] = stub.request_counts.get(path, 0) + 1
+                return path
+
+            def do_POST(self):
+                path = self._track()
+                body = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))))
+                if path != "/prompt":
+                    return self._json({}, 404)
+                if stub.fail_queue:
+                    return self._json({"error": "node offline"}, 500)
+                with stub._lock:
+                    prompt_id = f"prompt_{len(stub.queued)}"
+                    stub.queued.append((prompt_id, body["client_id"], body["prompt"]))
+                    stub.running += 1
+                threading.Thread(
+                    target=stub._render, args=(prompt_id, body["client_id"], body["prompt"]), daemon=True
+                ).start()
+                self._json({"prompt_id": prompt_id, "number": len(stub.queued)})
+
+            def do_GET(self):
+                path = self._track()
+                query = urllib.parse.parse_qs(urllib.parse.urlparse(self.path).query)
+                if path == "/ws":
+                    return self._websocket(query["clientId"][0])
+                if path.startswith("/history/"):
+                    prompt_id = path.rsplit("/", 1)[1]
+                    with stub._lock:
+                        entry = stub.history.get(prompt_id)
+                    return self._json({prompt_id: entry} if entry else {})
+                if path == "/view":
+                    data = stub.images[query["filename"][0]]
+                    self.send_response(200)
+                    self.send_header("Content-Length", str(len(data)))
+                    self.end_headers()
+                    self.wfile.write(data)
+                    return
+                if path == "/queue":
+                    with stub._lock:
+                        running = [[0, p] for p, _, _ in stub.queued[-stub.running:]] if stub.running else []
+                    running += [[0, f"backlog_{i}"] for i in range(stub.backlog)]
+                    return self._json({"queue_running": running[:1], "queue_pending": running[1:]})
+                if path == "/system_stats":
+                    return self._json({"devices": [{"name": "stub", "type": "cuda", "vram_free": 8 << 30}]})
+                self._json({}, 404)
+
+            def _websocket(self, client_id):
+                if not stub.websocket:
+                    return self._json({}, 404)
+                accept = base64.b64encode(
+                    hashlib.sha1((self.headers["Sec-WebSocket-Key"] + WS_GUID).encode()).digest()
+                ).decode()
+                self.send_response(101)
+                self.send_header("Upgrade", "websocket")
+                self.send_header("Connection", "Upgrade")
+                self.send_header("Sec-WebSocket-Accept", accept)
+                self.end_headers()
+                self.wfile.flush()
+                stub.sockets[client_id] = (self.wfile, threading.Lock())
+                stub._stop.wait()
+                self.close_connection = True
+
+        return Handler
+
+class FakeComfyClient:
+    """In-memory ComfyUI stand-in that finishes prompts in reverse submission order."""
+    def __init__(self):
+        self.server_address = "fake:8188"
+        self.queued = []
+        self.waits = []
+
+    def get_queue(self):
+        return {"queue_running": [], "queue_pending": []}
+
+    def get_system_stats(self):
+        return {"devices": []}
+
+    def queue_prompt(self, workflow):
+        prompt_id = f"p{len(self.queued)}"
+        self.queued.append((prompt_id, workflow))
+        return {"prompt_id": prompt_id}
+
+    def wait_for_prompts(self, prompt_ids, stall_timeout=None):
+        self.waits.append(len(self.queued))
+        for prompt_id in reversed(prompt_ids):
+            outputs = {"9": {"images": [{"filename": prompt_id, "subfolder": "", "type": "output"}]}}
+            yield prompt_id, {prompt_id: {"outputs": outputs}}
+
+    def get_image(self, filename, subfolder, folder_type):
+        workflow = dict(self.queued)[filename]
+        return workflow["6"]["inputs"]["text"].encode("utf-8")
@@ -0,0 +1,79 @@
+import sys
+import os
+import shutil
+import subprocess
+import tempfile
+import unittest
+from unittest import mock
+
+import numpy as np
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from src import narrator
+
+SR = narrator.SAMPLE_RATE
+
+def tone(seconds: float, freq: float = 440.0) -> np.ndarray:
+    t = np.arange(int(seconds * SR)) / SR
+    mono = (np.sin(2 * np.pi * freq * t) * 8000).astype(np.int16)
+    return np.stack([mono, mono], axis=1)
+
+class TestAudioAssembly(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp)
+
+    def test_numpy_assembly_is_sample_accurate(self):
+        lengths = {"First line.": 1.0, "Second line.": 0.5}
+
+        def fake_chunk(text, filepath):
+            narrator.encode_mp3(tone(lengths[text]), filepath)
+
+        with mock.patch.object(narrator, "OpenAI"), \
+             mock.patch.object(narrator, "get_tts_cache", return_value=None), \
+             mock.patch.object(narrator, "AUDIO_ASSEMBLY", "numpy"):
+            engine = narrator.AudioEngine()
+            engine._generate_single_chunk = fake_chunk
+            path, metadata = engine.generate_voice("First line. [SILENCE:0.75] Second line.", self.tmp)
+
+        self.assertEqual([m["type"] for m in metadata], ["speech", "silence", "speech"])
+        # Segments tile the timeline exactly: each starts where the previous one ended
+        for prev, cur in zip(metadata, metadata[1:]):
+            self.assertEqual(prev["end"], cur["start"])
+        self.assertEqual(metadata[1]["end"] - metadata[1]["start"], 0.75)
+        # MP3 encoder padding makes decoded chunks slightly longer than the source tone
+        self.assertAlmostEqual(metadata[0]["end"], 1.0, delta=0.1)
+
+        samples = narrator.decode_pcm(path)
+        self.assertAlmostEqual(len(samples) / SR, metadata[-1]["end"], delta=0.1)
+        silence = samples[int(metadata[1]["start"] * SR) + 2000:int(metadata[1]["end"] * SR) - 2000]
+        self.assertLess(np.abs(silence.astype(np.int32)).max(), 200)
+
+        self.assertFalse([f for f in os.listdir(self.tmp) if f.startswith("chunk_")])
+        print("✅ NumPy assembly: one decode per chunk, one encode, exact timings.")
+
+    def test_failed_encode_still_removes_chunks(self):
+        real_encode = narrator.encode_mp3
+        voiced = []
+
+        def fake_chunk(text, filepath):
+            real_encode(tone(0.2), filepath)
+            voiced.append(filepath)
+
+        with mock.patch.object(narrator, "OpenAI"), \
+             mock.patch.object(narrator, "get_tts_cache", return_value=None), \
+             mock.patch.object(narrator, "AUDIO_ASSEMBLY", "numpy"):
+            engine = narrator.AudioEngine()
+            engine._generate_single_chunk = fake_chunk
+            with mock.patch.object(narrator, "encode_mp3", side_effect=subprocess.CalledProcessError(1, "ffmpeg")):
+                with self.assertRaises(subprocess.CalledProcessError):
+                    engine.generate_voice("One. [SILENCE] Two.", self.tmp)
+
+        self.assertEqual(len(voiced), 2)  # Both chunks existed before the final encode failed
+        self.assertEqual(os.listdir(self.tmp), [])
+
+if __name__ == '__main__':
+    unittest.main()
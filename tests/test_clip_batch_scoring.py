@@ -0,0 +1,91 @@
+import sys
+import os
+import shutil
+import tempfile
+import types
+import unittest
+from unittest import mock
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+try:
+    import torch
+except ImportError:
+    torch = None
+
+from src import artist
+
+class StubClip:
+    """Image features (1, gray level), text features (1, prompt length): every pair has a distinct cosine."""
+    def __init__(self):
+        self.image_batches = []
+        self.text_batches = []
+
+    def preprocess(self, image):
+        return torch.tensor([float(image.getpixel((0, 0)))])
+
+    def encode_image(self, images):
+        self.image_batches.append(len(images))
+        return torch.stack([torch.ones(len(images)), images[:, 0]], dim=1)
+
+    def encode_text(self, tokens):
+        self.text_batches.append(len(tokens))
+        return torch.stack([torch.ones(len(tokens)), tokens[:, 0]], dim=1)
+
+def tokenize(texts):
+    return torch.tensor([[float(len(t))] for t in texts])
+
+def expected(gray: int, prompt: str) -> float:
+    a, b = (1.0, float(gray)), (1.0, float(len(prompt)))
+    dot = a[0] * b[0] + a[1] * b[1]
+    return dot / ((a[0] ** 2 + a[1] ** 2) ** 0.5 * (b[0] ** 2 + b[1] ** 2) ** 0.5)
+
+@unittest.skipIf(torch is None, "torch not installed")
+class TestClipBatchScoring(unittest.TestCase):
+    def setUp(self):
+        from PIL import Image
+        self.tmp = tempfile.mkdtemp()
+        self.grays = [10, 40, 80, 120, 200]
+        self.prompts = ["a", "valve room", "dark corridor at night", "rope", "the platform burning at sea"]
+        self.paths = []
+        for i, gray in enumerate(self.grays):
+            path = os.path.join(self.tmp, f"scene_{i + 1:02d}.png")
+            Image.new("L", (4, 4), gray).save(path)
+            self.paths.append(path)
+
+        self.stub = StubClip()
+        with mock.patch.object(artist, "OpenAI"), mock.patch.object(artist.VisualEngine, "_init_clip"):
+            self.engine = artist.VisualEngine()
+        self.engine.clip_model = self.stub
+        self.engine.clip_preprocess = self.stub.preprocess
+        self.engine.device = "cpu"
+        self.patches = [
+            mock.patch.dict(sys.modules, {"clip": types.SimpleNamespace(tokenize=tokenize)}),
+            mock.patch.object(artist, "CLIP_BATCH_SIZE", 2),
+        ]
+        for p in self.patches:
+            p.start()
+
+    def tearDown(self):
+        for p in self.patches:
+            p.stop()
+        shutil.rmtree(self.tmp)
+
+    def test_one_encode_per_chunk_scoring_the_diagonal(self):
+        scores = self.engine._calculate_clip_scores(self.paths, self.prompts)
+
+        # 5 pairs in chunks of 2: three encode_image/encode_text calls, not one per image
+        self.assertEqual(self.stub.image_batches, [2, 2, 1])
+        self.assertEqual(self.stub.text_batches, [2, 2, 1])
+        # One score per (image, own prompt), in input order: no image x text cross product
+        self.assertEqual(len(scores), len(self.paths))
+        for score, gray, prompt in zip(scores, self.grays, self.prompts):
+            self.assertAlmostEqual(score, expected(gray, prompt), places=5)
+
+        singles = [self.engine._calculate_clip_score(p, t) for p, t in zip(self.paths, self.prompts)]
+        for batched, single in zip(scores, singles):
+            self.assertAlmostEqual(batched, single, places=5)
+        print("✅ CLIP: one forward pass per chunk, each image scored against its own prompt.")
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,66 @@
+import sys
+import os
+import shutil
+import tempfile
+import unittest
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from src.local_comfyui import queue_images
+from comfy_stub import FakeComfyClient
+
+class TestComfyPipeline(unittest.TestCase):
+    def setUp(self):
+        self.out_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.out_dir)
+
+    def test_out_of_order_completions_map_to_scene_index(self):
+        client = FakeComfyClient()
+        prompts = [f"scene prompt {i}" for i in range(16)]
+
+        batch = queue_images("job_test", prompts, "neg", self.out_dir, client=client, pipelined=True, cache=False)
+        paths = batch.collect()
+
+        # Every scene was queued before the first wait
+        self.assertEqual(client.waits, [16])
+        self.assertEqual(len(paths), 16)
+        for i, path in enumerate(paths):
+            self.assertEqual(os.path.basename(path), f"scene_{i+1:02d}.png")
+            with open(path, "rb") as f:
+                self.assertEqual(f.read().decode("utf-8"), prompts[i])
+        print("✅ Pipelined batch mapped 16 out-of-order completions back to their scenes.")
+
+    def test_sequential_mode_waits_per_scene(self):
+        client = FakeComfyClient()
+        paths = queue_images("job_test", ["a", "b"], "neg", self.out_dir, client=client, pipelined=False, cache=False).collect()
+
+        self.assertEqual(client.waits, [1, 2])
+        self.assertEqual([os.path.basename(p) for p in paths], ["scene_01.png", "scene_02.png"])
+
+    def test_partial_retry_keeps_scene_index_and_names(self):
+        client = FakeComfyClient()
+        bad = [4, 11]
+        paths = queue_images("job_test", ["p5", "p12"], "neg", self.out_dir, {"base_seed": 500},
+                             client=client, cache=False, indices=bad).collect()
+
+        self.assertEqual([os.path.basename(p) for p in paths], ["scene_05.png", "scene_12.png"])
+        seeds = [wf["3"]["inputs"]["seed"] for _, wf in client.queued]
+        self.assertEqual(seeds, [500 + 4 * 1000, 500 + 11 * 1000])
+        prefixes = [wf["9"]["inputs"]["filename_prefix"] for _, wf in client.queued]
+        self.assertEqual(prefixes, ["job_test_scene_05", "job_test_scene_12"])
+        print("✅ Retry of scenes 5 and 12 re-queued only those two, under their own names.")
+
+    def test_explicit_filenames(self):
+        client = FakeComfyClient()
+        paths = queue_images("job_thumb", ["a", "b"], "neg", self.out_dir, client=client, cache=False,
+                             filenames=["thumb_A.png", "thumb_B.png"]).collect()
+
+        self.assertEqual([os.path.basename(p) for p in paths], ["thumb_A.png", "thumb_B.png"])
+        with self.assertRaises(ValueError):
+            queue_images("job_thumb", ["a", "b"], "neg", self.out_dir, client=client, cache=False, indices=[3])
+
+if __name__ == '__main__':
+    unittest.main()
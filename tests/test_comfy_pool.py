@@ -0,0 +1,83 @@
+import sys
+import os
+import shutil
+import tempfile
+import unittest
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from comfy_stub import ComfyStub
+from src.comfy_pool import ComfyUIPool
+from src.local_comfyui import ComfyUIClient, queue_images
+
+class TestComfyPool(unittest.TestCase):
+    def setUp(self):
+        self.out_dir = tempfile.mkdtemp()
+        self.pools = []
+
+    def tearDown(self):
+        for pool in self.pools:
+            pool.close()
+        shutil.rmtree(self.out_dir)
+
+    def _pool(self, *stubs):
+        pool = ComfyUIPool([ComfyUIClient(s.address) for s in stubs])
+        self.pools.append(pool)
+        return pool
+
+    def _run(self, pool, count):
+        prompts = [f"prompt {i}" for i in range(count)]
+        return queue_images("job_pool", prompts, "neg", self.out_dir, pool=pool, cache=False).collect()
+
+    def test_spreads_scenes_across_nodes(self):
+        with ComfyStub() as a, ComfyStub() as b:
+            pool = self._pool(a, b)
+            paths = self._run(pool, 8)
+
+        self.assertTrue(all(paths))
+        self.assertGreater(len(a.queued), 0)
+        self.assertGreater(len(b.queued), 0)
+        stats = pool.stats()
+        self.assertEqual(sum(s["completed"] for s in stats.values()), 8)
+        self.assertIsNotNone(stats[a.address]["avg_sec"])
+        print(f"✅ 8 scenes split {len(a.queued)}/{len(b.queued)} across two nodes.")
+
+    def test_dispatch_prefers_shallow_queue(self):
+        with ComfyStub(backlog=20) as busy, ComfyStub() as idle:
+            pool = self._pool(busy, idle)
+            self._run(pool, 4)
+
+        self.assertEqual(len(busy.queued), 0)
+        self.assertEqual(len(idle.queued), 4)
+        self.assertEqual(pool.stats()[busy.address]["queue_depth"], 20)
+
+    def test_failed_scenes_retry_on_another_node(self):
+        with ComfyStub(fail_queue=True) as down, ComfyStub(broken_output=True) as broken, ComfyStub() as good:
+            pool = self._pool(down, broken, good)
+            paths = self._run(pool, 3)
+
+        self.assertEqual([os.path.basename(p) for p in paths], ["scene_01.png", "scene_02.png", "scene_03.png"])
+        self.assertEqual(len(good.queued), 3)
+        stats = pool.stats()
+        self.assertGreater(stats[down.address]["failed"], 0)
+        self.assertGreater(stats[broken.address]["failed"], 0)
+        self.assertEqual(stats[good.address]["completed"], 3)
+        print("✅ Scenes from a dead node and a broken node were re-queued on a healthy node.")
+
+    def test_single_node_failure_is_fatal(self):
+        with ComfyStub(broken_output=True) as broken:
+            pool = self._pool(broken)
+            with self.assertRaises(RuntimeError):
+                self._run(pool, 1)
+
+    def test_aborted_batch_releases_in_flight(self):
+        with ComfyStub(broken_output=True) as broken:
+            pool = self._pool(broken)
+            with self.assertRaises(RuntimeError):
+                self._run(pool, 3)
+        # The scenes still queued when the first failure went fatal are no longer counted against the node
+        self.assertEqual(pool.stats()[broken.address]["in_flight"], 0)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,67 @@
+import sys
+import os
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from comfy_stub import ComfyStub
+from src import local_comfyui
+from src.local_comfyui import ComfyUIClient, queue_images
+
+class TestComfyWebSocketListener(unittest.TestCase):
+    def setUp(self):
+        self.out_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.out_dir)
+
+    def test_one_socket_resolves_many_prompts(self):
+        with ComfyStub() as stub:
+            client = ComfyUIClient(stub.address)
+            paths = queue_images("job_ws", [f"prompt {i}" for i in range(6)], "neg", self.out_dir, client=client, cache=False).collect()
+            client.close()
+
+        self.assertEqual(len(paths), 6)
+        self.assertTrue(all(os.path.exists(p) for p in paths))
+        self.assertEqual(stub.count("/ws"), 1)
+        # Each prompt's history is fetched once, after its completion event (no 1s polling)
+        self.assertEqual(stub.count("/history/"), 6)
+        print("✅ One /ws connection resolved 6 prompt completions.")
+
+    def test_falls_back_to_polling_without_websocket(self):
+        with ComfyStub(websocket=False) as stub, \
+             mock.patch.object(local_comfyui, "POLL_MIN_DELAY", 0.01):
+            client = ComfyUIClient(stub.address)
+            paths = queue_images("job_poll", ["a", "b"], "neg", self.out_dir, client=client, cache=False).collect()
+
+        self.assertFalse(client.listener.connected)
+        self.assertEqual([os.path.basename(p) for p in paths], ["scene_01.png", "scene_02.png"])
+        print("✅ History polling with backoff used when /ws is unavailable.")
+
+    def test_dropped_socket_is_reconnected(self):
+        with ComfyStub() as stub, mock.patch.object(local_comfyui, "WS_RECONNECT_SEC", 0):
+            client = ComfyUIClient(stub.address)
+            queue_images("job_ws", ["a"], "neg", self.out_dir, client=client, cache=False).collect()
+            dropped = client.listener
+            # ComfyUI going away: the server closes the socket under the open listener
+            wfile, lock = stub.sockets[client.client_id]
+            with lock:
+                wfile.write(b"\x88\x00")
+                wfile.flush()
+            dropped._thread.join(timeout=5)
+            self.assertFalse(dropped.connected)
+
+            paths = queue_images("job_ws", ["b"], "neg", self.out_dir, client=client, cache=False).collect()
+            client.close()
+
+        self.assertTrue(all(paths))
+        self.assertEqual(stub.count("/ws"), 2)
+        self.assertIsNot(client.listener, dropped)
+        print("✅ Dropped /ws reconnected on the next queue instead of polling for good.")
+
+if __name__ == '__main__':
+    unittest.main()
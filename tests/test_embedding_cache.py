@@ -0,0 +1,86 @@
+import sys
+import os
+import json
+import shutil
+import tempfile
+import time
+import unittest
+from unittest import mock
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from src import validator
+from src.embeddings import EmbeddingCache
+
+class FakeEmbedder:
+    def __init__(self):
+        self.calls = []
+
+    def __call__(self, texts):
+        self.calls.append(list(texts))
+        return [[float(len(t)), 1.0, 0.5] for t in texts]
+
+class TestEmbeddingCache(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.cache = EmbeddingCache(os.path.join(self.tmp, "emb.sqlite"), model="test-model")
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp)
+
+    def test_misses_batched_and_persisted(self):
+        embedder = FakeEmbedder()
+        vecs = self.cache.embed(["alpha", "beta", "alpha"], embedder)
+        self.assertEqual(embedder.calls, [["alpha", "beta"]])
+        self.assertEqual(vecs[0], [5.0, 1.0, 0.5])
+
+        # A fresh instance on the same file serves everything from disk
+        reopened = EmbeddingCache(self.cache.path, model="test-model")
+        self.assertEqual(reopened.embed(["beta"], embedder), [[4.0, 1.0, 0.5]])
+        self.assertEqual(len(embedder.calls), 1)
+
+        other_model = EmbeddingCache(self.cache.path, model="other-model")
+        other_model.embed(["beta"], embedder)
+        self.assertEqual(len(embedder.calls), 2)
+
+    def test_least_recently_used_rows_evicted(self):
+        cache = EmbeddingCache(os.path.join(self.tmp, "small.sqlite"), model="test-model", max_rows=2)
+        embedder = FakeEmbedder()
+        clock = iter(range(100))
+        with mock.patch("src.embeddings.time.time", side_effect=lambda: next(clock)):
+            cache.embed(["draft one"], embedder)
+            cache.embed(["gold"], embedder)
+            cache.embed(["draft one"], embedder)  # Hit: now more recent than "gold"
+            cache.embed(["draft two"], embedder)
+            self.assertEqual(cache.stats()["evictions"], 1)
+
+            cache.embed(["draft one", "draft two"], embedder)
+            self.assertEqual(len(embedder.calls), 3)
+            cache.embed(["gold"], embedder)
+            self.assertEqual(embedder.calls[-1], ["gold"])
+
+    def test_golden_index_embeds_only_candidate(self):
+        golden_path = os.path.join(self.tmp, "golden.json")
+        with open(golden_path, "w") as f:
+            json.dump([{"script_text": "gold one"}, {"script_text": "gold two"}, {"script_text": ""}], f)
+
+        embedder = FakeEmbedder()
+        with mock.patch.object(validator, "get_embedding_cache", return_value=self.cache), \
+             mock.patch.object(validator, "openai_embed_fn", return_value=embedder), \
+             mock.patch.object(validator, "_GOLDEN_INDEX", {}):
+            for attempt in range(3):
+                validator._golden_index(golden_path, client=None)
+                validator._get_embedding(f"candidate {attempt}", client=None)
+            self.assertEqual(len(embedder.calls), 4)  # golden corpus once + 3 candidates
+
+            time.sleep(0.01)
+            with open(golden_path, "w") as f:
+                json.dump([{"script_text": "gold one"}, {"script_text": "gold three"}], f)
+            golden = validator._golden_index(golden_path, client=None)
+
+        self.assertEqual(len(golden), 2)
+        self.assertEqual(embedder.calls[-1], ["gold three"])
+        print(f"✅ Golden corpus embedded once; cache stats {self.cache.stats()}")
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,52 @@
+import sys
+import os
+import time
+import unittest
+from unittest import mock
+from unittest.mock import MagicMock
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from src.utils import fan_out
+from src import writer
+
+class TestFanOut(unittest.TestCase):
+    def test_calls_overlap(self):
+        start = time.perf_counter()
+        results = fan_out({name: (lambda n=name: time.sleep(0.3) or n) for name in ("a", "b", "c")})
+        self.assertEqual(results, {"a": "a", "b": "b", "c": "c"})
+        self.assertLess(time.perf_counter() - start, 0.6)
+
+    def test_timeout_and_errors_raise(self):
+        with self.assertRaises(TimeoutError):
+            fan_out({"fast": lambda: 1, "slow": lambda: time.sleep(1)}, timeout=0.1)
+
+        def boom():
+            raise ValueError("bad json")
+        with self.assertRaises(ValueError):
+            fan_out({"ok": lambda: 1, "boom": boom})
+
+    def test_writer_metadata_runs_concurrently(self):
+        def slow_create(**kwargs):
+            time.sleep(0.3)
+            content = '{"titles": ["t"]}' if "SEO" in kwargs["messages"][0]["content"] else '{"hook_b": "b", "hook_c": "c"}'
+            return MagicMock(choices=[MagicMock(message=MagicMock(content=content))])
+
+        with mock.patch.object(writer, "OpenAI"), mock.patch("src.llm_cache.LLM_CACHE_ENABLED", False):
+            gen = writer.ScriptGenerator()
+        gen.client = MagicMock()
+        gen.client.chat.completions.create.side_effect = slow_create
+
+        start = time.perf_counter()
+        seo, variants = gen._generate_metadata("Topic", "Did you know...")
+        elapsed = time.perf_counter() - start
+
+        self.assertEqual(seo, {"titles": ["t"]})
+        self.assertEqual(variants["hook_b"], "b")
+        self.assertLess(elapsed, 0.55)
+        for call in gen.client.chat.completions.create.call_args_list:
+            self.assertEqual(call.kwargs["timeout"], writer.WRITER_CALL_TIMEOUT)
+        print(f"✅ SEO + variants finished in {elapsed:.2f}s (2 x 0.3s calls).")
+
+if __name__ == '__main__':
+    unittest.main()
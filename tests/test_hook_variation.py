@@ -1,12 +1,14 @@
 import sys
 import os
 import unittest
-from unittest.mock import MagicMock
+from unittest.mock import MagicMock, patch
 
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
 
 from src.writer import ScriptGenerator
 
+# LLM_CACHE=0: unit tests must not create or read assets/cache/llm.sqlite
+@patch("src.llm_cache.LLM_CACHE_ENABLED", False)
 class TestHookVariation(unittest.TestCase):
     def test_hook_banned_phrases(self):
         writer = ScriptGenerator()
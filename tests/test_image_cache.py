@@ -0,0 +1,76 @@
+import sys
+import os
+import shutil
+import tempfile
+import time
+import unittest
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from comfy_stub import FakeComfyClient
+from src.content_cache import ContentCache
+from src.local_comfyui import queue_images, workflow_cache_key, _build_workflow
+
+class TestImageCache(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.out_dir = os.path.join(self.tmp, "out")
+        os.makedirs(self.out_dir)
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp)
+
+    def _write(self, name, size):
+        path = os.path.join(self.tmp, name)
+        with open(path, "wb") as f:
+            f.write(b"x" * size)
+        return path
+
+    def test_lru_eviction_and_counters(self):
+        cache = ContentCache(os.path.join(self.tmp, "cache"), max_bytes=250)
+        for key in ("aa1", "bb2", "cc3"):
+            cache.store(key, self._write(key, 100))
+            time.sleep(0.01)
+
+        # Over budget after the third entry: the oldest one goes
+        self.assertEqual(cache.evictions, 1)
+        dst = os.path.join(self.tmp, "dst")
+        self.assertFalse(cache.fetch("aa1", dst))
+        self.assertTrue(cache.fetch("bb2", dst))  # Touch: bb2 is now most recent
+        time.sleep(0.01)
+
+        cache.store("dd4", self._write("dd4", 100))
+        self.assertFalse(cache.fetch("cc3", dst))
+        self.assertTrue(cache.fetch("bb2", dst))
+        self.assertEqual(cache.stats()["hits"], 2)
+        self.assertEqual(cache.stats()["misses"], 2)
+        print(f"✅ LRU cache stats: {cache.stats()}")
+
+    def test_key_ignores_job_specific_filename(self):
+        args = dict(model_name="m", positive="p", negative="n", width=512, height=896, steps=25, cfg=6, seed=7)
+        key_a = workflow_cache_key(_build_workflow(filename_prefix="job_a_scene_01", **args))
+        key_b = workflow_cache_key(_build_workflow(filename_prefix="job_b_scene_01", **args))
+        key_c = workflow_cache_key(_build_workflow(filename_prefix="job_a_scene_01", **{**args, "seed": 8}))
+        self.assertEqual(key_a, key_b)
+        self.assertNotEqual(key_a, key_c)
+
+    def test_rerun_with_same_seed_skips_comfyui(self):
+        cache = ContentCache(os.path.join(self.tmp, "cache"), max_bytes=10 * 1024 * 1024, ext=".png")
+        prompts = ["scene one", "scene two", "scene three"]
+        cfg = {"base_seed": 4242}
+
+        first = FakeComfyClient()
+        queue_images("job_1", prompts, "neg", self.out_dir, cfg, client=first, cache=cache).collect()
+        self.assertEqual(len(first.queued), 3)
+
+        rerun = FakeComfyClient()
+        paths = queue_images("job_2", prompts, "neg", self.out_dir, cfg, client=rerun, cache=cache).collect()
+        self.assertEqual(len(rerun.queued), 0)
+        with open(paths[1], "rb") as f:
+            self.assertEqual(f.read(), b"scene two")
+        self.assertEqual(cache.hits, 3)
+        print("✅ Re-run served all 3 scenes from the image cache.")
+
+if __name__ == '__main__':
+    unittest.main()
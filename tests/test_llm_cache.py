@@ -0,0 +1,82 @@
+import sys
+import os
+import shutil
+import tempfile
+import time
+import unittest
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from openai.types.chat import ChatCompletion
+from src.llm_cache import CachedOpenAI, LLMResponseCache, served_from_cache
+
+class FakeCompletions:
+    def __init__(self):
+        self.calls = []
+
+    def create(self, **kwargs):
+        self.calls.append(kwargs)
+        return ChatCompletion.model_validate({
+            "id": f"c{len(self.calls)}", "object": "chat.completion", "created": 0, "model": kwargs["model"],
+            "choices": [{"index": 0, "finish_reason": "stop",
+                         "message": {"role": "assistant", "content": f"answer {len(self.calls)}"}}],
+        })
+
+class FakeClient:
+    def __init__(self):
+        self.completions = FakeCompletions()
+        self.chat = type("Chat", (), {"completions": self.completions})()
+        self.embeddings = "embeddings-api"
+
+class TestLLMCache(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.raw = FakeClient()
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp)
+
+    def _client(self, ttl=3600, max_bytes=1024 * 1024):
+        cache = LLMResponseCache(os.path.join(self.tmp, "llm.sqlite"), ttl, max_bytes)
+        return CachedOpenAI(self.raw, cache), cache
+
+    def _ask(self, client, content, **kwargs):
+        response = client.chat.completions.create(model="gpt-4o", messages=[{"role": "user", "content": content}], **kwargs)
+        return response.choices[0].message.content
+
+    def test_replay_skips_network(self):
+        client, cache = self._client()
+        self.assertEqual(self._ask(client, "hook?", timeout=30), "answer 1")
+
+        # New process, same prompt (different timeout): served from disk
+        replay, replay_cache = self._client()
+        self.assertEqual(self._ask(replay, "hook?", timeout=5), "answer 1")
+        self.assertEqual(len(self.raw.completions.calls), 1)
+        self.assertEqual(replay_cache.hits, 1)
+
+        # response_format and opt-out both bypass the cached entry
+        self._ask(replay, "hook?", response_format={"type": "json_object"})
+        self.assertEqual(self._ask(replay, "hook?", cache=False), "answer 3")
+        self.assertNotIn("cache", self.raw.completions.calls[-1])
+        self.assertEqual(replay.embeddings, "embeddings-api")
+        self.assertTrue(served_from_cache(replay.chat.completions.create(model="gpt-4o", messages=[{"role": "user", "content": "hook?"}])))
+        self.assertFalse(served_from_cache(client.chat.completions.create(model="gpt-4o", messages=[{"role": "user", "content": "hook?"}], cache=False)))
+        print(f"✅ Replayed prompt served from the LLM cache: {replay_cache.stats()}")
+
+    def test_ttl_and_size_eviction(self):
+        client, cache = self._client(ttl=0.05)
+        self._ask(client, "a")
+        time.sleep(0.1)
+        self._ask(client, "a")
+        self.assertEqual(len(self.raw.completions.calls), 2)
+
+        client, cache = self._client(max_bytes=1200)
+        for prompt in ("p1", "p2", "p3"):
+            self._ask(client, prompt)
+        self.assertGreater(cache.evictions, 0)
+        calls = len(self.raw.completions.calls)
+        self._ask(client, "p3")  # Most recent entry survived
+        self.assertEqual(len(self.raw.completions.calls), calls)
+
+if __name__ == '__main__':
+    unittest.main()
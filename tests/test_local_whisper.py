@@ -0,0 +1,67 @@
+import sys
+import os
+import shutil
+import tempfile
+import threading
+import types
+import unittest
+from unittest import mock
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from src import local_whisper
+from src.model_registry import ModelRegistry
+
+class FakeWhisperModel:
+    instances = []
+
+    def __init__(self, size, device, compute_type):
+        self.args = (size, device, compute_type)
+        self.threads = set()
+        FakeWhisperModel.instances.append(self)
+
+    def transcribe(self, audio_path, beam_size=5):
+        self.threads.add(threading.get_ident())
+        segment = types.SimpleNamespace(start=0.0, end=1.5, text=f" {os.path.basename(audio_path)} ")
+        info = types.SimpleNamespace(language="en", language_probability=0.99)
+        return iter([segment]), info
+
+class TestLocalWhisper(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        FakeWhisperModel.instances = []
+        fake_module = types.SimpleNamespace(WhisperModel=FakeWhisperModel)
+        self.patches = [
+            mock.patch.dict(sys.modules, {"faster_whisper": fake_module}),
+            mock.patch.object(local_whisper, "MODELS", ModelRegistry()),
+        ]
+        for p in self.patches:
+            p.start()
+
+    def tearDown(self):
+        for p in self.patches:
+            p.stop()
+        shutil.rmtree(self.tmp)
+
+    def _pairs(self, count):
+        return [(os.path.join(self.tmp, f"voice_{i}.mp3"), os.path.join(self.tmp, f"voice_{i}.srt")) for i in range(count)]
+
+    def test_model_loaded_once_across_calls(self):
+        for audio, srt in self._pairs(2):
+            local_whisper.transcribe_to_srt(audio, srt)
+
+        self.assertEqual(len(FakeWhisperModel.instances), 1)
+        with open(os.path.join(self.tmp, "voice_1.srt"), encoding="utf-8") as f:
+            self.assertEqual(f.read(), "1\n00:00:00,000 --> 00:00:01,500\nvoice_1.mp3\n\n")
+
+    def test_batch_shares_model_across_threads(self):
+        pairs = self._pairs(6)
+        srts = local_whisper.transcribe_batch(pairs, max_workers=3)
+
+        self.assertEqual(srts, [srt for _, srt in pairs])
+        self.assertTrue(all(os.path.exists(p) for p in srts))
+        self.assertEqual(len(FakeWhisperModel.instances), 1)
+        print(f"✅ 6 files transcribed with one model on {len(FakeWhisperModel.instances[0].threads)} thread(s).")
+
+if __name__ == '__main__':
+    unittest.main()
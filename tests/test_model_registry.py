@@ -0,0 +1,81 @@
+import sys
+import os
+import threading
+import types
+import unittest
+from unittest import mock
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from src.model_registry import ModelRegistry
+
+class FakeTensor:
+    def __init__(self, count, width):
+        self.count = count
+        self.width = width
+
+    def numel(self):
+        return self.count
+
+    def element_size(self):
+        return self.width
+
+class FakeModule:
+    def parameters(self):
+        return [FakeTensor(1000, 4), FakeTensor(500, 2)]
+
+    def buffers(self):
+        return [FakeTensor(10, 4)]
+
+class TestModelRegistry(unittest.TestCase):
+    def test_loads_once_and_shares(self):
+        registry = ModelRegistry()
+        loads = []
+
+        def loader():
+            loads.append(1)
+            return (FakeModule(), "preprocess")
+
+        threads = [threading.Thread(target=registry.get, args=("clip", loader)) for _ in range(8)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        model, preprocess = registry.get("clip", loader)
+
+        self.assertEqual(len(loads), 1)
+        self.assertEqual(preprocess, "preprocess")
+        self.assertEqual(registry.stats()["clip"]["hits"], 9)
+        # 1000*4 + 500*2 + 10*4 bytes
+        self.assertEqual(registry.total_bytes(), 5040)
+        print("✅ Model loaded once for 9 concurrent/serial requests.")
+
+    def test_unload_frees_and_reloads_lazily(self):
+        registry = ModelRegistry()
+        loads = []
+        registry.get("whisper", lambda: loads.append(1) or FakeModule())
+
+        freed = registry.unload("whisper")
+        self.assertEqual(freed, 5040)
+        self.assertFalse(registry.loaded("whisper"))
+        self.assertEqual(registry.total_bytes(), 0)
+
+        registry.get("whisper", lambda: loads.append(1) or FakeModule())
+        self.assertEqual(len(loads), 2)
+
+    def test_editor_loads_whisper_on_first_use(self):
+        from src import editor
+        loads = []
+        fake_whisper = types.SimpleNamespace(load_model=lambda name: loads.append(name) or FakeModule())
+
+        with mock.patch.dict(sys.modules, {"whisper": fake_whisper}), \
+             mock.patch.object(editor, "MODELS", ModelRegistry()):
+            first, second = editor.VideoEditor(), editor.VideoEditor()
+            self.assertEqual(loads, [])
+            self.assertIs(first.model, second.model)
+
+        self.assertEqual(loads, ["base"])
+        print("✅ VideoEditor construction no longer loads Whisper; one shared model on first use.")
+
+if __name__ == '__main__':
+    unittest.main()
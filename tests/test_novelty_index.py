@@ -0,0 +1,70 @@
+import sys
+import os
+import random
+import shutil
+import tempfile
+import unittest
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from src.novelty_index import NoveltyIndex
+
+WORDS = ("night shift radio static tower engineer heard voice calling from empty floor below "
+         "lights flickered alarm silent door opened cold air smelled smoke sirens never came").split()
+
+def story(seed, length=120):
+    rng = random.Random(seed)
+    return " ".join(rng.choice(WORDS) for _ in range(length))
+
+class TestNoveltyIndex(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.path = os.path.join(self.tmp, "novelty.jsonl")
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp)
+
+    def test_blocks_near_duplicate_only(self):
+        index = NoveltyIndex(self.path, threshold=0.9)
+        original = story(1)
+        self.assertEqual(index.check_and_add(original, "a|b|c")[0], True)
+
+        # One word changed at the very end: near-identical shingle set
+        tweaked = original.rsplit(" ", 1)[0] + " tower"
+        is_novel, score = index.check_and_add(tweaked, "a|b|c")
+        self.assertFalse(is_novel)
+        self.assertGreaterEqual(score, 0.9)
+
+        self.assertTrue(index.check_and_add(story(2), "a|b|c")[0])
+        self.assertEqual(len(index), 2)
+
+    def test_appends_and_reloads(self):
+        index = NoveltyIndex(self.path)
+        for seed in range(20):
+            index.add(story(seed), f"fp{seed}")
+        with open(self.path) as f:
+            self.assertEqual(len(f.readlines()), 20)
+
+        reloaded = NoveltyIndex(self.path)
+        self.assertEqual(len(reloaded), 20)
+        score, match = reloaded.query(story(7))
+        self.assertEqual((score, match), (1.0, "fp7"))
+        print("✅ Novelty index reloaded 20 stories from the append-only log.")
+
+    def test_cached_replay_passes_its_own_record_only(self):
+        index = NoveltyIndex(self.path, threshold=0.9)
+        original = story(1)
+        self.assertTrue(index.check_and_add(original, "a|b|c")[0])
+
+        # Fresh generation of the same text is still a duplicate
+        self.assertFalse(index.check_and_add(original, "a|b|c")[0])
+        # The same script served from the LLM cache is its own earlier record (also after a reload)
+        reloaded = NoveltyIndex(self.path, threshold=0.9)
+        self.assertTrue(reloaded.check_and_add(original, "a|b|c", replay=True)[0])
+        self.assertEqual(len(reloaded), 1)
+        # A cached script that only resembles a published one is still blocked
+        tweaked = original.rsplit(" ", 1)[0] + " tower"
+        self.assertFalse(reloaded.check_and_add(tweaked, "a|b|c", replay=True)[0])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,44 @@
+import sys
+import os
+import unittest
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from src.phrase_matcher import scan
+from src.validator import validate_human_voice, validate_micro_details, validate_safety
+
+class TestPhraseMatcher(unittest.TestCase):
+    def test_word_boundaries(self):
+        hits = scan("It was reported that the gorge held hotels and a grape farm.")
+        self.assertEqual(hits["sensory"], ())
+        self.assertEqual(hits["unsafe"], ())
+
+    def test_inflections_and_overlaps(self):
+        hits = scan("The room Smelled of smoke. His Blood  ran cold as she screamed.")
+        self.assertEqual(hits["forbidden"], ("blood ran cold",))
+        # "cold" inside the forbidden phrase still counts as sensory
+        self.assertEqual(hits["sensory"], ("smell", "scream", "cold"))
+
+    def test_cached_result_is_read_only(self):
+        hits = scan("A cold, dark room.")
+        with self.assertRaises(TypeError):
+            hits["sensory"] = ()
+        self.assertEqual(scan("A cold, dark room.")["sensory"], ("cold", "dark"))
+
+    def test_validator_messages_unchanged(self):
+        ok, problems = validate_human_voice("Little did he know. It changed everything.")
+        self.assertFalse(ok)
+        self.assertEqual(problems, ["Forbidden phrase found: 'little did he know'",
+                                    "Forbidden phrase found: 'changed everything'"])
+
+        ok, problems = validate_safety({"hook_text": "Nazi gold.", "script_text": "It was torture."})
+        self.assertEqual(problems, ["SAFETY VIOLATION: 'nazi' usage detected.",
+                                    "SAFETY VIOLATION: 'torture' usage detected."])
+
+        ok, problems = validate_micro_details("Officials reported a credible threat.")
+        self.assertEqual(problems, ["Micro-detail check failed: Only 0 sensory words found (Target >= 2)."])
+        self.assertTrue(validate_micro_details("A dim glow.")[0])
+        print("✅ One scan serves forbidden/unsafe/sensory checks with word boundaries.")
+
+if __name__ == '__main__':
+    unittest.main()
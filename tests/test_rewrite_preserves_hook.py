@@ -1,12 +1,14 @@
 import sys
 import os
 import unittest
-from unittest.mock import MagicMock
+from unittest.mock import MagicMock, patch
 
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
 
 from src.writer import ScriptGenerator
 
+# LLM_CACHE=0: unit tests must not create or read assets/cache/llm.sqlite
+@patch("src.llm_cache.LLM_CACHE_ENABLED", False)
 class TestRewriteIntegrity(unittest.TestCase):
     def test_rewrite_preserves_hook(self):
         writer = ScriptGenerator()
@@ -24,5 +26,19 @@ class TestRewriteIntegrity(unittest.TestCase):
         self.assertTrue(final.startswith(hook))
         print(f"✅ Rewrite forced hook prefix: {final}")
 
+    def test_forced_prefix_keeps_script_opening(self):
+        writer = ScriptGenerator()
+        writer.client = MagicMock()
+        hook = "The shadow moved."
+        reply = writer.client.chat.completions.create.return_value
+
+        # Opening words share letters with the hook: they must survive the prefix fix
+        reply.choices = [MagicMock(message=MagicMock(content="The thing shifted again."))]
+        self.assertEqual(writer._rewrite_human_voice("Draft", hook), "The shadow moved. The thing shifted again.")
+
+        # Hook present but re-wrapped by the model: not duplicated
+        reply.choices = [MagicMock(message=MagicMock(content="The shadow\nmoved. It came back."))]
+        self.assertEqual(writer._rewrite_human_voice("Draft", hook), "The shadow moved. It came back.")
+
 if __name__ == '__main__':
     unittest.main()
@@ -16,6 +16,7 @@ class TestSilence(unittest.TestCase):
              mock.patch("src.narrator.AudioFileClip") as MockClip, \
              mock.patch("src.narrator.AudioClip") as MockAudioClip, \
              mock.patch("src.narrator.concatenate_audioclips"), \
+             mock.patch("src.narrator.AUDIO_ASSEMBLY", "moviepy"), \
              mock.patch("os.path.exists", return_value=True):
             
             # Setup Mocks
@@ -0,0 +1,47 @@
+import sys
+import os
+import math
+import random
+import unittest
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from src.similarity import SimilarityIndex
+
+def loop_cosine(vec1, vec2):
+    dot_product = sum(a*b for a,b in zip(vec1, vec2))
+    norm_a = math.sqrt(sum(a*a for a in vec1))
+    norm_b = math.sqrt(sum(b*b for b in vec2))
+    if norm_a == 0 or norm_b == 0: return 0.0
+    return dot_product / (norm_a * norm_b)
+
+class TestSimilarityIndex(unittest.TestCase):
+    def setUp(self):
+        rng = random.Random(7)
+        self.refs = [[rng.uniform(-1, 1) for _ in range(64)] for _ in range(50)]
+        self.index = SimilarityIndex(self.refs, labels=[f"gold_{i}" for i in range(50)])
+
+    def test_matches_pure_python_cosine(self):
+        query = self.refs[17][:]
+        query[0] += 0.5
+        expected = sorted(((f"gold_{i}", loop_cosine(query, r)) for i, r in enumerate(self.refs)), key=lambda x: -x[1])
+
+        max_score, top = self.index.query(query, k=3)
+        self.assertEqual([label for label, _ in top], [label for label, _ in expected[:3]])
+        self.assertAlmostEqual(max_score, expected[0][1], places=5)
+
+    def test_batch_equals_single_queries(self):
+        queries = [self.refs[3], self.refs[40], [0.0] * 64]
+        batch = self.index.query_batch(queries, k=2)
+        for q, (score, top) in zip(queries, batch):
+            single_score, single_top = self.index.query(q, k=2)
+            self.assertAlmostEqual(score, single_score, places=5)
+            self.assertEqual([l for l, _ in top], [l for l, _ in single_top])
+        self.assertEqual(batch[0][1][0][0], "gold_3")
+        self.assertEqual(batch[2][0], 0.0)  # Zero vector scores 0, like the old helper
+
+    def test_empty_index(self):
+        self.assertEqual(SimilarityIndex([]).query([1.0, 2.0], k=3), (0.0, []))
+
+if __name__ == '__main__':
+    unittest.main()
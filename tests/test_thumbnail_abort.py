@@ -0,0 +1,33 @@
+import sys
+import os
+import unittest
+from unittest import mock
+from unittest.mock import MagicMock
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from src.artist import VisualEngine
+
+class TestThumbnailAbort(unittest.TestCase):
+    def test_failed_scenes_abort_queued_thumbnails(self):
+        with mock.patch("src.artist.OpenAI"), mock.patch.object(VisualEngine, "_init_clip"):
+            engine = VisualEngine()
+        thumbs = MagicMock()
+
+        def failing_scenes(prompts, negative, job_dir, cfg, after_queue=None):
+            after_queue()  # Thumbnails are queued right behind the scenes...
+            raise RuntimeError("Strict Local Mode Validation Failed: stalled")  # ...then collection fails
+
+        engine._generate_comfyui_with_retry = failing_scenes
+        with mock.patch("src.config.IMAGE_BACKEND", "comfyui"), \
+             mock.patch("src.local_comfyui.queue_images", return_value=thumbs):
+            with self.assertRaises(RuntimeError):
+                engine.generate_images([{"visual_prompt": "a valve"}], {}, "job_dir", thumbnail_topic="Piper Alpha")
+
+        thumbs.abort.assert_called_once()
+        thumbs.collect.assert_not_called()
+        self.assertIsNone(engine.thumbnail_batch)
+        print("✅ Failed scene batch aborts the queued thumbnails.")
+
+if __name__ == '__main__':
+    unittest.main()
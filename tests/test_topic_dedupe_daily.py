@@ -2,7 +2,7 @@ import sys
 import os
 import unittest
 import shutil
-from unittest.mock import MagicMock
+from unittest.mock import MagicMock, patch
 
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
 
@@ -15,23 +15,30 @@ class TestTopicDedupe(unittest.TestCase):
         os.makedirs(self.test_dir, exist_ok=True)
         # Mock config
         self.conf = {"niche": "test_horror"}
-        
-        # We need to patch OUTPUT_DIR in topic_engine or pass state file?
-        # TopicEngine uses src.config.OUTPUT_DIR import. 
-        # We can't easily patch the import on the fly without stubbing.
-        # But we can patch self.state_file in the instance.
+        # Keep topic_state.sqlite (and the legacy JSON migration) out of the repo root
+        self.patches = [
+            patch("src.topic_engine.OUTPUT_DIR", self.test_dir),
+            patch("src.llm_cache.LLM_CACHE_ENABLED", False),  # No assets/cache/llm.sqlite from unit tests
+        ]
+        for p in self.patches:
+            p.start()
     
     def tearDown(self):
+        for p in self.patches:
+            p.stop()
         if os.path.exists(self.test_dir):
             shutil.rmtree(self.test_dir)
 
+    # No background prefetch: its thread would outlive the test and write into test_dir
+    @patch("src.topic_engine.TOPIC_LOW_WATERMARK", 0)
+    # Exact matching only: the semantic pass would call the embeddings API and the shared cache
+    @patch("src.topic_engine.TOPIC_SIMILARITY_THRESHOLD", 1)
     def test_dedupe_logic(self):
         engine = TopicEngine(self.conf)
-        engine.state_file = os.path.join(self.test_dir, "topic_state.json")
-        engine._load_state() 
+        self.assertEqual(engine.store.path, os.path.join(self.test_dir, "topic_state.sqlite"))
         
         # Seed state with "Old Topic"
-        engine.state["used_topics"] = ["Old Topic"]
+        engine.store.mark_used("Old Topic")
         
         # Mock generate batch to return [Old Topic, New Topic]
         engine._generate_batch = MagicMock(return_value=["Old Topic", "New Topic"])
@@ -39,7 +46,7 @@ class TestTopicDedupe(unittest.TestCase):
         topic = engine.get_fresh_topic()
         
         self.assertEqual(topic, "New Topic")
-        self.assertIn("New Topic", engine.state["used_topics"])
+        self.assertTrue(engine.store.is_used("New Topic"))
         print("✅ Dedupe Logic Verified: 'Old Topic' skipped, 'New Topic' selected.")
 
 if __name__ == '__main__':
@@ -0,0 +1,67 @@
+import sys
+import os
+import shutil
+import tempfile
+import threading
+import unittest
+from unittest import mock
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from src import topic_engine
+
+class TestTopicPrefetch(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.patches = [
+            mock.patch.object(topic_engine, "OpenAI"),
+            mock.patch.object(topic_engine, "OUTPUT_DIR", self.tmp),
+            mock.patch("src.llm_cache.LLM_CACHE_ENABLED", False),
+            mock.patch.object(topic_engine, "TOPIC_SIMILARITY_THRESHOLD", 1.0),
+            mock.patch.object(topic_engine, "TOPIC_LOW_WATERMARK", 3),
+        ]
+        for p in self.patches:
+            p.start()
+        self.engine = topic_engine.TopicEngine({"niche": "test"})
+        self.batches = 0
+        self.release = threading.Event()
+        self.release.set()
+
+        def generate_batch():
+            self.release.wait(5)
+            self.batches += 1
+            return [f"Batch {self.batches} Topic {i}" for i in range(5)]
+        self.engine._generate_batch = generate_batch
+
+    def tearDown(self):
+        if self.engine._prefetch_thread:
+            self.engine._prefetch_thread.join(5)
+        for p in self.patches:
+            p.stop()
+        shutil.rmtree(self.tmp)
+
+    def test_refills_below_watermark_in_background(self):
+        self.engine.store.add_candidates(["Queued 1", "Queued 2", "Queued 3"])
+        self.release.clear()  # Hold the background batch call
+
+        self.assertEqual(self.engine.get_fresh_topic(), "Queued 1")
+        self.assertTrue(self.engine._prefetch_running())
+        self.assertFalse(self.engine.prefetch())  # Single-flight
+        self.assertEqual(self.engine.get_fresh_topic(), "Queued 2")
+
+        self.release.set()
+        self.engine._prefetch_thread.join(5)
+        self.assertEqual(self.batches, 1)
+        self.assertEqual(self.engine.store.candidate_count(), 6)
+        print("✅ Topics served from the queue while one background batch refilled it.")
+
+    def test_empty_queue_waits_for_inflight_prefetch(self):
+        self.release.clear()
+        self.assertTrue(self.engine.prefetch())
+        threading.Timer(0.1, self.release.set).start()
+
+        self.assertEqual(self.engine.get_fresh_topic(), "Batch 1 Topic 0")
+        self.assertEqual(self.batches, 1)
+
+if __name__ == '__main__':
+    unittest.main()
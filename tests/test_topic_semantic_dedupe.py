@@ -0,0 +1,67 @@
+import sys
+import os
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from src import topic_engine
+from src.embeddings import EmbeddingCache
+
+# Bag-of-keywords vectors: paraphrases of the same story land on the same axis
+AXES = [("byford",), ("radium",), ("cutter",), ("station",), ("titanic", "iceberg")]
+
+def fake_embed(texts):
+    fake_embed.calls += len(texts)
+    out = []
+    for t in texts:
+        vec = [1.0 if any(word in t.lower() for word in axis) else 0.0 for axis in AXES]
+        vec.append(0.3)  # Shared component: unrelated topics still score > 0
+        out.append(vec)
+    return out
+
+class TestTopicSemanticDedupe(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        fake_embed.calls = 0
+        cache = EmbeddingCache(os.path.join(self.tmp, "emb.sqlite"), model="fake")
+        self.patches = [
+            mock.patch.object(topic_engine, "OpenAI"),
+            mock.patch.object(topic_engine, "OUTPUT_DIR", self.tmp),
+            mock.patch("src.llm_cache.LLM_CACHE_ENABLED", False),
+            mock.patch.object(topic_engine, "get_embedding_cache", return_value=cache),
+            mock.patch.object(topic_engine, "openai_embed_fn", return_value=fake_embed),
+        ]
+        for p in self.patches:
+            p.start()
+        self.engine = topic_engine.TopicEngine({"niche": "test"})
+
+    def tearDown(self):
+        for p in self.patches:
+            p.stop()
+        shutil.rmtree(self.tmp)
+
+    def test_paraphrases_are_filtered(self):
+        self.engine.store.mark_used("The Byford Dolphin Accident")
+        batch = [
+            "Byford Dolphin Decompression Accident (1983)",  # Used topic, reworded
+            "The 1912 Iceberg Disaster",                    # Paraphrase of blacklisted "Titanic"
+            "The Radium Girls (Jaw Necrosis)",
+            "Radium Girls lawsuit",                         # Same story twice in one batch
+            "The Cutter Incident 1955",
+        ]
+        # The exact blacklist check alone lets the paraphrase through
+        self.assertFalse(self.engine._is_blacklisted("The 1912 Iceberg Disaster"))
+        kept = self.engine._filter_new(batch)
+        self.assertEqual(kept, ["The Radium Girls (Jaw Necrosis)", "The Cutter Incident 1955"])
+
+        # Second pass: every string is already in the on-disk cache
+        calls = fake_embed.calls
+        self.engine._filter_new(batch)
+        self.assertEqual(fake_embed.calls, calls)
+        print("✅ Reworded repeats of used/blacklisted topics rejected before scripting.")
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,70 @@
+import sys
+import os
+import json
+import multiprocessing
+import shutil
+import tempfile
+import unittest
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from src.topic_store import TopicStore
+
+def _claim_all(path, out):
+    store = TopicStore(path)
+    claimed = []
+    while True:
+        topic = store.claim_next()
+        if topic is None:
+            break
+        claimed.append(topic)
+    out.put(claimed)
+
+class TestTopicStore(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.path = os.path.join(self.tmp, "topics.sqlite")
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp)
+
+    def test_claims_skip_used_and_blacklisted(self):
+        store = TopicStore(self.path)
+        store.mark_used("The Cutter Incident 1955")
+        self.assertEqual(store.add_candidates(["the cutter  incident 1955", "Titanic Sinking", "Radium Girls", "Radium Girls"]), 2)
+
+        topic = store.claim_next(allowed=lambda t: "titanic" not in t.lower())
+        self.assertEqual(topic, "Radium Girls")
+        self.assertIsNone(store.claim_next())
+        self.assertFalse(store.mark_used("RADIUM GIRLS"))
+        self.assertEqual(store.filter_unused(["Radium Girls", "Piper Alpha", "piper alpha"]), ["Piper Alpha"])
+
+    def test_one_time_json_migration(self):
+        legacy = os.path.join(self.tmp, "topic_state.json")
+        with open(legacy, "w") as f:
+            json.dump({"used_topics": ["A", "B"], "candidates": ["B", "C"]}, f)
+
+        store = TopicStore(self.path)
+        self.assertTrue(store.migrate_json(legacy))
+        self.assertFalse(store.migrate_json(legacy))
+        self.assertEqual(store.used_topics(), ["A", "B"])
+        self.assertEqual(store.candidates(), ["C"])
+
+    def test_concurrent_processes_never_share_a_topic(self):
+        TopicStore(self.path).add_candidates([f"Topic {i}" for i in range(60)])
+
+        ctx = multiprocessing.get_context("spawn")
+        out = ctx.Queue()
+        procs = [ctx.Process(target=_claim_all, args=(self.path, out)) for _ in range(4)]
+        for p in procs:
+            p.start()
+        claimed = [t for _ in procs for t in out.get(timeout=60)]
+        for p in procs:
+            p.join()
+
+        self.assertEqual(len(claimed), 60)
+        self.assertEqual(len(set(claimed)), 60)
+        print("✅ 4 processes claimed 60 topics from one WAL database with no duplicates.")
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,110 @@
+import sys
+import os
+import threading
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest import mock
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from src import transport
+from src.transport import Transport
+
+class FlakyServer:
+    """Answers each path with the queued statuses in order, then 200. Records client ports."""
+    def __init__(self, script: dict):
+        self.script = {path: list(statuses) for path, statuses in script.items()}
+        self.hits = {}
+        self.ports = set()
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"  # Keep-alive
+
+            def _reply(self):
+                length = int(self.headers.get("Content-Length") or 0)
+                if length:
+                    self.rfile.read(length)
+                server.hits[self.path] = server.hits.get(self.path, 0) + 1
+                server.ports.add(self.client_address[1])
+                queued = server.script.get(self.path)
+                status = queued.pop(0) if queued else 200
+                body = b'{"ok": true}'
+                self.send_response(status)
+                if status == 429:
+                    self.send_header("Retry-After", "0")
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            do_GET = _reply
+            do_POST = _reply
+
+            def log_message(self, *args):
+                pass
+
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self._server.daemon_threads = True
+        self.base = f"http://127.0.0.1:{self._server.server_address[1]}"
+
+    def __enter__(self):
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+        return self
+
+    def __exit__(self, *exc):
+        self._server.shutdown()
+        self._server.server_close()
+
+class TestTransport(unittest.TestCase):
+    def setUp(self):
+        self.transport = Transport(backoff_base=0.01, backoff_max=0.05)
+
+    def tearDown(self):
+        self.transport.close()
+
+    def test_retries_5xx_and_reuses_connection(self):
+        with FlakyServer({"/a": [503, 502]}) as server:
+            response = self.transport.get(f"{server.base}/a")
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(server.hits["/a"], 3)
+            for _ in range(5):
+                self.transport.get(f"{server.base}/b")
+            self.assertEqual(len(server.ports), 1)  # One pooled keep-alive connection
+
+            stats = self.transport.stats()[server.base]
+            self.assertEqual(stats["requests"], 8)
+            self.assertEqual(stats["errors"], 2)
+            self.assertEqual(stats["retries"], 2)
+            self.assertEqual(sum(stats["buckets"].values()), 8)
+        print("✅ Transport: 5xx retried with backoff over one keep-alive connection.")
+
+    def test_post_retries_only_when_safe(self):
+        with FlakyServer({"/tts": [429], "/prompt": [500], "/speech": [500]}) as server:
+            self.assertEqual(self.transport.post(f"{server.base}/tts", json={}).status_code, 200)
+            self.assertEqual(server.hits["/tts"], 2)
+
+            # The server may have acted on a POST that failed with 500
+            self.assertEqual(self.transport.post(f"{server.base}/prompt", json={}).status_code, 500)
+            self.assertEqual(server.hits["/prompt"], 1)
+
+            self.assertEqual(self.transport.post(f"{server.base}/speech", json={}, idempotent=True).status_code, 200)
+            self.assertEqual(server.hits["/speech"], 2)
+
+    def test_gives_up_after_max_retries(self):
+        with FlakyServer({"/down": [503] * 10}) as server:
+            response = self.transport.get(f"{server.base}/down", retries=2)
+            self.assertEqual(response.status_code, 503)
+            self.assertEqual(server.hits["/down"], 3)
+
+    def test_refused_connection_is_retried_then_raised(self):
+        with FlakyServer({}) as server:
+            base = server.base
+        with mock.patch.object(transport.time, "sleep") as sleep:
+            with self.assertRaises(transport.requests.ConnectionError):
+                self.transport.post(f"{base}/prompt", json={}, retries=2)
+        self.assertEqual(sleep.call_count, 2)
+        self.assertEqual(self.transport.stats()[base]["errors"], 3)
+
+if __name__ == '__main__':
+    unittest.main()
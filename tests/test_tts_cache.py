@@ -0,0 +1,86 @@
+import sys
+import os
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from src import narrator
+from src.content_cache import ContentCache
+
+class TestTTSCache(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.cache = ContentCache(os.path.join(self.tmp, "cache"), 10 * 1024 * 1024, ext=".mp3")
+        self.voiced = []
+        self.patches = [
+            mock.patch.object(narrator, "OpenAI"),
+            mock.patch.object(narrator, "ELEVENLABS_API_KEY", "key"),
+            mock.patch.object(narrator, "get_tts_cache", return_value=self.cache),
+            mock.patch.object(narrator, "AudioFileClip", return_value=mock.MagicMock(duration=2.0)),
+            mock.patch.object(narrator, "concatenate_audioclips"),
+            mock.patch.object(narrator, "AUDIO_ASSEMBLY", "moviepy"),
+        ]
+        for p in self.patches:
+            p.start()
+
+    def tearDown(self):
+        for p in self.patches:
+            p.stop()
+        shutil.rmtree(self.tmp)
+
+    def _engine(self):
+        engine = narrator.AudioEngine()
+
+        def fake_eleven(text, filepath):
+            self.voiced.append(text)
+            with open(filepath, "w") as f:
+                f.write(text)
+        engine._generate_elevenlabs = fake_eleven
+        return engine
+
+    def test_variant_b_only_voices_new_hook(self):
+        body = "[SILENCE]The valve was open.[SILENCE:0.5]Nobody checked it."
+        job_a = os.path.join(self.tmp, "a")
+        job_b = os.path.join(self.tmp, "b")
+        os.makedirs(job_a)
+        os.makedirs(job_b)
+
+        self._engine().generate_voice("Hook A." + body, job_a, output_name="voice_A.mp3")
+        self.assertEqual(len(self.voiced), 3)
+
+        # Fresh engine (e.g. a re-render in another process), re-flowed whitespace in the body
+        self._engine().generate_voice("Hook B." + body.replace("was open", "was  open"), job_b, output_name="voice_B.mp3")
+        self.assertEqual(self.voiced[3:], ["Hook B."])
+        self.assertEqual(self.cache.hits, 2)
+        print(f"✅ Variant B synthesized 1 of 3 chunks; cache {self.cache.stats()}")
+
+    def test_voice_settings_are_part_of_the_key(self):
+        job = os.path.join(self.tmp, "job")
+        os.makedirs(job)
+        self._engine().generate_voice("Same line.", job)
+        engine = self._engine()
+        engine.eleven_voice_settings = {"stability": 0.9, "similarity_boost": 0.75}
+        engine.generate_voice("Same line.", job)
+        self.assertEqual(len(self.voiced), 2)
+
+    def test_sentence_chunking_reuses_all_but_the_hook(self):
+        body = " The valve was left open overnight. Nobody checked the gauge.[SILENCE] Then the pressure dropped."
+        job = os.path.join(self.tmp, "job")
+        os.makedirs(job)
+        with mock.patch.object(narrator, "TTS_CHUNKING", "sentence"):
+            _, meta = self._engine().generate_voice("Did you know one valve killed 167 men?" + body, job)
+            self._engine().generate_voice("One missing tag sank a platform." + body, job)
+
+        self.assertEqual([m["text"] for m in meta], [
+            "Did you know one valve killed 167 men?", "The valve was left open overnight.",
+            "Nobody checked the gauge.", "[SILENCE]", "Then the pressure dropped.",
+        ])
+        self.assertEqual(meta[2]["start"], 4.0)
+        self.assertEqual(self.voiced[4:], ["One missing tag sank a platform."])
+        print("✅ Sentence chunking: variant B re-voiced only its hook sentence.")
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,90 @@
+import sys
+import os
+import shutil
+import tempfile
+import threading
+import time
+import unittest
+from unittest import mock
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from src import narrator
+from src.utils import RateLimiter
+
+class TestParallelTTS(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.active = 0
+        self.peak = 0
+        self.lock = threading.Lock()
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp)
+
+    def _fake_eleven(self, text, filepath):
+        with self.lock:
+            self.active += 1
+            self.peak = max(self.peak, self.active)
+        # Later chunks finish first, so ordering can't come from completion order
+        time.sleep(0.3 - 0.05 * int(text[-2]))
+        with open(filepath, "w") as f:
+            f.write(text)
+        with self.lock:
+            self.active -= 1
+
+    def test_chunks_overlap_and_keep_order(self):
+        durations = {}
+
+        def fake_clip(path):
+            clip = mock.MagicMock()
+            with open(path) as f:
+                clip.duration = 1.0 + int(f.read()[-2])
+            durations[path] = clip.duration
+            return clip
+
+        limits = {"elevenlabs": RateLimiter(3), "openai": RateLimiter(3)}
+        with mock.patch.object(narrator, "OpenAI"), \
+             mock.patch.object(narrator, "ELEVENLABS_API_KEY", "key"), \
+             mock.patch.object(narrator, "PROVIDER_LIMITS", limits), \
+             mock.patch.object(narrator, "get_tts_cache", return_value=None), \
+             mock.patch.object(narrator, "TTS_WORKERS", 4), \
+             mock.patch.object(narrator, "AudioFileClip", side_effect=fake_clip), \
+             mock.patch.object(narrator, "AudioClip"), \
+             mock.patch.object(narrator, "AUDIO_ASSEMBLY", "moviepy"), \
+             mock.patch.object(narrator, "concatenate_audioclips"):
+            engine = narrator.AudioEngine()
+            engine._generate_elevenlabs = self._fake_eleven
+
+            text = "Part 1.[SILENCE:2]Part 2. Part 3.[SILENCE]Part 4.[SILENCE:0.5]Part 5."
+            start = time.perf_counter()
+            _, meta = engine.generate_voice(text, self.tmp)
+            elapsed = time.perf_counter() - start
+
+        self.assertEqual(self.peak, 3)  # Provider limit, below the 4 workers
+        self.assertLess(elapsed, 0.8)   # Serial would be ~1.0s
+        self.assertEqual([m["text"] for m in meta],
+                         ["Part 1.", "[SILENCE]", "Part 2. Part 3.", "[SILENCE]", "Part 4.", "[SILENCE]", "Part 5."])
+        self.assertEqual([round(m["end"] - m["start"], 2) for m in meta], [2.0, 2.0, 4.0, 1.0, 5.0, 0.5, 6.0])
+        self.assertEqual(meta[-1]["end"], 20.5)
+        print(f"✅ 4 TTS chunks voiced in {elapsed:.2f}s (peak concurrency {self.peak}), timeline in script order.")
+
+    def test_min_interval_spaces_starts(self):
+        limiter = RateLimiter(4, min_interval=0.05)
+        starts = []
+
+        def call():
+            with limiter:
+                starts.append(time.monotonic())
+
+        threads = [threading.Thread(target=call) for _ in range(4)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        starts.sort()
+        gaps = [b - a for a, b in zip(starts, starts[1:])]
+        self.assertTrue(all(g >= 0.045 for g in gaps), gaps)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,84 @@
+import sys
+import os
+import json
+import unittest
+from unittest import mock
+from unittest.mock import MagicMock
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from src import writer
+
+HOOK = "Did you know one valve killed 167 men?"
+
+class TestWriterRepair(unittest.TestCase):
+    def setUp(self):
+        with mock.patch.object(writer, "OpenAI"), mock.patch("src.llm_cache.LLM_CACHE_ENABLED", False):
+            self.gen = writer.ScriptGenerator()
+        self.gen.client = MagicMock()
+        self.gen._generate_hook = MagicMock(return_value={"hook_type": "t", "hook_text": HOOK})
+        self.gen._generate_story = MagicMock(side_effect=lambda *a, **k: {"script_text": f"{HOOK} Draft.", "scenes": [1]})
+        self.gen._rewrite_human_voice = MagicMock(side_effect=lambda text, hook: text)
+        self.gen._generate_metadata = MagicMock(return_value=({}, {}))
+        self.repairs = []
+
+        def create(**kwargs):
+            prompt = kwargs["messages"][1]["content"]
+            self.repairs.append(prompt)
+            fixed = {"script_text": f"{HOOK} Repaired {len(self.repairs)}.", "scenes": [1, 2]}
+            return MagicMock(choices=[MagicMock(message=MagicMock(content=json.dumps(fixed)))])
+        self.gen.client.chat.completions.create.side_effect = create
+
+    def test_repairs_instead_of_regenerating(self):
+        self.gen._check_draft = MagicMock(side_effect=[(["Forbidden phrase found: 'amidst'"], "logic"), ([], None)])
+
+        script = self.gen.generate_script("Piper Alpha", {})
+
+        self.assertEqual(self.gen._generate_story.call_count, 1)
+        self.assertEqual(self.gen._rewrite_human_voice.call_count, 1)
+        self.assertIn("Forbidden phrase found: 'amidst'", self.repairs[0])
+        self.assertIn("Draft.", self.repairs[0])
+        self.assertEqual(script["script_text"], f"{HOOK} Repaired 1.")
+        self.assertEqual(script["beat_words"][-1], "1")
+        self.assertNotIn("_from_cache", script)
+        print("✅ Failed draft repaired with one targeted call (no story + rewrite regeneration).")
+
+    def test_repairs_best_draft_so_far(self):
+        self.gen._check_draft = MagicMock(side_effect=[
+            (["a", "b"], "logic"),                          # Original draft
+            (["Golden similarity check failed"], "golden"),  # Repair 1: got further -> new best
+            ([], None),
+        ])
+        self.gen.generate_script("Piper Alpha", {})
+        self.assertIn("Repaired 1.", self.repairs[1])
+
+    def test_regenerate_mode_and_novelty_start_over(self):
+        with mock.patch.object(writer, "WRITER_RETRY_MODE", "regenerate"):
+            self.gen._check_draft = MagicMock(side_effect=[(["x"], "logic"), ([], None)])
+            self.gen.generate_script("Piper Alpha", {})
+        self.assertEqual(self.gen._generate_story.call_count, 2)
+
+        self.gen._check_draft = MagicMock(side_effect=[(["Too similar"], "novelty"), ([], None)])
+        self.gen.generate_script("Piper Alpha", {})
+        self.assertEqual(self.gen._generate_story.call_count, 4)
+        self.assertEqual(self.repairs, [])
+
+    def test_repair_keeps_opening_words_sharing_hook_letters(self):
+        fixed = {"script_text": "Divers found the valve open.", "scenes": [1]}
+        self.gen.client.chat.completions.create.side_effect = None
+        self.gen.client.chat.completions.create.return_value = MagicMock(
+            choices=[MagicMock(message=MagicMock(content=json.dumps(fixed)))])
+
+        repaired = self.gen._repair_story({"script_text": f"{HOOK} Draft."}, ["x"], HOOK)
+        self.assertEqual(repaired["script_text"], f"{HOOK} Divers found the valve open.")
+
+    def test_cached_draft_is_checked_as_replay(self):
+        with mock.patch("src.validator.validate_script_logic", return_value=(True, [])), \
+             mock.patch("src.validator.validate_golden_similarity", return_value=(True, 1.0, "")), \
+             mock.patch("src.validator.validate_story_novelty", return_value=(True, 1.0)) as novelty:
+            self.assertEqual(self.gen._check_draft({"script_text": "x", "_from_cache": True}), ([], None))
+            self.gen._check_draft({"script_text": "x"})
+        self.assertEqual([c.kwargs["replay"] for c in novelty.call_args_list], [True, False])
+
+if __name__ == '__main__':
+    unittest.main()